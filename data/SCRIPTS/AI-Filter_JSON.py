@@ -7,10 +7,121 @@ Filters JSON files to keep only entries related to wildfires, fires, and fire re
 import json
 import re
 import argparse
+import glob
 import os
-from typing import Dict, List, Any, Union
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Union, Iterator, Optional, TextIO, Tuple
 from pathlib import Path
 
+from Fire_Matcher import FireMatcher
+
+class JSONStreamReader:
+    """
+    Incremental reader for a JSON document whose bulk sits in a top-level list or in
+    lists under top-level keys. Only one list element (plus the read block) is held in
+    memory at a time.
+    """
+    
+    def __init__(self, f: TextIO, block_size: int = 1 << 20):
+        self.f = f
+        self.block_size = block_size
+        self.decoder = json.JSONDecoder()
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+    
+    def _fill(self, size: int = None) -> bool:
+        if self.eof:
+            return False
+        block = self.f.read(size or self.block_size)
+        if not block:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + block
+        self.pos = 0
+        return True
+    
+    def _peek(self) -> Optional[str]:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return None
+    
+    def _expect(self, char: str) -> None:
+        if self._peek() != char:
+            raise json.JSONDecodeError(f"Expecting '{char}'", self.buf, self.pos)
+        self.pos += 1
+    
+    def _value(self) -> Any:
+        self._peek()
+        size = self.block_size
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+                # A number cut by the block boundary ('2' of '2.5') is only complete once
+                # a delimiter follows it
+                if (end < len(self.buf) and self.buf[end] in ' \t\r\n,:]}') or self.eof or not self._fill():
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if not self._fill(size):
+                    raise
+                size *= 2  # Large element: grow reads so re-decoding stays linear overall
+    
+    def _items(self, key: Optional[str]) -> Iterator[Tuple[str, Optional[str], Any]]:
+        self._expect('[')
+        if self._peek() == ']':
+            self.pos += 1
+        else:
+            while True:
+                yield 'item', key, self._value()
+                if self._peek() == ',':
+                    self.pos += 1
+                    continue
+                self._expect(']')
+                break
+        yield 'end', key, None
+    
+    def root_type(self) -> str:
+        """Return 'list', 'object' or 'scalar' for the top-level value"""
+        first = self._peek()
+        return 'list' if first == '[' else 'object' if first == '{' else 'scalar'
+    
+    def events(self) -> Iterator[Tuple[str, Optional[str], Any]]:
+        """
+        Yield (kind, key, value) events:
+        - ('item', key, element) for each element of the top-level list (key None) or
+          of a list under a top-level key, followed by ('end', key, None)
+        - ('value', key, value) for any other value under a top-level key
+        - ('root', None, value) when the document is neither a list nor an object
+        """
+        first = self._peek()
+        if first == '[':
+            yield from self._items(None)
+        elif first == '{':
+            self.pos += 1
+            if self._peek() == '}':
+                self.pos += 1
+                return
+            while True:
+                key = self._value()
+                self._expect(':')
+                if self._peek() == '[':
+                    yield from self._items(key)
+                else:
+                    yield 'value', key, self._value()
+                if self._peek() == ',':
+                    self.pos += 1
+                    continue
+                self._expect('}')
+                break
+        else:
+            yield 'root', None, self._value()
+
 class WildfireFilter:
     def __init__(self):
         # High-confidence fire incident keywords
@@ -91,9 +202,22 @@ class WildfireFilter:
             r'\bfire\b.*(cause|start).*\bfireworks?\b'
         ]
         
+        # Context words that make a fire descriptor count
+        self.context_indicators = [
+            'emergency', 'disaster', 'damage', 'destroy', 'threat', 'danger',
+            'evacuate', 'evacuation', 'warn', 'alert', 'respond', 'response',
+            'incident', 'outbreak', 'spread', 'contain', 'suppress', 'extinguish',
+            'helicopter', 'aircraft', 'tanker', 'crew', 'personnel'
+        ]
+        
         # Compile patterns for better performance
         self.compiled_incident_patterns = [re.compile(pattern, re.IGNORECASE) for pattern in self.fire_incident_patterns]
         self.compiled_exclusion_patterns = [re.compile(pattern, re.IGNORECASE) for pattern in self.exclusion_patterns]
+        
+        # Single-pass engine over all of the rules above
+        self.matcher = FireMatcher(self.compiled_exclusion_patterns, self.fire_incident_keywords,
+                                   self.compiled_incident_patterns, self.fire_descriptors,
+                                   self.context_indicators)
     
     def is_fire_related(self, text: str) -> bool:
         """
@@ -105,47 +229,9 @@ class WildfireFilter:
         Returns:
             bool: True if text contains fire-related content
         """
-        if not isinstance(text, str):
-            return False
-            
-        text_lower = text.lower()
-        
-        # First, check for exclusion patterns (false positives)
-        for pattern in self.compiled_exclusion_patterns:
-            if pattern.search(text):
-                return False
-        
-        # Check for high-confidence fire incident keywords
-        for keyword in self.fire_incident_keywords:
-            if keyword in text_lower:
-                return True
-        
-        # Check for fire incident patterns
-        for pattern in self.compiled_incident_patterns:
-            if pattern.search(text):
-                return True
-        
-        # Check for fire descriptors only if they appear with context
-        descriptor_found = False
-        for descriptor in self.fire_descriptors:
-            if descriptor in text_lower:
-                descriptor_found = True
-                break
-        
-        # If descriptor found, check for additional context
-        if descriptor_found:
-            context_indicators = [
-                'emergency', 'disaster', 'damage', 'destroy', 'threat', 'danger',
-                'evacuate', 'evacuation', 'warn', 'alert', 'respond', 'response',
-                'incident', 'outbreak', 'spread', 'contain', 'suppress', 'extinguish',
-                'helicopter', 'aircraft', 'tanker', 'crew', 'personnel'
-            ]
-            
-            for indicator in context_indicators:
-                if indicator in text_lower:
-                    return True
-        
-        return False
+        # Same decision as checking exclusions, keywords, incident patterns and
+        # descriptors with context one by one, but in a single scan of the text
+        return self.matcher.is_fire_related(text)
     
     def extract_text_from_value(self, value: Any) -> str:
         """
@@ -288,6 +374,134 @@ class WildfireFilter:
         except Exception as e:
             return {'success': False, 'error': f'Error processing file: {str(e)}'}
     
+    def keep_item(self, item: Any) -> bool:
+        """
+        Decide whether one list element is kept, as filter_json_data does.
+        
+        Args:
+            item: List element to classify
+            
+        Returns:
+            bool: True for fire-related dictionaries and strings
+        """
+        if isinstance(item, dict):
+            return self.analyze_item(item)
+        if isinstance(item, str):
+            return self.is_fire_related(item)
+        return False
+    
+    def process_file_stream(self, input_file: str, output_file: str = None,
+                            block_size: int = 1 << 20) -> Dict[str, Any]:
+        """
+        Filter a JSON file in constant memory, writing matches as they are classified.
+        
+        Reads elements of a top-level list (or of lists under top-level keys) one at a
+        time. Output ending in .ndjson/.jsonl gets one kept element per line (keys of a
+        top-level object are not kept); any other output file receives the same JSON
+        structure filter_json_data would produce, streamed without indentation.
+        Counts follow count_items on the input and on the filtered data.
+        
+        Args:
+            input_file: Path to input JSON file
+            output_file: Path to output file (optional)
+            block_size: Characters read per block
+            
+        Returns:
+            Dictionary with statistics (and the first kept item as 'sample')
+        """
+        ndjson = bool(output_file) and output_file.endswith(('.ndjson', '.jsonl'))
+        out = None
+        try:
+            out = open(output_file, 'w', encoding='utf-8') if output_file else None
+            
+            def write(text: str) -> None:
+                if out:
+                    out.write(text)
+            
+            def emit(value: Any, prefix: str) -> None:
+                if ndjson:
+                    write(json.dumps(value, ensure_ascii=False) + '\n')
+                else:
+                    write(prefix + json.dumps(value, ensure_ascii=False))
+            
+            with open(input_file, 'r', encoding='utf-8') as f:
+                reader = JSONStreamReader(f, block_size)
+                root = reader.root_type()
+                original_count = filtered_count = 0
+                sample = None
+                entries = 0      # Entries written to the output list/object
+                open_key = None  # Key whose filtered list is currently open in the output
+                
+                if not ndjson and root in ('list', 'object'):
+                    write('[' if root == 'list' else '{')
+                
+                for kind, key, value in reader.events():
+                    if kind == 'root':
+                        original_count = 1 if value is not None else 0
+                        kept = value if self.is_fire_related(str(value)) else None
+                        filtered_count = 1 if kept is not None else 0
+                        if kept is not None or not ndjson:
+                            emit(kept, '')
+                        continue
+                    
+                    if kind == 'end':
+                        if open_key is not None and not ndjson:
+                            write('\n]')
+                        open_key = None
+                        continue
+                    
+                    # Nested objects count as one item, other non-list values not at all
+                    counted = kind == 'item' or isinstance(value, dict)
+                    original_count += counted
+                    if not self.keep_item(value):
+                        continue
+                    filtered_count += counted
+                    sample = value if sample is None else sample
+                    
+                    if root == 'list':
+                        emit(value, ',\n' if entries else '\n')
+                        entries += 1
+                    elif kind == 'value':
+                        name = json.dumps(key, ensure_ascii=False)
+                        emit(value, (',\n' if entries else '\n') + name + ': ')
+                        entries += 1
+                    elif open_key == key:
+                        emit(value, ',\n')
+                    else:
+                        # First kept element of this key: lists with no matches are omitted
+                        name = json.dumps(key, ensure_ascii=False)
+                        emit(value, (',\n' if entries else '\n') + name + ': [\n')
+                        entries += 1
+                        open_key = key
+                
+                if not ndjson and root in ('list', 'object'):
+                    write(('\n' if entries else '') + (']' if root == 'list' else '}'))
+            
+            if root == 'object':
+                # count_items on an object never reports fewer than one item
+                original_count = original_count or 1
+                filtered_count = filtered_count or 1
+            
+            return {
+                'success': True,
+                'original_count': original_count,
+                'filtered_count': filtered_count,
+                'removed_count': original_count - filtered_count,
+                'filtered_data': None,
+                'sample': sample,
+                'output_file': output_file
+            }
+            
+        except FileNotFoundError:
+            return {'success': False, 'error': f'File not found: {input_file}'}
+        except json.JSONDecodeError as e:
+            return {'success': False, 'error': f'Invalid JSON: {str(e)}'}
+        except Exception as e:
+            return {'success': False, 'error': f'Error processing file: {str(e)}'}
+        finally:
+            if out:
+                out.close()
+    
     def count_items(self, data: Union[List, Dict, Any]) -> int:
         """
         Count the number of items in the data structure.
@@ -312,15 +526,146 @@ class WildfireFilter:
         else:
             return 1 if data is not None else 0
 
+FILTERED_SUFFIX = '_fire_filtered'
+# Both filter paths read a single JSON document, so NDJSON/JSONL files are not picked up
+INPUT_EXTENSIONS = ('.json',)
+
+# One filter per batch worker process, built once by _init_worker
+_worker_filter = None
+
+def _init_worker() -> None:
+    global _worker_filter
+    _worker_filter = WildfireFilter()
+
+def _filter_one(job: Tuple[str, Optional[str], bool]) -> Dict[str, Any]:
+    input_file, output_file, stream = job
+    filter_tool = _worker_filter or WildfireFilter()
+    started = time.perf_counter()
+    if stream:
+        result = filter_tool.process_file_stream(input_file, output_file)
+    else:
+        result = filter_tool.process_file(input_file, output_file)
+    # Filtered items stay on disk; only statistics travel back to the parent process
+    result.pop('filtered_data', None)
+    result.pop('sample', None)
+    result['input_file'] = input_file
+    result['seconds'] = time.perf_counter() - started
+    return result
+
+def expand_inputs(patterns: List[str]) -> List[str]:
+    """
+    Expand files, directories and glob patterns into a sorted list of input files.
+    Directories contribute their .json files; earlier filter outputs are skipped.
+    
+    Args:
+        patterns: File paths, directory paths or glob patterns
+        
+    Returns:
+        List[str]: Unique input file paths
+    """
+    files = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = [os.path.join(pattern, name) for name in os.listdir(pattern)
+                       if os.path.splitext(name)[1].lower() in INPUT_EXTENSIONS]
+        elif glob.has_magic(pattern):
+            matches = glob.glob(pattern)
+        else:
+            matches = [pattern]
+        for path in matches:
+            if os.path.isdir(path) or os.path.splitext(path)[0].endswith(FILTERED_SUFFIX):
+                continue
+            files.add(path)
+    return sorted(files)
+
+def default_output_path(input_file: str, output_dir: str = None) -> str:
+    """Return <stem>_fire_filtered<suffix>, next to the input or inside output_dir"""
+    input_path = Path(input_file)
+    name = f"{input_path.stem}{FILTERED_SUFFIX}{input_path.suffix}"
+    return str(Path(output_dir) / name if output_dir else input_path.with_name(name))
+
+def is_up_to_date(input_file: str, output_file: str) -> bool:
+    """True when output_file exists and is not older than input_file"""
+    try:
+        return os.path.getmtime(output_file) >= os.path.getmtime(input_file)
+    except OSError:
+        return False
+
+def process_batch(input_files: List[str], output_dir: str = None, workers: int = None,
+                  stream: bool = False, force: bool = False, stats_only: bool = False) -> Dict[str, Any]:
+    """
+    Filter many files across a process pool, one WildfireFilter per worker.
+    
+    Args:
+        input_files: Input file paths (see expand_inputs)
+        output_dir: Directory for outputs (default: next to each input)
+        workers: Worker processes (default: CPU count; 1 runs in this process)
+        stream: Use process_file_stream instead of process_file
+        force: Reprocess files whose output is already up to date
+        stats_only: Do not write output files
+        
+    Returns:
+        Dictionary with per-file results, skipped files and aggregated counts
+        
+    Raises:
+        ValueError: If two inputs would be written to the same output file
+    """
+    outputs = {}
+    for input_file in input_files:
+        output_file = None if stats_only else default_output_path(input_file, output_dir)
+        if output_file in outputs:
+            raise ValueError(f"{outputs[output_file]} and {input_file} would both be written to {output_file}")
+        if output_file:
+            outputs[output_file] = input_file
+    
+    jobs = []
+    skipped = []
+    for input_file in input_files:
+        output_file = None if stats_only else default_output_path(input_file, output_dir)
+        if output_file and not force and is_up_to_date(input_file, output_file):
+            skipped.append(input_file)
+            continue
+        jobs.append((input_file, output_file, stream))
+    if output_dir and not stats_only:
+        os.makedirs(output_dir, exist_ok=True)
+    
+    workers = min(workers or os.cpu_count() or 1, len(jobs)) or 1
+    if workers == 1:
+        _init_worker()
+        results = [_filter_one(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            results = list(pool.map(_filter_one, jobs))
+    
+    succeeded = [r for r in results if r['success']]
+    return {
+        'files': results,
+        'skipped': skipped,
+        'workers': workers,
+        'failed_count': len(results) - len(succeeded),
+        'original_count': sum(r['original_count'] for r in succeeded),
+        'filtered_count': sum(r['filtered_count'] for r in succeeded),
+        'removed_count': sum(r['removed_count'] for r in succeeded),
+    }
+
 def main():
     parser = argparse.ArgumentParser(description='Filter JSON files for wildfire/fire-related content')
-    parser.add_argument('input_file', help='Input JSON file path')
-    parser.add_argument('-o', '--output', help='Output JSON file path')
+    parser.add_argument('inputs', nargs='+',
+                        help='Input JSON file path; several files, directories or glob patterns run in batch mode')
+    parser.add_argument('-o', '--output', help='Output JSON file path (single file) or directory (batch mode)')
     parser.add_argument('-v', '--verbose', action='store_true', help='Verbose output')
     parser.add_argument('--stats-only', action='store_true', help='Show statistics only, no output file')
+    parser.add_argument('--stream', action='store_true',
+                        help='Filter in constant memory, writing matches as they are found (.ndjson/.jsonl output for NDJSON)')
+    parser.add_argument('-j', '--workers', type=int, help='Batch mode worker processes (default: CPU count)')
+    parser.add_argument('--force', action='store_true', help='Batch mode: reprocess files whose output is up to date')
     
     args = parser.parse_args()
     
+    if len(args.inputs) > 1 or not os.path.isfile(args.inputs[0]):
+        return run_batch(args)
+    args.input_file = args.inputs[0]
+    
     # Initialize filter
     filter_tool = WildfireFilter()
     
@@ -334,7 +679,10 @@ def main():
         output_file = None
     
     # Process file
-    result = filter_tool.process_file(args.input_file, output_file)
+    if args.stream:
+        result = filter_tool.process_file_stream(args.input_file, output_file)
+    else:
+        result = filter_tool.process_file(args.input_file, output_file)
     
     if result['success']:
         print(f"✅ Processing completed successfully!")
@@ -350,7 +698,9 @@ def main():
         if args.verbose and result['filtered_count'] > 0:
             print(f"\n🔍 Sample of filtered data:")
             sample_data = result['filtered_data']
-            if isinstance(sample_data, list) and len(sample_data) > 0:
+            if sample_data is None:
+                print(json.dumps(result['sample'], indent=2)[:500] + "...")
+            elif isinstance(sample_data, list) and len(sample_data) > 0:
                 print(json.dumps(sample_data[0], indent=2)[:500] + "...")
             elif isinstance(sample_data, dict):
                 print(json.dumps(sample_data, indent=2)[:500] + "...")
@@ -360,6 +710,47 @@ def main():
     
     return 0
 
+def run_batch(args) -> int:
+    input_files = expand_inputs(args.inputs)
+    if not input_files:
+        print(f"❌ Error: No input files found for: {' '.join(args.inputs)}")
+        return 1
+    
+    started = time.perf_counter()
+    try:
+        batch = process_batch(input_files, output_dir=args.output, workers=args.workers, stream=args.stream,
+                              force=args.force, stats_only=args.stats_only)
+    except ValueError as e:
+        print(f"❌ Error: Output collision: {e}")
+        return 1
+    elapsed = time.perf_counter() - started
+    
+    for result in batch['files']:
+        name = result['input_file']
+        if result['success']:
+            original = result['original_count']
+            rate = result['filtered_count'] / original * 100 if original else 0.0
+            print(f"📄 {name}: {result['filtered_count']}/{original} kept ({rate:.1f}%) in {result['seconds']:.2f}s")
+            if args.verbose and result['output_file']:
+                print(f"   💾 {result['output_file']}")
+        else:
+            print(f"❌ {name}: {result['error']}")
+    for name in batch['skipped']:
+        print(f"⏭️  {name}: output up to date")
+    
+    processed = len(batch['files']) - batch['failed_count']
+    print(f"✅ Batch completed in {elapsed:.2f}s with {batch['workers']} worker(s)")
+    print(f"📊 Statistics:")
+    print(f"   Files processed: {processed}")
+    print(f"   Files skipped (up to date): {len(batch['skipped'])}")
+    print(f"   Files failed: {batch['failed_count']}")
+    print(f"   Original items: {batch['original_count']}")
+    print(f"   Fire-related items: {batch['filtered_count']}")
+    print(f"   Removed items: {batch['removed_count']}")
+    if batch['original_count']:
+        print(f"   Retention rate: {batch['filtered_count']/batch['original_count']*100:.1f}%")
+    return 1 if batch['failed_count'] else 0
+
 if __name__ == "__main__":
     exit(main())
 
@@ -377,6 +768,12 @@ python wildfire_filter.py data.json -v
 # Statistics only (no output file)
 python wildfire_filter.py data.json --stats-only
 
+# Batch mode: every JSON file in a directory, 4 worker processes, outputs in filtered/
+python wildfire_filter.py "Web Scraped EX" -j 4 -o filtered
+
+# Batch mode with a glob; files whose output is newer than the input are skipped
+python wildfire_filter.py "Web Scraped EX/*_Fire_News*.json" --stream
+
 # Example programmatic usage:
 filter_tool = WildfireFilter()
 result = filter_tool.process_file('emergency_reports.json', 'fire_reports.json')
@@ -1,8 +1,96 @@
+import argparse
+import gzip
+import heapq
+import io
 import json
+import os
+import tempfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 from datetime import datetime, timedelta
 import random
 
+# Hawaiian Islands with specific coordinates and fire characteristics
+HAWAIIAN_ISLANDS = [
+    {
+        'name': 'Hawaii (Big Island)',
+        'lat_min': 18.91, 'lat_max': 20.27,
+        'lon_min': -156.07, 'lon_max': -154.81,
+        'weight': 0.35,  # Highest fire activity due to size and lava zones
+        'fire_intensity': 'high',  # Volcanic activity and dry leeward sides
+        'elevation_factor': 1.2  # Higher elevation areas more fire-prone
+    },
+    {
+        'name': 'Maui',
+        'lat_min': 20.57, 'lat_max': 21.03,
+        'lon_min': -156.69, 'lon_max': -155.99,
+        'weight': 0.25,
+        'fire_intensity': 'high',  # Recent devastating fires (Lahaina area)
+        'elevation_factor': 1.15
+    },
+    {
+        'name': 'Oahu',
+        'lat_min': 21.25, 'lat_max': 21.71,
+        'lon_min': -158.29, 'lon_max': -157.64,
+        'weight': 0.20,
+        'fire_intensity': 'medium',
+        'elevation_factor': 1.1
+    },
+    {
+        'name': 'Kauai',
+        'lat_min': 21.87, 'lat_max': 22.23,
+        'lon_min': -159.78, 'lon_max': -159.31,
+        'weight': 0.10,
+        'fire_intensity': 'medium',
+        'elevation_factor': 1.05
+    },
+    {
+        'name': 'Molokai',
+        'lat_min': 21.13, 'lat_max': 21.21,
+        'lon_min': -157.33, 'lon_max': -156.75,
+        'weight': 0.05,
+        'fire_intensity': 'low',
+        'elevation_factor': 1.0
+    },
+    {
+        'name': 'Lanai',
+        'lat_min': 20.72, 'lat_max': 20.86,
+        'lon_min': -157.07, 'lon_max': -156.86,
+        'weight': 0.03,
+        'fire_intensity': 'low',
+        'elevation_factor': 1.0
+    },
+    {
+        'name': 'Kahoolawe',
+        'lat_min': 20.52, 'lat_max': 20.58,
+        'lon_min': -156.69, 'lon_max': -156.54,
+        'weight': 0.02,
+        'fire_intensity': 'low',
+        'elevation_factor': 0.9
+    }
+]
+
+# Hourly detection weights (Hawaii fires often in afternoon due to trade winds)
+HOUR_WEIGHTS = np.array([0.01, 0.01, 0.01, 0.01, 0.02, 0.03, 0.04, 0.05,
+                         0.06, 0.07, 0.08, 0.09, 0.11, 0.13, 0.15, 0.14,
+                         0.12, 0.10, 0.08, 0.06, 0.04, 0.03, 0.02, 0.01])
+HOUR_WEIGHTS = HOUR_WEIGHTS / np.sum(HOUR_WEIGHTS)
+
+CONFIDENCE_CLASSES = np.array(['l', 'n', 'h'])
+SATELLITE_OPTIONS = np.array(['N20', 'N21', 'NOAA-20', 'NOAA-21'])
+
+# Fraction of seasonal draws kept, indexed by month - 1 (seasonal_factor / 2.5)
+SEASONAL_KEEP = np.array([0.3 if m in (11, 12, 1, 2, 3) else 2.0 for m in range(1, 13)]) / 2.5
+
+# 'HHMM' acquisition time string for every minute of the day
+ACQ_TIME_STRINGS = np.array([f'{m // 60:02d}{m % 60:02d}' for m in range(24 * 60)])
+
+# Column order of a generated record
+RECORD_FIELDS = ['latitude', 'longitude', 'acq_date', 'acq_time', 'confidence', 'instrument',
+                 'daynight', 'scan', 'satellite', 'bright_t31', 'version', 'track',
+                 'brightness', 'frp']
+
 def generate_hawaii_viirs_fire_sample_json(start_date='2024-04-01', end_date='2024-06-30', num_fires=500):
     """
     Generate sample NASA VIIRS fire detection data specifically for Hawaiian Islands in JSON format
@@ -21,65 +109,7 @@ def generate_hawaii_viirs_fire_sample_json(start_date='2024-04-01', end_date='20
     end = datetime.strptime(end_date, '%Y-%m-%d')
     date_range = (end - start).days
     
-    # Hawaiian Islands with specific coordinates and fire characteristics
-    hawaiian_islands = [
-        {
-            'name': 'Hawaii (Big Island)',
-            'lat_min': 18.91, 'lat_max': 20.27,
-            'lon_min': -156.07, 'lon_max': -154.81,
-            'weight': 0.35,  # Highest fire activity due to size and lava zones
-            'fire_intensity': 'high',  # Volcanic activity and dry leeward sides
-            'elevation_factor': 1.2  # Higher elevation areas more fire-prone
-        },
-        {
-            'name': 'Maui',
-            'lat_min': 20.57, 'lat_max': 21.03,
-            'lon_min': -156.69, 'lon_max': -155.99,
-            'weight': 0.25,
-            'fire_intensity': 'high',  # Recent devastating fires (Lahaina area)
-            'elevation_factor': 1.15
-        },
-        {
-            'name': 'Oahu',
-            'lat_min': 21.25, 'lat_max': 21.71,
-            'lon_min': -158.29, 'lon_max': -157.64,
-            'weight': 0.20,
-            'fire_intensity': 'medium',
-            'elevation_factor': 1.1
-        },
-        {
-            'name': 'Kauai',
-            'lat_min': 21.87, 'lat_max': 22.23,
-            'lon_min': -159.78, 'lon_max': -159.31,
-            'weight': 0.10,
-            'fire_intensity': 'medium',
-            'elevation_factor': 1.05
-        },
-        {
-            'name': 'Molokai',
-            'lat_min': 21.13, 'lat_max': 21.21,
-            'lon_min': -157.33, 'lon_max': -156.75,
-            'weight': 0.05,
-            'fire_intensity': 'low',
-            'elevation_factor': 1.0
-        },
-        {
-            'name': 'Lanai',
-            'lat_min': 20.72, 'lat_max': 20.86,
-            'lon_min': -157.07, 'lon_max': -156.86,
-            'weight': 0.03,
-            'fire_intensity': 'low',
-            'elevation_factor': 1.0
-        },
-        {
-            'name': 'Kahoolawe',
-            'lat_min': 20.52, 'lat_max': 20.58,
-            'lon_min': -156.69, 'lon_max': -156.54,
-            'weight': 0.02,
-            'fire_intensity': 'low',
-            'elevation_factor': 0.9
-        }
-    ]
+    hawaiian_islands = HAWAIIAN_ISLANDS
     
     data = []
     
@@ -205,6 +235,223 @@ def generate_hawaii_viirs_fire_sample_json(start_date='2024-04-01', end_date='20
     
     return data
 
+def _draw_viirs_batch(rng, start, day_lo, day_hi, num_draws):
+    """
+    Draw num_draws candidate detections on days [day_lo, day_hi) after start and
+    return the seasonally thinned survivors as unsorted column arrays.
+    """
+    # Dates first: seasonal thinning is independent of everything else, so the
+    # rejected draws never pay for the remaining attributes
+    day_offsets = rng.integers(day_lo, day_hi, size=num_draws)
+    fire_days = np.datetime64(start.date(), 'D') + day_offsets
+    months = fire_days.astype('datetime64[M]').astype(np.int64) % 12
+    keep = rng.random(num_draws) <= SEASONAL_KEEP[months]
+    fire_days = fire_days[keep]
+    n = len(fire_days)
+
+    # Islands and coordinates (70% of fires biased towards leeward sides)
+    weights = np.array([isl['weight'] for isl in HAWAIIAN_ISLANDS])
+    island_idx = rng.choice(len(HAWAIIAN_ISLANDS), size=n, p=weights / weights.sum())
+    lat_min = np.array([isl['lat_min'] for isl in HAWAIIAN_ISLANDS])[island_idx]
+    lat_max = np.array([isl['lat_max'] for isl in HAWAIIAN_ISLANDS])[island_idx]
+    lon_min = np.array([isl['lon_min'] for isl in HAWAIIAN_ISLANDS])[island_idx]
+    lon_max = np.array([isl['lon_max'] for isl in HAWAIIAN_ISLANDS])[island_idx]
+
+    leeward = rng.random(n) < 0.7
+    latitude = np.where(
+        leeward,
+        rng.triangular(lat_min, lat_min + (lat_max - lat_min) * 0.3, lat_max),
+        rng.uniform(lat_min, lat_max)
+    )
+    longitude = np.where(
+        leeward,
+        rng.triangular(lon_min, lon_min + (lon_max - lon_min) * 0.3, lon_max),
+        rng.uniform(lon_min, lon_max)
+    )
+
+    # Time of day
+    hour = rng.choice(24, size=n, p=HOUR_WEIGHTS)
+    minute = rng.integers(0, 60, size=n)
+
+    # Confidence, FRP and brightness by island intensity
+    high = np.array([isl['fire_intensity'] == 'high' for isl in HAWAIIAN_ISLANDS])[island_idx]
+    u = rng.random(n)
+    p_low = np.where(high, 0.02, 0.05)
+    p_nominal = np.where(high, 0.48, 0.55)
+    confidence_idx = (u >= p_low).astype(np.int8) + (u >= p_low + p_nominal)
+
+    base_frp = np.where(high, 15.0, 8.0)
+    frp = np.maximum(0.1, rng.lognormal(mean=np.log(base_frp), sigma=1.0))
+    big_island = island_idx == 0
+    surge = big_island & (rng.random(n) < 0.15)
+    frp = np.where(surge, frp * rng.uniform(2.0, 5.0, size=n), frp)
+
+    bright_t31 = rng.uniform(280, 340, size=n) + frp * 0.2
+    brightness = bright_t31 + rng.uniform(15, 35, size=n)
+
+    satellite_idx = rng.integers(0, len(SATELLITE_OPTIONS), size=n)
+    scan = rng.uniform(0.3, 0.8, size=n)
+    track = rng.uniform(0.3, 0.8, size=n)
+
+    # Day/Night flag (Hawaii is about 10 hours behind UTC)
+    hawaii_hour = (hour - 10) % 24
+    day = (hawaii_hour >= 6) & (hawaii_hour <= 18)
+
+    return {
+        'acq_datetime': fire_days.astype('datetime64[m]') + (hour * 60 + minute).astype('timedelta64[m]'),
+        'latitude': np.round(latitude, 5),
+        'longitude': np.round(longitude, 5),
+        'hour': hour,
+        'minute': minute,
+        'confidence': CONFIDENCE_CLASSES[confidence_idx],
+        'daynight': np.where(day, 'D', 'N'),
+        'scan': np.round(scan, 2),
+        'satellite': SATELLITE_OPTIONS[satellite_idx],
+        'bright_t31': np.round(bright_t31, 2),
+        'track': np.round(track, 2),
+        'brightness': np.round(brightness, 2),
+        'frp': np.round(frp, 2)
+    }
+
+def _finish_viirs_columns(columns):
+    """Sort raw batch columns by acquisition time and add the string date/time columns"""
+    # Stable sort keeps draw order for equal (acq_date, acq_time) like list.sort does
+    order = np.argsort(columns['acq_datetime'], kind='stable')
+    columns = {key: value[order] for key, value in columns.items()}
+    minute_of_day = columns.pop('hour') * 60 + columns.pop('minute')
+    # Format through lookup tables: one string per day in range and per minute of day
+    day_num = columns['acq_datetime'].astype('datetime64[D]').astype(np.int64)
+    n = len(day_num)
+    first_day = day_num[0] if n else 0
+    last_day = day_num[-1] if n else 0
+    day_strings = np.arange(first_day, last_day + 1).astype('datetime64[D]').astype('U10')
+    columns['acq_date'] = day_strings[day_num - first_day]
+    columns['acq_time'] = ACQ_TIME_STRINGS[minute_of_day]
+    columns['instrument'] = np.full(n, 'VIIRS')
+    columns['version'] = np.full(n, '2.0NRT')
+    return columns
+
+def batch_to_records(columns):
+    """Convert batch columns into the list-of-dicts format of generate_hawaii_viirs_fire_sample_json"""
+    values = [columns[field].tolist() for field in RECORD_FIELDS]
+    return [dict(zip(RECORD_FIELDS, row)) for row in zip(*values)]
+
+def generate_hawaii_viirs_fire_batch(start_date='2024-04-01', end_date='2024-06-30', num_fires=500,
+                                     seed=None, as_records=False):
+    """
+    Vectorized version of generate_hawaii_viirs_fire_sample_json for large load-test feeds.
+    
+    Every attribute is drawn for the whole batch at once and the seasonal rejection is
+    applied as a mask, so the output follows the same distributions as the per-record
+    generator (num_fires is the number of draws before seasonal thinning).
+    
+    Parameters:
+    - start_date: Start date for the dataset (YYYY-MM-DD)
+    - end_date: End date for the dataset (YYYY-MM-DD)
+    - num_fires: Number of fire detection draws to generate
+    - seed: Seed or np.random.Generator for reproducible output (None for fresh entropy)
+    - as_records: Return a list of dictionaries instead of column arrays
+    
+    Returns:
+    - Dictionary of NumPy column arrays sorted by acquisition time (RECORD_FIELDS plus
+      'acq_datetime'), or a list of record dictionaries when as_records is True
+    """
+    start = datetime.strptime(start_date, '%Y-%m-%d')
+    end = datetime.strptime(end_date, '%Y-%m-%d')
+    rng = np.random.default_rng(seed)
+    
+    columns = _finish_viirs_columns(_draw_viirs_batch(rng, start, 0, (end - start).days, num_fires))
+    
+    if as_records:
+        return batch_to_records(columns)
+    return columns
+
+def _shard_plan(start_date, end_date, num_fires, seed, shard_days):
+    """
+    Split the date range into fixed shards with their draw counts and RNG streams.
+    
+    The plan only depends on the arguments (never on the worker count): the root
+    SeedSequence spawns one child for the multinomial split of num_fires across shards
+    and one independent child per shard.
+    """
+    start = datetime.strptime(start_date, '%Y-%m-%d')
+    end = datetime.strptime(end_date, '%Y-%m-%d')
+    date_range = (end - start).days
+    if date_range <= 0:
+        raise ValueError("end_date must be after start_date")
+    
+    bounds = list(range(0, date_range, shard_days)) + [date_range]
+    shard_ranges = list(zip(bounds[:-1], bounds[1:]))
+    
+    root = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    split_seq, *shard_seqs = root.spawn(len(shard_ranges) + 1)
+    day_share = np.array([hi - lo for lo, hi in shard_ranges]) / date_range
+    counts = np.random.default_rng(split_seq).multinomial(num_fires, day_share)
+    
+    return [(start, lo, hi, int(n), seq) for (lo, hi), n, seq in zip(shard_ranges, counts, shard_seqs)]
+
+def _generate_shard(shard):
+    start, day_lo, day_hi, num_draws, seed_seq = shard
+    rng = np.random.default_rng(seed_seq)
+    return _finish_viirs_columns(_draw_viirs_batch(rng, start, day_lo, day_hi, num_draws))
+
+def _generate_encoded_shard(shard):
+    # Serialize in the worker so JSON encoding scales with the pool as well
+    return _encode_records(batch_to_records(_generate_shard(shard)))
+
+def iter_hawaii_viirs_fire_shards(start_date='2024-04-01', end_date='2024-06-30', num_fires=500,
+                                  seed=None, workers=None, shard_days=7, _shard_fn=_generate_shard):
+    """
+    Generate the dataset in date-range shards on a process pool.
+    
+    Each shard covers shard_days consecutive days and draws from its own
+    SeedSequence-spawned generator. Shards are time-sorted and cover disjoint, ordered
+    date ranges, so emitting them in shard order is the merge. The same seed and
+    shard_days give identical output for any number of workers.
+    
+    Parameters:
+    - start_date, end_date, num_fires: As for generate_hawaii_viirs_fire_batch
+    - seed: Integer seed or np.random.SeedSequence (None for fresh entropy)
+    - workers: Number of worker processes (None for os.cpu_count(), 1 runs in-process)
+    - shard_days: Number of days per shard
+    
+    Yields:
+    - Column dictionaries (as generate_hawaii_viirs_fire_batch) in time order
+    """
+    plan = _shard_plan(start_date, end_date, num_fires, seed, shard_days)
+    workers = workers or os.cpu_count() or 1
+    
+    if workers == 1:
+        for shard in plan:
+            yield _shard_fn(shard)
+        return
+    
+    # Keep a bounded window of shards in flight so finished results do not pile up
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = []
+        for shard in plan:
+            pending.append(executor.submit(_shard_fn, shard))
+            if len(pending) >= 2 * workers:
+                yield pending.pop(0).result()
+        for future in pending:
+            yield future.result()
+
+def generate_hawaii_viirs_fire_parallel(start_date='2024-04-01', end_date='2024-06-30', num_fires=500,
+                                        seed=None, workers=None, shard_days=7, as_records=False):
+    """
+    Multi-process version of generate_hawaii_viirs_fire_batch (see iter_hawaii_viirs_fire_shards).
+    
+    Returns:
+    - Dictionary of column arrays sorted by acquisition time, or a list of record
+      dictionaries when as_records is True
+    """
+    shards = list(iter_hawaii_viirs_fire_shards(start_date, end_date, num_fires, seed=seed,
+                                                workers=workers, shard_days=shard_days))
+    columns = {key: np.concatenate([shard[key] for shard in shards]) for key in shards[0]}
+    if as_records:
+        return batch_to_records(columns)
+    return columns
+
 def save_hawaii_dataset_json(data, filename='hawaii_viirs_fire_sample.json'):
     """Save the Hawaii dataset to JSON file"""
     with open(filename, 'w') as f:
@@ -216,104 +463,362 @@ def save_hawaii_dataset_json(data, filename='hawaii_viirs_fire_sample.json'):
         dates = [record['acq_date'] for record in data]
         print(f"Date range: {min(dates)} to {max(dates)}")
 
+def iter_hawaii_viirs_fire_chunks(start_date='2024-04-01', end_date='2024-06-30', num_fires=500,
+                                  chunk_size=100_000, seed=None):
+    """
+    Generate the Hawaii dataset as a stream of fixed-size chunks.
+    
+    Each chunk is one generate_hawaii_viirs_fire_batch call over chunk_size draws, so memory
+    stays bounded by chunk_size no matter how large num_fires is. Chunks are sorted by
+    acquisition time internally; use merge_sorted_chunks for a globally sorted stream.
+    
+    Parameters:
+    - start_date, end_date, num_fires: As for generate_hawaii_viirs_fire_batch
+    - chunk_size: Number of draws per chunk
+    - seed: Seed or np.random.Generator shared by all chunks
+    
+    Yields:
+    - Lists of record dictionaries
+    """
+    rng = np.random.default_rng(seed)
+    remaining = num_fires
+    while remaining > 0:
+        draws = min(chunk_size, remaining)
+        remaining -= draws
+        chunk = generate_hawaii_viirs_fire_batch(start_date, end_date, draws, seed=rng, as_records=True)
+        if chunk:
+            yield chunk
+
+def _record_sort_key(record):
+    return record['acq_date'], record['acq_time']
+
+def _write_run(records, path):
+    with open(path, 'w', buffering=1 << 20) as f:
+        for record in records:
+            f.write(json.dumps(record, separators=(',', ':')))
+            f.write('\n')
+
+def _read_run(path):
+    with open(path, 'r', buffering=1 << 20) as f:
+        for line in f:
+            yield json.loads(line)
+
+def merge_sorted_chunks(chunks, tmp_dir=None, max_open_runs=128):
+    """
+    Merge chunks that are each sorted by acquisition time into one sorted record stream.
+    
+    Every chunk is spilled to a temporary NDJSON run file and the runs are combined with a
+    k-way heap merge, so only one record per run is held in memory. Runs beyond
+    max_open_runs are pre-merged in groups to stay under the open file limit. Ties keep
+    chunk order, which makes the result identical to a stable sort of the whole dataset.
+    
+    Parameters:
+    - chunks: Iterable of record lists, each sorted by (acq_date, acq_time)
+    - tmp_dir: Directory for the run files (system temp directory by default)
+    - max_open_runs: Maximum number of run files merged at once
+    
+    Yields:
+    - Record dictionaries in (acq_date, acq_time) order
+    """
+    with tempfile.TemporaryDirectory(prefix='viirs_runs_', dir=tmp_dir) as run_dir:
+        runs = []
+        for chunk in chunks:
+            path = os.path.join(run_dir, f'run_{len(runs):06d}.ndjson')
+            _write_run(chunk, path)
+            runs.append(path)
+        
+        generation = 0
+        while len(runs) > max_open_runs:
+            merged_runs = []
+            for i in range(0, len(runs), max_open_runs):
+                group = runs[i:i + max_open_runs]
+                path = os.path.join(run_dir, f'merge_{generation:03d}_{i:06d}.ndjson')
+                _write_run(heapq.merge(*(_read_run(run) for run in group), key=_record_sort_key), path)
+                for run in group:
+                    os.remove(run)
+                merged_runs.append(path)
+            runs = merged_runs
+            generation += 1
+        
+        yield from heapq.merge(*(_read_run(run) for run in runs), key=_record_sort_key)
+
+def _encode_records(records):
+    """Serialize records to compact JSON strings and return them with their date range"""
+    lines = [json.dumps(record, separators=(',', ':')) for record in records]
+    dates = [record['acq_date'] for record in records]
+    return lines, (min(dates) if dates else None), (max(dates) if dates else None)
+
+def _encode_record_blocks(records, block_size=10_000):
+    block = []
+    for record in records:
+        block.append(record)
+        if len(block) >= block_size:
+            yield _encode_records(block)
+            block = []
+    if block:
+        yield _encode_records(block)
+
+def _write_encoded_stream(blocks, filename, fmt=None, compress=None, buffer_size=1 << 20):
+    base = filename[:-3] if filename.endswith('.gz') else filename
+    if compress is None:
+        compress = filename.endswith('.gz')
+    if fmt is None:
+        fmt = 'ndjson' if base.endswith(('.ndjson', '.jsonl')) else 'json'
+    if fmt not in ('ndjson', 'json'):
+        raise ValueError(f"Unsupported format: {fmt}")
+    
+    if compress:
+        raw = gzip.open(filename, 'wb', compresslevel=6)
+    else:
+        raw = open(filename, 'wb')
+    
+    count = 0
+    first_date = last_date = None
+    separator = '\n' if fmt == 'ndjson' else ','
+    with io.TextIOWrapper(io.BufferedWriter(raw, buffer_size), encoding='utf-8') as f:
+        if fmt == 'json':
+            f.write('[')
+        for lines, block_first, block_last in blocks:
+            if not lines:
+                continue
+            if fmt == 'json' and count:
+                f.write(',')
+            f.write(separator.join(lines))
+            if fmt == 'ndjson':
+                f.write('\n')
+            count += len(lines)
+            if first_date is None or block_first < first_date:
+                first_date = block_first
+            if last_date is None or block_last > last_date:
+                last_date = block_last
+        if fmt == 'json':
+            f.write(']')
+    
+    print(f"Hawaii fire dataset streamed to {filename}")
+    print(f"Total Hawaiian fire detections: {count}")
+    if count:
+        print(f"Date range: {first_date} to {last_date}")
+    return count
+
+def save_hawaii_dataset_stream(records, filename='hawaii_viirs_fire_sample.ndjson', fmt=None,
+                               compress=None, buffer_size=1 << 20):
+    """
+    Stream records to disk without holding the dataset in memory.
+    
+    Parameters:
+    - records: Iterable of record dictionaries (e.g. merge_sorted_chunks output)
+    - filename: Output path
+    - fmt: 'ndjson' (one record per line) or 'json' (compact JSON array); inferred from
+      the filename when None (.ndjson/.jsonl -> ndjson, anything else -> json)
+    - compress: Write gzip output; inferred from a .gz suffix when None
+    - buffer_size: Size of the write buffer in bytes
+    
+    Returns:
+    - Number of records written
+    """
+    return _write_encoded_stream(_encode_record_blocks(records), filename, fmt=fmt,
+                                 compress=compress, buffer_size=buffer_size)
+
+ISLAND_NAMES = np.array([isl['name'] for isl in HAWAIIAN_ISLANDS] + ['Unknown'])
+_ISLAND_BOXES = np.array([[isl['lat_min'], isl['lat_max'], isl['lon_min'], isl['lon_max']]
+                          for isl in HAWAIIAN_ISLANDS])
+
+def classify_islands(latitudes, longitudes, block_size=1_000_000):
+    """
+    Label points with the Hawaiian island whose bounding box contains them.
+    
+    All island boxes are tested at once by broadcasting; the first matching island in
+    HAWAIIAN_ISLANDS order wins, like the original if/elif chain.
+    
+    Parameters:
+    - latitudes, longitudes: Array-likes of coordinates
+    - block_size: Points per broadcast block (bounds the temporary mask memory)
+    
+    Returns:
+    - Integer array of indexes into ISLAND_NAMES ('Unknown' for points outside every box)
+    """
+    lat = np.asarray(latitudes, dtype=np.float64)
+    lon = np.asarray(longitudes, dtype=np.float64)
+    codes = np.empty(len(lat), dtype=np.int8)
+    lat_min, lat_max, lon_min, lon_max = _ISLAND_BOXES.T
+    
+    for i in range(0, len(lat), block_size):
+        la = lat[i:i + block_size, None]
+        lo = lon[i:i + block_size, None]
+        inside = (la >= lat_min) & (la <= lat_max) & (lo >= lon_min) & (lo <= lon_max)
+        codes[i:i + block_size] = np.where(inside.any(axis=1), inside.argmax(axis=1), len(HAWAIIAN_ISLANDS))
+    return codes
+
+def _statistics_columns(data):
+    """Pull the columns used by the statistics out of records or a column dictionary"""
+    fields = ('latitude', 'longitude', 'acq_date', 'confidence', 'daynight', 'frp')
+    if isinstance(data, dict):
+        return [np.asarray(data[field]) for field in fields]
+    # One pass over the records; zip(*rows) transposes in C. String columns stay tuples
+    # because Counter/min/max handle them faster than NumPy unicode arrays
+    rows = map(lambda record: (record['latitude'], record['longitude'], record['acq_date'],
+                               record['confidence'], record['daynight'], record['frp']), data)
+    lat, lon, dates, confidence, daynight, frp = zip(*rows)
+    return [np.asarray(lat), np.asarray(lon), dates, confidence, daynight, np.asarray(frp)]
+
+def _value_counts(values):
+    if isinstance(values, np.ndarray):
+        keys, counts = np.unique(values, return_counts=True)
+        return {str(key): int(count) for key, count in zip(keys, counts)}
+    return dict(Counter(values))
+
+def _date_range(dates):
+    if isinstance(dates, np.ndarray):
+        days = dates.astype('datetime64[D]')
+        return str(days.min()), str(days.max())
+    return min(dates), max(dates)
+
+def compute_hawaii_statistics(data):
+    """
+    Compute island, confidence, day/night and FRP aggregates without modifying the data.
+    
+    Parameters:
+    - data: List of record dictionaries or a column dictionary from generate_hawaii_viirs_fire_batch
+    
+    Returns:
+    - Dictionary with 'total', 'date_range', 'islands', 'confidence', 'daynight' and 'frp'
+      entries plus the per-record 'island_codes' (indexes into ISLAND_NAMES), or None when
+      there is no data
+    """
+    # A column dictionary always has its keys; count its rows instead
+    if len(data['latitude'] if isinstance(data, dict) else data) == 0:
+        return None
+    
+    lat, lon, dates, confidence, daynight, frp = _statistics_columns(data)
+    island_codes = classify_islands(lat, lon)
+    island_counts = np.bincount(island_codes, minlength=len(ISLAND_NAMES))
+    frp = frp.astype(np.float64)
+    
+    return {
+        'total': len(lat),
+        'date_range': _date_range(dates),
+        'islands': {str(ISLAND_NAMES[i]): int(c) for i, c in enumerate(island_counts) if c},
+        'confidence': _value_counts(confidence),
+        'daynight': _value_counts(daynight),
+        'frp': {
+            'mean': float(frp.mean()),
+            'median': float(np.median(frp)),
+            'max': float(frp.max()),
+            'min': float(frp.min())
+        },
+        'island_codes': island_codes
+    }
+
 def generate_hawaii_statistics(data):
     """Generate and display statistics for the Hawaii fire data"""
-    if not data:
+    stats = compute_hawaii_statistics(data)
+    if stats is None:
         print("No data to analyze")
-        return
-    
-    # Island distribution (approximate based on coordinates)
-    def classify_island(lat, lon):
-        if 18.91 <= lat <= 20.27 and -156.07 <= lon <= -154.81:
-            return 'Hawaii (Big Island)'
-        elif 20.57 <= lat <= 21.03 and -156.69 <= lon <= -155.99:
-            return 'Maui'
-        elif 21.25 <= lat <= 21.71 and -158.29 <= lon <= -157.64:
-            return 'Oahu'
-        elif 21.87 <= lat <= 22.23 and -159.78 <= lon <= -159.31:
-            return 'Kauai'
-        elif 21.13 <= lat <= 21.21 and -157.33 <= lon <= -156.75:
-            return 'Molokai'
-        elif 20.72 <= lat <= 20.86 and -157.07 <= lon <= -156.86:
-            return 'Lanai'
-        elif 20.52 <= lat <= 20.58 and -156.69 <= lon <= -156.54:
-            return 'Kahoolawe'
-        else:
-            return 'Unknown'
-    
-    # Add island classification to data for analysis
-    for record in data:
-        record['island'] = classify_island(record['latitude'], record['longitude'])
+        return None
+    total = stats['total']
     
     print("\n=== Hawaii Fire Dataset Summary ===")
-    print(f"Total fire detections: {len(data)}")
-    
-    dates = [record['acq_date'] for record in data]
-    print(f"Date range: {min(dates)} to {max(dates)}")
+    print(f"Total fire detections: {total}")
+    print(f"Date range: {stats['date_range'][0]} to {stats['date_range'][1]}")
     
     # Island distribution
-    island_counts = {}
-    for record in data:
-        island = record['island']
-        island_counts[island] = island_counts.get(island, 0) + 1
-    
     print("\n=== Distribution by Hawaiian Island ===")
-    for island, count in sorted(island_counts.items()):
-        percentage = (count / len(data)) * 100
+    for island, count in sorted(stats['islands'].items()):
+        percentage = (count / total) * 100
         print(f"  {island}: {count} fires ({percentage:.1f}%)")
     
     # Confidence distribution
-    confidence_counts = {}
-    for record in data:
-        conf = record['confidence']
-        confidence_counts[conf] = confidence_counts.get(conf, 0) + 1
-    
     print("\n=== Confidence Distribution ===")
     conf_labels = {'l': 'Low', 'n': 'Nominal', 'h': 'High'}
-    for conf, count in sorted(confidence_counts.items()):
+    for conf, count in sorted(stats['confidence'].items()):
         label = conf_labels.get(conf, conf)
-        percentage = (count / len(data)) * 100
+        percentage = (count / total) * 100
         print(f"  {label}: {count} detections ({percentage:.1f}%)")
     
     # FRP statistics
-    frp_values = [record['frp'] for record in data]
     print(f"\n=== Fire Radiative Power Statistics ===")
-    print(f"Average FRP: {np.mean(frp_values):.2f} MW")
-    print(f"Median FRP: {np.median(frp_values):.2f} MW")
-    print(f"Max FRP: {max(frp_values):.2f} MW")
-    print(f"Min FRP: {min(frp_values):.2f} MW")
+    print(f"Average FRP: {stats['frp']['mean']:.2f} MW")
+    print(f"Median FRP: {stats['frp']['median']:.2f} MW")
+    print(f"Max FRP: {stats['frp']['max']:.2f} MW")
+    print(f"Min FRP: {stats['frp']['min']:.2f} MW")
     
     # Day/Night distribution
-    daynight_counts = {}
-    for record in data:
-        dn = record['daynight']
-        daynight_counts[dn] = daynight_counts.get(dn, 0) + 1
-    
     print("\n=== Day/Night Distribution ===")
     dn_labels = {'D': 'Day', 'N': 'Night'}
-    for dn, count in sorted(daynight_counts.items()):
+    for dn, count in sorted(stats['daynight'].items()):
         label = dn_labels.get(dn, dn)
-        percentage = (count / len(data)) * 100
+        percentage = (count / total) * 100
         print(f"  {label}: {count} detections ({percentage:.1f}%)")
     
     # Sample records
     print("\n=== Sample Records ===")
-    for i, record in enumerate(data[:5]):
+    if isinstance(data, dict):
+        sample = batch_to_records({field: data[field][:5] for field in RECORD_FIELDS})
+    else:
+        sample = data[:5]
+    for i, record in enumerate(sample):
+        island = ISLAND_NAMES[stats['island_codes'][i]]
         print(f"Record {i+1}:")
         print(f"  Date: {record['acq_date']} {record['acq_time']}")
-        print(f"  Location: {record['latitude']}, {record['longitude']} ({record['island']})")
+        print(f"  Location: {record['latitude']}, {record['longitude']} ({island})")
         print(f"  FRP: {record['frp']} MW, Confidence: {record['confidence']}")
         print()
+    
+    return stats
+
+def stream_hawaii_dataset(output, start_date='2024-04-01', end_date='2024-06-30', num_fires=500,
+                          chunk_size=100_000, seed=None, fmt=None, compress=None):
+    """Generate, merge and write a large dataset chunk by chunk with constant memory"""
+    chunks = iter_hawaii_viirs_fire_chunks(start_date, end_date, num_fires, chunk_size=chunk_size, seed=seed)
+    return save_hawaii_dataset_stream(merge_sorted_chunks(chunks), output, fmt=fmt, compress=compress)
+
+def stream_hawaii_dataset_parallel(output, start_date='2024-04-01', end_date='2024-06-30', num_fires=500,
+                                   seed=None, workers=None, shard_days=7, fmt=None, compress=None):
+    """Generate a large dataset on a process pool and write the shards in time order"""
+    blocks = iter_hawaii_viirs_fire_shards(start_date, end_date, num_fires, seed=seed, workers=workers,
+                                           shard_days=shard_days, _shard_fn=_generate_encoded_shard)
+    return _write_encoded_stream(blocks, output, fmt=fmt, compress=compress)
 
-# Generate the Hawaii-specific sample dataset
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Generate sample NASA VIIRS fire data for the Hawaiian Islands')
+    parser.add_argument('--start-date', default='2024-04-01', help='Start date (YYYY-MM-DD)')
+    parser.add_argument('--end-date', default='2024-06-30', help='End date (YYYY-MM-DD)')
+    parser.add_argument('--num-fires', type=int, default=500, help='Number of fire detection draws')
+    parser.add_argument('--stream', metavar='OUTPUT', help='Stream a large dataset to OUTPUT (.ndjson, .json, optionally .gz)')
+    parser.add_argument('--format', choices=['ndjson', 'json'], help='Streaming output format (default: from OUTPUT suffix)')
+    parser.add_argument('--gzip', action='store_true', default=None, help='Gzip the streamed output')
+    parser.add_argument('--chunk-size', type=int, default=100_000, help='Draws per streamed chunk (unseeded --stream without --workers)')
+    parser.add_argument('--seed', type=int, help='Random seed for reproducible output (seeded --stream runs are sharded, identical for any --workers)')
+    parser.add_argument('--workers', type=int, help='Generate date-range shards on this many processes (with --stream, default 1 when seeded)')
+    parser.add_argument('--shard-days', type=int, default=7, help='Days per parallel shard')
+    args = parser.parse_args()
+    if args.workers is not None and not args.stream:
+        parser.error('--workers requires --stream')
+    if args.workers is not None and args.workers < 1:
+        parser.error('--workers must be at least 1')
+    
+    if args.stream:
+        print(f"Streaming NASA VIIRS sample fire dataset for Hawaiian Islands to {args.stream}...")
+        if args.workers is not None or args.seed is not None:
+            # Seeded runs always use the shard plan so the output does not depend on --workers
+            stream_hawaii_dataset_parallel(args.stream, args.start_date, args.end_date, args.num_fires,
+                                           seed=args.seed, workers=args.workers or 1, shard_days=args.shard_days,
+                                           fmt=args.format, compress=args.gzip)
+        else:
+            stream_hawaii_dataset(args.stream, args.start_date, args.end_date, args.num_fires,
+                                  chunk_size=args.chunk_size, seed=args.seed, fmt=args.format, compress=args.gzip)
+        raise SystemExit(0)
+    
     print("Generating NASA VIIRS sample fire dataset for Hawaiian Islands (JSON format)...")
+    if args.seed is not None:
+        # The per-record generator draws from the global NumPy state
+        np.random.seed(args.seed)
     
     # Generate 3 months of Hawaii fire data
     hawaii_fire_data = generate_hawaii_viirs_fire_sample_json(
-        start_date='2024-04-01',
-        end_date='2024-06-30',
-        num_fires=500  # Adjust based on realistic Hawaii fire frequency
+        start_date=args.start_date,
+        end_date=args.end_date,
+        num_fires=args.num_fires  # Adjust based on realistic Hawaii fire frequency
     )
     
     # Display Hawaii-specific statistics
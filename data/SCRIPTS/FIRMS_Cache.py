@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+FIRMS Columnar Cache
+Converts FIRMS fire detection JSON into a compact columnar on-disk cache
+(.npy columns) and reopens it memory-mapped, so repeated map and analysis runs
+skip JSON parsing and share pages instead of building lists of dicts. The cache
+is rebuilt automatically when the source file's mtime/size or content hash changes.
+"""
+
+import argparse
+import calendar
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from array import array
+from datetime import datetime, timezone
+
+import numpy as np
+
+from FIRMS_Ingest import iter_firms_records
+
+CACHE_VERSION = 1
+DEFAULT_CACHE_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.firms_cache')
+
+# Fixed-width numeric columns: name -> (dtype, source fields in order of preference)
+NUMERIC_COLUMNS = {
+    'latitude': ('float32', ('latitude',)),
+    'longitude': ('float32', ('longitude',)),
+    'brightness': ('float32', ('brightness', 'bright_ti4')),
+    'frp': ('float32', ('frp',)),
+}
+# Low-cardinality string columns stored as int16 codes into a category list
+CATEGORICAL_COLUMNS = ('satellite', 'instrument', 'confidence', 'daynight')
+
+
+def file_sha256(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+_DAY_EPOCHS = {}
+
+
+def acq_epoch(acq_date, acq_time):
+    """Return UTC epoch seconds for a FIRMS acq_date ('YYYY-MM-DD') and acq_time (HHMM, str or int)"""
+    day = _DAY_EPOCHS.get(acq_date)
+    if day is None:
+        day = calendar.timegm(datetime.strptime(acq_date, '%Y-%m-%d').timetuple())
+        _DAY_EPOCHS[acq_date] = day
+    hhmm = int(acq_time)
+    return day + (hhmm // 100) * 3600 + (hhmm % 100) * 60
+
+
+def _cache_dir_for(source, cache_root):
+    source = os.path.abspath(source)
+    tag = hashlib.sha1(source.encode('utf-8')).hexdigest()[:12]
+    return os.path.join(cache_root, f"{os.path.basename(source)}.{tag}")
+
+
+class FirmsCache:
+    """
+    Memory-mapped columns of one FIRMS source file.
+
+    Attributes:
+    - columns: Dictionary of read-only np.memmap arrays ('latitude', 'longitude',
+      'brightness', 'frp' as float32, 'acq_epoch' as int64 and int16 codes for
+      CATEGORICAL_COLUMNS)
+    - categories: Dictionary mapping each categorical column to its list of values
+    - meta: Cache metadata (source stats, hash, record count)
+    """
+
+    def __init__(self, cache_dir):
+        with open(os.path.join(cache_dir, 'meta.json'), 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.cache_dir = cache_dir
+        self.categories = self.meta['categories']
+        self.columns = {}
+        for name in self.meta['columns']:
+            path = os.path.join(cache_dir, f'{name}.npy')
+            # Zero-length arrays cannot be mapped
+            self.columns[name] = np.load(path, mmap_mode='r' if self.meta['count'] else None)
+
+    def __len__(self):
+        return self.meta['count']
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def decode(self, name):
+        """Return a categorical column as an array of strings"""
+        values = np.array(self.categories[name] + [None], dtype=object)
+        return values[self.columns[name]]
+
+    def code(self, name, value):
+        """Return the integer code of a categorical value (-1 when it never occurs)"""
+        try:
+            return self.categories[name].index(value)
+        except ValueError:
+            return -1
+
+    def record(self, i):
+        """Rebuild the (normalized) detection dictionary at position i"""
+        record = {name: float(self.columns[name][i]) for name in NUMERIC_COLUMNS}
+        acquired = datetime.fromtimestamp(int(self.columns['acq_epoch'][i]), timezone.utc)
+        record['acq_date'] = acquired.strftime('%Y-%m-%d')
+        record['acq_time'] = acquired.strftime('%H%M')
+        for name in CATEGORICAL_COLUMNS:
+            code = int(self.columns[name][i])
+            record[name] = self.categories[name][code] if code >= 0 else None
+        return record
+
+
+def build_cache(source, cache_dir, source_hash=None):
+    """
+    Parse a FIRMS JSON file once and write its columnar cache to cache_dir.
+
+    Returns:
+    - Path of the written cache directory
+    """
+    stat = os.stat(source)
+    numeric = {name: array('f') for name in NUMERIC_COLUMNS}
+    epochs = array('q')
+    codes = {name: array('h') for name in CATEGORICAL_COLUMNS}
+    lookup = {name: {} for name in CATEGORICAL_COLUMNS}
+
+    for record in iter_firms_records(source):
+        for name, (_, fields) in NUMERIC_COLUMNS.items():
+            value = next((record[field] for field in fields if record.get(field) is not None), None)
+            numeric[name].append(float('nan') if value is None else float(value))
+        epochs.append(acq_epoch(record['acq_date'], record['acq_time']))
+        for name in CATEGORICAL_COLUMNS:
+            value = record.get(name)
+            if value is None:
+                codes[name].append(-1)
+                continue
+            value = str(value)
+            table = lookup[name]
+            if value not in table:
+                table[value] = len(table)
+            codes[name].append(table[value])
+
+    parent = os.path.dirname(os.path.abspath(cache_dir))
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix='.building-', dir=parent)
+    try:
+        columns = {}
+        for name, (dtype, _) in NUMERIC_COLUMNS.items():
+            columns[name] = np.frombuffer(numeric[name], dtype=np.float32).astype(dtype)
+        columns['acq_epoch'] = np.frombuffer(epochs, dtype=np.int64)
+        for name in CATEGORICAL_COLUMNS:
+            columns[name] = np.frombuffer(codes[name], dtype=np.int16)
+        for name, values in columns.items():
+            np.save(os.path.join(tmp_dir, f'{name}.npy'), values)
+
+        meta = {
+            'version': CACHE_VERSION,
+            'source': os.path.abspath(source),
+            'source_size': stat.st_size,
+            'source_mtime_ns': stat.st_mtime_ns,
+            'source_sha256': source_hash or file_sha256(source),
+            'count': len(epochs),
+            'columns': list(columns),
+            'categories': {name: list(lookup[name]) for name in CATEGORICAL_COLUMNS},
+        }
+        with open(os.path.join(tmp_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+
+        # Swap the finished directory in so readers never see a half-written cache
+        if os.path.isdir(cache_dir):
+            shutil.rmtree(cache_dir)
+        os.replace(tmp_dir, cache_dir)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return cache_dir
+
+
+def _cache_state(source, cache_dir, verify_hash):
+    """Return (is_valid, source_hash_if_computed) for an existing cache directory"""
+    meta_path = os.path.join(cache_dir, 'meta.json')
+    if not os.path.exists(meta_path):
+        return False, None
+    with open(meta_path, 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get('version') != CACHE_VERSION:
+        return False, None
+
+    stat = os.stat(source)
+    unchanged = meta['source_size'] == stat.st_size and meta['source_mtime_ns'] == stat.st_mtime_ns
+    if unchanged and not verify_hash:
+        return True, None
+
+    # Stats moved (or hashing forced): the content hash decides
+    source_hash = file_sha256(source)
+    if source_hash != meta['source_sha256']:
+        return False, source_hash
+    if not unchanged:
+        meta['source_size'] = stat.st_size
+        meta['source_mtime_ns'] = stat.st_mtime_ns
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+    return True, source_hash
+
+
+def load_firms(source, cache_root=DEFAULT_CACHE_ROOT, verify_hash=False, rebuild=False):
+    """
+    Open the columnar cache of a FIRMS JSON file, building or refreshing it when needed.
+
+    Parameters:
+    - source: FIRMS JSON file path (optionally .gz)
+    - cache_root: Directory that holds the per-source cache directories
+    - verify_hash: Hash the source on every load instead of trusting unchanged mtime/size
+    - rebuild: Force a rebuild
+
+    Returns:
+    - FirmsCache with memory-mapped columns
+    """
+    cache_dir = _cache_dir_for(source, cache_root)
+    valid, source_hash = (False, None) if rebuild else _cache_state(source, cache_dir, verify_hash)
+    if not valid:
+        build_cache(source, cache_dir, source_hash)
+    return FirmsCache(cache_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build or inspect the columnar cache of FIRMS JSON files')
+    parser.add_argument('input_files', nargs='+', help='FIRMS JSON files')
+    parser.add_argument('--cache-root', default=DEFAULT_CACHE_ROOT, help='Cache directory')
+    parser.add_argument('--verify-hash', action='store_true', help='Always compare content hashes')
+    parser.add_argument('--rebuild', action='store_true', help='Rebuild even if the cache is current')
+    args = parser.parse_args()
+
+    for path in args.input_files:
+        cache = load_firms(path, args.cache_root, verify_hash=args.verify_hash, rebuild=args.rebuild)
+        size = sum(column.nbytes for column in cache.columns.values())
+        print(f"🗂️  {path}: {len(cache)} detections, {size / 1024:.1f} KiB cached in {cache.cache_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
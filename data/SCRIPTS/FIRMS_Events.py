@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+FIRMS Fire Event Clustering
+Groups FIRMS detections into fire events (contiguous hotspots over time) with a
+running footprint, total FRP and first/last seen times. Clustering is incremental:
+each NRT batch only searches a spatio-temporal hash grid of recently active points,
+so a refresh costs time proportional to the new data, not the archive. Detections
+already clustered (overlapping fire_nrt_* pulls) are skipped.
+"""
+
+import argparse
+import heapq
+import json
+import math
+import os
+
+from FIRMS_Cache import acq_epoch
+from FIRMS_Ingest import detection_key, iter_firms_records
+
+KM_PER_DEG_LAT = 111.32
+
+
+class FireEventTracker:
+    """
+    Incremental DBSCAN-like clustering of detections into fire events.
+
+    Two detections are neighbours when they lie within eps_km of each other and at most
+    max_gap_hours apart. Events are the connected components of that neighbour graph
+    (DBSCAN with min_samples=2, i.e. single linkage); components with fewer than
+    min_points detections are treated as noise by event_summaries(). A new detection is hashed to
+    a grid cell of size eps_km and only compared with points in the 9 surrounding cells;
+    when it touches several events they are merged (union-find, the oldest id survives).
+    Points older than max_gap_hours before the newest detection can no longer link
+    anything and are evicted from the grid, so the grid is bounded by the active window.
+    Event summaries (and the union-find parents) are kept for every event ever seen, so
+    the rest of the state grows with the number of events, not detections.
+
+    update() skips detections whose key (FIRMS_Ingest.detection_key) is still in the
+    grid, and detections older than the active window it had before the batch: those
+    were either clustered by an earlier overlapping batch or arrived too late to link.
+    """
+
+    def __init__(self, eps_km=2.0, max_gap_hours=24, min_points=2, footprint_deg=0.01):
+        """
+        Parameters:
+        - eps_km: Neighbour distance in km
+        - max_gap_hours: Maximum time between neighbouring detections
+        - min_points: Minimum detections for an event to be reported
+        - footprint_deg: Cell size in degrees of the footprint raster
+        """
+        self.eps_km = eps_km
+        self.max_gap = max_gap_hours * 3600
+        self.min_points = min_points
+        self.footprint_deg = footprint_deg
+        self.lat_step = eps_km / KM_PER_DEG_LAT
+
+        self.events = {}        # event id -> summary dictionary
+        self._parent = {}       # union-find parents over event ids
+        self._cells = {}        # grid key -> list of [lat, lon, epoch, event id, detection key]
+        self._live_keys = set()  # detection keys of the points in the grid
+        self._expiry = []       # heap of (epoch, sequence, grid key, point)
+        self._sequence = 0
+        self._next_id = 1
+        self.latest_epoch = None
+        self.skipped = 0        # detections dropped by update() as already clustered or too late
+
+    # --- union-find -------------------------------------------------------
+
+    def find(self, event_id):
+        """Return the surviving event id an (possibly merged) event id now belongs to"""
+        root = event_id
+        while self._parent[root] != root:
+            root = self._parent[root]
+        while self._parent[event_id] != root:
+            self._parent[event_id], event_id = root, self._parent[event_id]
+        return root
+
+    def _merge(self, keep, other):
+        a, b = self.events[keep], self.events.pop(other)
+        self._parent[other] = keep
+        a['count'] += b['count']
+        a['frp_total'] += b['frp_total']
+        a['frp_max'] = max(a['frp_max'], b['frp_max'])
+        a['first_seen'] = min(a['first_seen'], b['first_seen'])
+        a['last_seen'] = max(a['last_seen'], b['last_seen'])
+        a['_lat_sum'] += b['_lat_sum']
+        a['_lon_sum'] += b['_lon_sum']
+        a['bbox'] = [min(a['bbox'][0], b['bbox'][0]), min(a['bbox'][1], b['bbox'][1]),
+                     max(a['bbox'][2], b['bbox'][2]), max(a['bbox'][3], b['bbox'][3])]
+        a['_footprint'] |= b['_footprint']
+        a['merged_ids'] = sorted(set(a['merged_ids']) | set(b['merged_ids']) | {other})
+
+    # --- grid -------------------------------------------------------------
+
+    def _lon_cell(self, row, longitude):
+        # Cells are sized per latitude row from the edge farthest from the equator, so
+        # they are never narrower than eps_km (see FIRMS_Merge.HotspotDeduplicator)
+        edge_lat = min(max(abs(row - 1), abs(row + 2)) * self.lat_step, 89.9)
+        return int(math.floor(longitude * math.cos(math.radians(edge_lat)) / self.lat_step))
+
+    def _distance_km(self, lat1, lon1, lat2, lon2):
+        dy = (lat1 - lat2) * KM_PER_DEG_LAT
+        dx = (lon1 - lon2) * KM_PER_DEG_LAT * math.cos(math.radians((lat1 + lat2) / 2))
+        return math.hypot(dx, dy)
+
+    def _neighbour_events(self, lat, lon, epoch):
+        found = set()
+        row = int(math.floor(lat / self.lat_step))
+        for r in (row - 1, row, row + 1):
+            col = self._lon_cell(r, lon)
+            for c in (col - 1, col, col + 1):
+                for p_lat, p_lon, p_epoch, p_event, _ in self._cells.get((r, c), ()):
+                    if abs(epoch - p_epoch) <= self.max_gap and \
+                            self._distance_km(lat, lon, p_lat, p_lon) <= self.eps_km:
+                        found.add(self.find(p_event))
+        return found
+
+    def _evict(self):
+        horizon = self.latest_epoch - self.max_gap
+        while self._expiry and self._expiry[0][0] < horizon:
+            _, _, key, point = heapq.heappop(self._expiry)
+            cell = self._cells[key]
+            cell.remove(point)
+            if not cell:
+                del self._cells[key]
+            self._live_keys.discard(point[4])
+
+    # --- updates ----------------------------------------------------------
+
+    def _new_event(self, lat, lon, epoch):
+        event_id = self._next_id
+        self._next_id += 1
+        self._parent[event_id] = event_id
+        self.events[event_id] = {
+            'event_id': event_id,
+            'count': 0,
+            'frp_total': 0.0,
+            'frp_max': 0.0,
+            'first_seen': epoch,
+            'last_seen': epoch,
+            'bbox': [lon, lat, lon, lat],
+            'merged_ids': [],
+            '_lat_sum': 0.0,
+            '_lon_sum': 0.0,
+            '_footprint': set(),
+        }
+        return event_id
+
+    def add(self, latitude, longitude, epoch, frp=0.0, key=None):
+        """
+        Add one detection and return the id of the event it belongs to.
+        key defaults to detection_key(epoch, latitude, longitude).
+        """
+        lat, lon = float(latitude), float(longitude)
+        touched = sorted(self._neighbour_events(lat, lon, epoch))
+        if touched:
+            event_id = touched[0]
+            for other in touched[1:]:
+                self._merge(event_id, other)
+        else:
+            event_id = self._new_event(lat, lon, epoch)
+
+        event = self.events[event_id]
+        event['count'] += 1
+        event['frp_total'] += frp or 0.0
+        event['frp_max'] = max(event['frp_max'], frp or 0.0)
+        event['first_seen'] = min(event['first_seen'], epoch)
+        event['last_seen'] = max(event['last_seen'], epoch)
+        event['_lat_sum'] += lat
+        event['_lon_sum'] += lon
+        bbox = event['bbox']
+        event['bbox'] = [min(bbox[0], lon), min(bbox[1], lat), max(bbox[2], lon), max(bbox[3], lat)]
+        event['_footprint'].add((math.floor(lat / self.footprint_deg), math.floor(lon / self.footprint_deg)))
+
+        row = int(math.floor(lat / self.lat_step))
+        point = [lat, lon, epoch, event_id, key if key is not None else detection_key(epoch, lat, lon)]
+        self._live_keys.add(point[4])
+        cell = (row, self._lon_cell(row, lon))
+        self._cells.setdefault(cell, []).append(point)
+        heapq.heappush(self._expiry, (epoch, self._sequence, cell, point))
+        self._sequence += 1
+        self.latest_epoch = epoch if self.latest_epoch is None else max(self.latest_epoch, epoch)
+        return event_id
+
+    def update(self, records):
+        """
+        Extend the events with a batch of FIRMS records (processed in acquisition order).
+        Detections already clustered or older than the active window are skipped (see
+        the class docstring) and counted in self.skipped.
+
+        Returns:
+        - Sorted list of the (surviving) event ids touched by this batch
+        """
+        batch = []
+        for r in records:
+            epoch, lat, lon = acq_epoch(r['acq_date'], r['acq_time']), float(r['latitude']), float(r['longitude'])
+            batch.append((epoch, lat, lon, float(r.get('frp') or 0.0),
+                          detection_key(epoch, lat, lon, r.get('satellite'))))
+        batch.sort(key=lambda item: item[0])
+        horizon = None if self.latest_epoch is None else self.latest_epoch - self.max_gap
+        touched = set()
+        for epoch, lat, lon, frp, key in batch:
+            if key in self._live_keys or (horizon is not None and epoch < horizon):
+                self.skipped += 1
+                continue
+            touched.add(self.add(lat, lon, epoch, frp, key))
+        if self.latest_epoch is not None:
+            self._evict()
+        return sorted({self.find(event_id) for event_id in touched})
+
+    # --- reporting --------------------------------------------------------
+
+    def summary(self, event_id):
+        """Return the public summary of one event"""
+        event = self.events[self.find(event_id)]
+        cell_km2 = (self.footprint_deg * KM_PER_DEG_LAT) ** 2
+        centroid_lat = event['_lat_sum'] / event['count']
+        result = {key: value for key, value in event.items() if not key.startswith('_')}
+        result.update({
+            'frp_total': round(event['frp_total'], 2),
+            'centroid': [round(event['_lon_sum'] / event['count'], 5), round(centroid_lat, 5)],
+            'footprint_cells': len(event['_footprint']),
+            'footprint_km2': round(len(event['_footprint']) * cell_km2 * math.cos(math.radians(centroid_lat)), 3),
+            'active': self.latest_epoch is not None and event['last_seen'] >= self.latest_epoch - self.max_gap,
+        })
+        return result
+
+    def event_summaries(self, active_only=False):
+        """Return summaries of every event with at least min_points detections"""
+        summaries = []
+        for event_id, event in self.events.items():
+            if event['count'] < self.min_points:
+                continue
+            summary = self.summary(event_id)
+            if active_only and not summary['active']:
+                continue
+            summaries.append(summary)
+        return sorted(summaries, key=lambda s: s['first_seen'])
+
+    # --- persistence ------------------------------------------------------
+
+    def save(self, path):
+        """Write the tracker state (events and active-window points) as JSON"""
+        events = {}
+        for event_id, event in self.events.items():
+            item = dict(event)
+            item['_footprint'] = sorted(item['_footprint'])
+            events[event_id] = item
+        state = {
+            'params': {'eps_km': self.eps_km, 'max_gap_hours': self.max_gap / 3600,
+                       'min_points': self.min_points, 'footprint_deg': self.footprint_deg},
+            'events': events,
+            'parent': self._parent,
+            'points': [point for _, _, _, point in sorted(self._expiry)],
+            'next_id': self._next_id,
+            'latest_epoch': self.latest_epoch,
+        }
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Restore a tracker written by save()"""
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        tracker = cls(**state['params'])
+        for event_id, event in state['events'].items():
+            event['_footprint'] = {tuple(cell) for cell in event['_footprint']}
+            tracker.events[int(event_id)] = event
+        tracker._parent = {int(k): v for k, v in state['parent'].items()}
+        tracker._next_id = state['next_id']
+        tracker.latest_epoch = state['latest_epoch']
+        for point in state['points']:
+            if len(point) == 4:
+                # State written before detection keys were stored
+                point.append(detection_key(point[2], point[0], point[1]))
+            tracker._live_keys.add(point[4])
+            row = int(math.floor(point[0] / tracker.lat_step))
+            key = (row, tracker._lon_cell(row, point[1]))
+            tracker._cells.setdefault(key, []).append(point)
+            heapq.heappush(tracker._expiry, (point[2], tracker._sequence, key, point))
+            tracker._sequence += 1
+        return tracker
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cluster FIRMS detections into fire events incrementally')
+    parser.add_argument('input_files', nargs='+', help='FIRMS JSON files, applied in order as NRT batches')
+    parser.add_argument('--state', help='Tracker state file to resume from and update')
+    parser.add_argument('-o', '--output', help='Write event summaries to this JSON file')
+    parser.add_argument('--eps-km', type=float, help='Neighbour distance in km (default 2)')
+    parser.add_argument('--max-gap-hours', type=float, help='Maximum time gap between neighbours (default 24)')
+    parser.add_argument('--min-points', type=int, help='Minimum detections per reported event (default 2)')
+    args = parser.parse_args()
+
+    requested = {'eps_km': args.eps_km, 'max_gap_hours': args.max_gap_hours, 'min_points': args.min_points}
+    requested = {name: value for name, value in requested.items() if value is not None}
+    if args.state and os.path.exists(args.state):
+        tracker = FireEventTracker.load(args.state)
+        # Saved events were clustered with the saved parameters; mixing them is not meaningful
+        saved = {'eps_km': tracker.eps_km, 'max_gap_hours': tracker.max_gap / 3600, 'min_points': tracker.min_points}
+        conflicts = [f"--{name.replace('_', '-')} {value} (state has {saved[name]})"
+                     for name, value in requested.items() if value != saved[name]]
+        if conflicts:
+            print(f"❌ Error: {args.state} was built with other clustering parameters: {', '.join(conflicts)}")
+            print("   Drop these flags to resume, or use a new --state file")
+            return 1
+    else:
+        tracker = FireEventTracker(**requested)
+
+    for path in args.input_files:
+        skipped = tracker.skipped
+        touched = tracker.update(iter_firms_records(path))
+        print(f"🛰️  {path}: {len(touched)} events updated, {tracker.skipped - skipped} detections skipped "
+              f"(already clustered or older than the active window)")
+
+    summaries = tracker.event_summaries()
+    active = sum(1 for s in summaries if s['active'])
+    print(f"🔥 {len(summaries)} fire events ({active} active)")
+    if args.state:
+        tracker.save(args.state)
+        print(f"💾 State saved to: {args.state}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(summaries, f, indent=2)
+        print(f"💾 Events saved to: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+FIRMS Streaming Ingest
+Parses FIRMS fire detection JSON arrays incrementally and applies bounding-box,
+date-range, confidence and satellite predicates while parsing, so only matching
+records are ever decoded into dictionaries (e.g. Hawaii-only extraction from
+national archives in constant memory).
+"""
+
+import argparse
+import gzip
+import json
+import math
+import re
+
+# Approximate Hawaii bounding box used by map.Rmd: (min_lon, min_lat, max_lon, max_lat)
+HAWAII_BBOX = (-161.0, 18.5, -154.0, 22.5)
+
+CONFIDENCE_RANK = {'l': 0, 'n': 1, 'h': 2}
+
+_NUMBER = r'(-?\d+(?:\.\d*)?(?:[eE][-+]?\d+)?)'
+_FIELD_PATTERNS = {
+    'latitude': re.compile(r'"latitude"\s*:\s*' + _NUMBER),
+    'longitude': re.compile(r'"longitude"\s*:\s*' + _NUMBER),
+    'acq_date': re.compile(r'"acq_date"\s*:\s*"([^"]*)"'),
+    'confidence': re.compile(r'"confidence"\s*:\s*"?([^",}\s]*)'),
+    'satellite': re.compile(r'"satellite"\s*:\s*"([^"]*)"'),
+}
+
+
+def confidence_class(value):
+    """
+    Normalize a FIRMS confidence value to 'l', 'n' or 'h'.
+
+    VIIRS products report the class letter directly, Landsat uses low/medium/high
+    ('m' maps to nominal) and MODIS reports 0-100 percent (low < 30, nominal 30-79,
+    high >= 80). Returns None for missing/unknown values.
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        text = value.strip().lower()
+        if text in CONFIDENCE_RANK:
+            return text
+        if text in ('m', 'medium'):
+            return 'n'
+        if text in ('low', 'nominal', 'high'):
+            return text[0]
+        try:
+            value = float(text)
+        except ValueError:
+            return None
+    if value < 30:
+        return 'l'
+    if value < 80:
+        return 'n'
+    return 'h'
+
+
+def detection_key(epoch, latitude, longitude, satellite=None):
+    """
+    Identity of one detection across overlapping downloads: acquisition epoch, position
+    rounded to 1e-4 degrees (about 10 m, well inside a sensor pixel) and satellite.
+    """
+    return f"{int(epoch)}|{float(latitude):.4f}|{float(longitude):.4f}|{satellite or ''}"
+
+
+class RecordFilter:
+    """
+    Detection predicates that can run on raw record text before decoding.
+
+    Parameters:
+    - bbox: (min_lon, min_lat, max_lon, max_lat), inclusive
+    - start_date, end_date: Inclusive 'YYYY-MM-DD' bounds on acq_date
+    - min_confidence: Minimum class ('l', 'n', 'h') or, for MODIS percentages, a number
+      (VIIRS classes are compared after converting the number with confidence_class)
+    - satellites: Iterable of satellite names to keep (e.g. {'N20', 'Terra'})
+    """
+
+    def __init__(self, bbox=None, start_date=None, end_date=None, min_confidence=None, satellites=None):
+        self.bbox = bbox
+        self.start_date = start_date
+        self.end_date = end_date
+        self.min_confidence = min_confidence
+        self.satellites = set(satellites) if satellites else None
+
+        self._fields = []
+        if bbox is not None:
+            self._fields += ['latitude', 'longitude']
+        if start_date is not None or end_date is not None:
+            self._fields.append('acq_date')
+        if min_confidence is not None:
+            self._fields.append('confidence')
+        if self.satellites is not None:
+            self._fields.append('satellite')
+
+    @property
+    def active(self):
+        return bool(self._fields)
+
+    def _confidence_ok(self, value):
+        threshold = self.min_confidence
+        if isinstance(threshold, (int, float)):
+            try:
+                return float(value) >= threshold
+            except (TypeError, ValueError):
+                threshold = confidence_class(threshold)
+        level = confidence_class(value)
+        return level is not None and CONFIDENCE_RANK[level] >= CONFIDENCE_RANK[confidence_class(threshold)]
+
+    def _check(self, get):
+        if self.bbox is not None:
+            lat, lon = get('latitude'), get('longitude')
+            if lat is None or lon is None:
+                return False
+            lat, lon = float(lat), float(lon)
+            min_lon, min_lat, max_lon, max_lat = self.bbox
+            if not (min_lat <= lat <= max_lat and min_lon <= lon <= max_lon):
+                return False
+        if self.start_date is not None or self.end_date is not None:
+            date = get('acq_date')
+            if date is None:
+                return False
+            if self.start_date is not None and date < self.start_date:
+                return False
+            if self.end_date is not None and date > self.end_date:
+                return False
+        if self.min_confidence is not None and not self._confidence_ok(get('confidence')):
+            return False
+        if self.satellites is not None and get('satellite') not in self.satellites:
+            return False
+        return True
+
+    def match_text(self, text):
+        """
+        Evaluate the predicates on the raw JSON text of one record.
+
+        Returns True/False, or None when a needed field cannot be read from the text
+        (the caller then decodes the record and uses match_record).
+        """
+        values = {}
+        for field in self._fields:
+            found = _FIELD_PATTERNS[field].search(text)
+            if found is None:
+                return None
+            values[field] = found.group(1)
+        return self._check(values.get)
+
+    def match_record(self, record):
+        """Evaluate the predicates on a decoded record dictionary"""
+        return self._check(record.get)
+
+
+def _open_text(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+def iter_json_objects(f, block_size=1 << 20):
+    """
+    Yield the raw text of each element of a top-level JSON array of objects.
+
+    FIRMS records are flat objects, so an element normally ends at the next '}'; nested
+    objects, escapes or unbalanced quotes (a '}' inside a string) fall back to a full
+    raw_decode of the element.
+    Only the current read block is held in memory.
+    """
+    decoder = json.JSONDecoder()
+    buf = ''
+    pos = 0
+    started = False
+    eof = False
+
+    while True:
+        # Skip separators, refilling the buffer as needed
+        while True:
+            while pos < len(buf) and buf[pos] in ' \t\r\n,':
+                pos += 1
+            if pos < len(buf) or eof:
+                break
+            block = f.read(block_size)
+            buf, pos = buf[pos:] + block, 0
+            eof = not block
+
+        if pos >= len(buf):
+            return
+        if not started:
+            if buf[pos] != '[':
+                raise ValueError("FIRMS JSON must be a top-level array")
+            started = True
+            pos += 1
+            continue
+        if buf[pos] == ']':
+            return
+        if buf[pos] != '{':
+            raise ValueError(f"Unexpected character {buf[pos]!r} in FIRMS array")
+
+        end = buf.find('}', pos)
+        while end < 0 and not eof:
+            block = f.read(block_size)
+            buf, pos = buf[pos:] + block, 0
+            eof = not block
+            end = buf.find('}', pos)
+        if end < 0:
+            raise ValueError("Truncated FIRMS JSON array")
+
+        text = buf[pos:end + 1]
+        if '{' in text[1:] or '\\' in text or text.count('"') % 2:
+            # Nested object or a '}' inside a string: let the JSON decoder find the real end
+            while True:
+                try:
+                    _, end_pos = decoder.raw_decode(buf, pos)
+                    break
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    block = f.read(block_size)
+                    buf, pos = buf[pos:] + block, 0
+                    eof = not block
+            text = buf[pos:end_pos]
+            pos = end_pos
+        else:
+            pos = end + 1
+        yield text
+
+
+def iter_firms_records(path, bbox=None, start_date=None, end_date=None, min_confidence=None,
+                       satellites=None, block_size=1 << 20):
+    """
+    Stream FIRMS detections from a JSON array file, keeping only records that match.
+
+    Works with both the MODIS schema (numeric confidence, 'brightness'/'bright_t31') and
+    the VIIRS schema ('l'/'n'/'h' confidence, 'bright_ti4'/'bright_ti5'); gzip input is
+    read when the path ends in .gz.
+
+    Parameters:
+    - path: FIRMS JSON file path
+    - bbox, start_date, end_date, min_confidence, satellites: See RecordFilter
+    - block_size: Characters read per block
+
+    Yields:
+    - Record dictionaries that pass every predicate
+    """
+    predicate = RecordFilter(bbox, start_date, end_date, min_confidence, satellites)
+    with _open_text(path) as f:
+        for text in iter_json_objects(f, block_size):
+            if predicate.active:
+                matched = predicate.match_text(text)
+                if matched is False:
+                    continue
+                record = json.loads(text)
+                if matched is None and not predicate.match_record(record):
+                    continue
+            else:
+                record = json.loads(text)
+            yield record
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stream and filter FIRMS fire detection JSON files')
+    parser.add_argument('input_file', help='FIRMS JSON array file (optionally .gz)')
+    parser.add_argument('-o', '--output', help='Output file (.ndjson/.jsonl for NDJSON, otherwise a JSON array)')
+    parser.add_argument('--hawaii', action='store_true', help='Keep only the Hawaii bounding box')
+    parser.add_argument('--bbox', nargs=4, type=float, metavar=('MIN_LON', 'MIN_LAT', 'MAX_LON', 'MAX_LAT'),
+                        help='Keep only detections inside this bounding box')
+    parser.add_argument('--start-date', help='First acquisition date to keep (YYYY-MM-DD)')
+    parser.add_argument('--end-date', help='Last acquisition date to keep (YYYY-MM-DD)')
+    parser.add_argument('--min-confidence', help="Minimum confidence: l/n/h, low/medium/nominal/high or a MODIS percentage")
+    parser.add_argument('--satellites', nargs='+', help='Satellites to keep (e.g. N20 Terra Aqua)')
+    args = parser.parse_args()
+
+    min_confidence = args.min_confidence
+    if min_confidence is not None:
+        try:
+            # MODIS percentages stay numeric so they compare as percentages
+            level = float(min_confidence)
+            level = level if math.isfinite(level) else None
+        except ValueError:
+            level = confidence_class(min_confidence)
+        if level is None:
+            parser.error(f"--min-confidence: unknown confidence {min_confidence!r}")
+        min_confidence = level
+    bbox = HAWAII_BBOX if args.hawaii else args.bbox
+
+    records = iter_firms_records(args.input_file, bbox=bbox, start_date=args.start_date,
+                                 end_date=args.end_date, min_confidence=min_confidence,
+                                 satellites=args.satellites)
+    ndjson = bool(args.output) and args.output.endswith(('.ndjson', '.jsonl'))
+    count = 0
+    out = open(args.output, 'w', encoding='utf-8') if args.output else None
+    try:
+        if out and not ndjson:
+            out.write('[')
+        for record in records:
+            if out:
+                if ndjson:
+                    out.write(json.dumps(record, separators=(',', ':')) + '\n')
+                else:
+                    out.write((',' if count else '') + json.dumps(record, separators=(',', ':')))
+            count += 1
+        if out and not ndjson:
+            out.write(']')
+    finally:
+        if out:
+            out.close()
+
+    print(f"🛰️  {count} matching detections in {args.input_file}")
+    if args.output:
+        print(f"💾 Saved to: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+FIRMS Multi-Sensor Merge
+Streams every DL_FIRE_* download folder (MODIS C6.1, VIIRS NOAA-20/21, Suomi-NPP,
+Landsat), normalizes their schemas, and collapses detections of the same hotspot
+seen by different sensors into one record with per-source provenance, using a
+spatio-temporal hash grid instead of pairwise comparison.
+"""
+
+import argparse
+import csv
+import glob
+import heapq
+import json
+import math
+import os
+import re
+
+from FIRMS_Cache import acq_epoch
+from FIRMS_Ingest import CONFIDENCE_RANK, HAWAII_BBOX, RecordFilter, confidence_class, iter_firms_records
+
+DEFAULT_FIRMS_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'FIRMS', 'VIIRS')
+
+# DL_FIRE_<product>_<request id> -> human readable product name
+SENSOR_PRODUCTS = {
+    'M-C61': 'MODIS C6.1',
+    'J1V-C2': 'VIIRS NOAA-20',
+    'J2V-C2': 'VIIRS NOAA-21',
+    'SV-C2': 'VIIRS S-NPP',
+    'LS': 'Landsat',
+}
+
+KM_PER_DEG_LAT = 111.32
+
+
+def _first(record, *fields):
+    for field in fields:
+        value = record.get(field)
+        if value not in (None, ''):
+            return value
+    return None
+
+
+def _float(value):
+    return None if value in (None, '') else float(value)
+
+
+def normalize_detection(record, product):
+    """
+    Map a MODIS, VIIRS or Landsat FIRMS record onto one schema.
+
+    Returns:
+    - Dictionary with latitude, longitude, acq_date, acq_time (HHMM), acq_epoch,
+      satellite, instrument, confidence ('l'/'n'/'h'), confidence_raw, brightness,
+      bright_t31, frp, daynight, scan, track, version and product
+    """
+    acq_time = f"{int(record['acq_time']):04d}"
+    raw_confidence = record.get('confidence')
+    return {
+        'latitude': float(record['latitude']),
+        'longitude': float(record['longitude']),
+        'acq_date': record['acq_date'],
+        'acq_time': acq_time,
+        'acq_epoch': acq_epoch(record['acq_date'], acq_time),
+        'satellite': _first(record, 'satellite'),
+        'instrument': _first(record, 'instrument') or product.split(' ')[0],
+        'confidence': confidence_class(raw_confidence),
+        'confidence_raw': raw_confidence,
+        'brightness': _float(_first(record, 'brightness', 'bright_ti4')),
+        'bright_t31': _float(_first(record, 'bright_t31', 'bright_ti5')),
+        'frp': _float(_first(record, 'frp')),
+        'daynight': _first(record, 'daynight'),
+        'scan': _float(_first(record, 'scan')),
+        'track': _float(_first(record, 'track')),
+        'version': _first(record, 'version'),
+        'product': product,
+    }
+
+
+def _iter_csv_records(path, predicate):
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for record in csv.DictReader(f):
+            if not predicate.active or predicate.match_record(record):
+                yield record
+
+
+def find_sensor_files(root=DEFAULT_FIRMS_ROOT):
+    """
+    Find the detection files of every DL_FIRE_* folder under root.
+
+    Returns:
+    - List of (product name, file path) tuples; folders holding only a Readme are skipped
+    """
+    found = []
+    for folder in sorted(glob.glob(os.path.join(root, 'DL_FIRE_*'))):
+        match = re.match(r'DL_FIRE_(.+)_\d+$', os.path.basename(folder))
+        if not match:
+            continue
+        product = SENSOR_PRODUCTS.get(match.group(1), match.group(1))
+        for pattern in ('fire_*.json', 'fire_*.json.gz', 'fire_*.csv'):
+            for path in sorted(glob.glob(os.path.join(folder, pattern))):
+                found.append((product, path))
+    return found
+
+
+def iter_sensor_detections(product, path, bbox=None, start_date=None, end_date=None):
+    """Stream one sensor file as normalized detections (pushdown filters applied while parsing)"""
+    if path.endswith('.csv'):
+        predicate = RecordFilter(bbox, start_date, end_date)
+        records = _iter_csv_records(path, predicate)
+    else:
+        records = iter_firms_records(path, bbox=bbox, start_date=start_date, end_date=end_date)
+    for record in records:
+        yield normalize_detection(record, product)
+
+
+class HotspotDeduplicator:
+    """
+    Spatio-temporal hash grid that folds cross-sensor detections into hotspots.
+
+    Detections are hashed to (lat cell, lon cell, time bucket) with cell sizes equal to
+    the distance and time tolerances, so a match can only sit in the 27 neighbouring
+    buckets. A detection joins the hotspot whose first (anchor) detection is closest
+    within tolerance and that has not already been seen by the same satellite;
+    otherwise it opens a new hotspot.
+    Detections must arrive in time order; hotspots older than the time tolerance are
+    released (flushed) so memory stays bounded by the active window.
+    """
+
+    def __init__(self, distance_km=1.0, time_minutes=60):
+        self.distance_km = distance_km
+        self.time_seconds = time_minutes * 60
+        self.lat_step = distance_km / KM_PER_DEG_LAT
+        self._buckets = {}
+        self._open = []  # heap of (last_epoch, id, hotspot)
+        self._next_id = 0
+
+    def _lon_cell(self, row, longitude):
+        # Longitude cells are sized per latitude row, using the row edge (plus one row of
+        # slack) farthest from the equator so a cell is never narrower than the tolerance
+        edge_lat = min(max(abs(row - 1), abs(row + 2)) * self.lat_step, 89.9)
+        lon_step = self.lat_step / math.cos(math.radians(edge_lat))
+        return int(math.floor(longitude / lon_step))
+
+    def _key(self, latitude, longitude, epoch):
+        row = int(math.floor(latitude / self.lat_step))
+        return row, self._lon_cell(row, longitude), int(epoch // self.time_seconds)
+
+    def _distance_km(self, detection, hotspot):
+        lat, lon = hotspot['_anchor']
+        mean_lat = math.radians((detection['latitude'] + lat) / 2)
+        dy = (detection['latitude'] - lat) * KM_PER_DEG_LAT
+        dx = (detection['longitude'] - lon) * KM_PER_DEG_LAT * math.cos(mean_lat)
+        return math.hypot(dx, dy)
+
+    def _candidates(self, detection):
+        row = int(math.floor(detection['latitude'] / self.lat_step))
+        time_cell = int(detection['acq_epoch'] // self.time_seconds)
+        for r in (row - 1, row, row + 1):
+            lon_cell = self._lon_cell(r, detection['longitude'])
+            for dj in (-1, 0, 1):
+                for dt in (-1, 0, 1):
+                    yield from self._buckets.get((r, lon_cell + dj, time_cell + dt), ())
+
+    def add(self, detection):
+        """
+        Add one normalized detection.
+
+        Returns:
+        - List of hotspots that became final (outside the time window of this detection)
+        """
+        released = self._release(detection['acq_epoch'] - self.time_seconds)
+
+        best = None
+        best_distance = None
+        for hotspot in self._candidates(detection):
+            if detection['satellite'] in hotspot['_satellites']:
+                continue
+            if abs(detection['acq_epoch'] - hotspot['_anchor_epoch']) > self.time_seconds:
+                continue
+            distance = self._distance_km(detection, hotspot)
+            if distance <= self.distance_km and (best is None or distance < best_distance):
+                best, best_distance = hotspot, distance
+
+        if best is None:
+            best = dict(detection)
+            best.update({
+                'first_epoch': detection['acq_epoch'],
+                'last_epoch': detection['acq_epoch'],
+                'sources': [],
+                '_anchor': (detection['latitude'], detection['longitude']),
+                '_anchor_epoch': detection['acq_epoch'],
+                '_key': self._key(detection['latitude'], detection['longitude'], detection['acq_epoch']),
+                '_satellites': set(),
+                '_id': self._next_id,
+            })
+            self._next_id += 1
+            self._buckets.setdefault(best['_key'], []).append(best)
+        self._absorb(best, detection)
+        heapq.heappush(self._open, (best['last_epoch'], best['_id'], best))
+        return released
+
+    def _absorb(self, hotspot, detection):
+        hotspot['sources'].append({key: detection[key] for key in (
+            'product', 'satellite', 'instrument', 'acq_date', 'acq_time', 'confidence_raw',
+            'frp', 'latitude', 'longitude')})
+        hotspot['_satellites'].add(detection['satellite'])
+        hotspot['first_epoch'] = min(hotspot['first_epoch'], detection['acq_epoch'])
+        hotspot['last_epoch'] = max(hotspot['last_epoch'], detection['acq_epoch'])
+        # Keep the most confident (then most intense) observation as the representative
+        rank = CONFIDENCE_RANK.get(detection['confidence'], -1)
+        best_rank = CONFIDENCE_RANK.get(hotspot['confidence'], -1)
+        if (rank, detection['frp'] or 0.0) > (best_rank, hotspot['frp'] or 0.0):
+            for key in ('latitude', 'longitude', 'acq_date', 'acq_time', 'acq_epoch', 'satellite',
+                        'instrument', 'confidence', 'confidence_raw', 'brightness', 'bright_t31',
+                        'frp', 'daynight', 'scan', 'track', 'version', 'product'):
+                hotspot[key] = detection[key]
+
+    def _release(self, before_epoch):
+        released = []
+        while self._open and self._open[0][0] < before_epoch:
+            last_epoch, _, hotspot = heapq.heappop(self._open)
+            if hotspot.get('_released') or last_epoch != hotspot['last_epoch']:
+                continue  # stale heap entry
+            hotspot['_released'] = True
+            bucket = self._buckets[hotspot['_key']]
+            bucket.remove(hotspot)
+            if not bucket:
+                del self._buckets[hotspot['_key']]
+            released.append(self._finish(hotspot))
+        return released
+
+    def flush(self):
+        """Release every remaining hotspot"""
+        return self._release(float('inf'))
+
+    @staticmethod
+    def _finish(hotspot):
+        result = {key: value for key, value in hotspot.items() if not key.startswith('_')}
+        result['detections'] = len(result['sources'])
+        return result
+
+
+def merge_sensor_feeds(root=DEFAULT_FIRMS_ROOT, distance_km=1.0, time_minutes=60, bbox=None,
+                       start_date=None, end_date=None, files=None):
+    """
+    Stream all sensor folders as one deduplicated hotspot feed.
+
+    Each source file is expected in acquisition order (as FIRMS delivers them); the
+    sources are combined with a k-way merge on acq_epoch before deduplication.
+
+    Parameters:
+    - root: Folder containing the DL_FIRE_* downloads
+    - distance_km, time_minutes: Tolerances for treating detections as the same hotspot
+    - bbox, start_date, end_date: Pushdown filters (see FIRMS_Ingest.RecordFilter)
+    - files: Optional list of (product, path) tuples instead of scanning root
+
+    Yields:
+    - Hotspot dictionaries (normalized representative fields plus 'sources',
+      'detections', 'first_epoch' and 'last_epoch'), roughly in time order
+    """
+    streams = [iter_sensor_detections(product, path, bbox, start_date, end_date)
+               for product, path in (files if files is not None else find_sensor_files(root))]
+    dedup = HotspotDeduplicator(distance_km, time_minutes)
+    for detection in heapq.merge(*streams, key=lambda d: d['acq_epoch']):
+        yield from dedup.add(detection)
+    yield from dedup.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Merge and deduplicate FIRMS downloads across sensors')
+    parser.add_argument('root', nargs='?', default=DEFAULT_FIRMS_ROOT, help='Folder holding the DL_FIRE_* downloads')
+    parser.add_argument('-o', '--output', default='firms_merged.ndjson', help='Output NDJSON file')
+    parser.add_argument('--distance-km', type=float, default=1.0, help='Spatial tolerance in km')
+    parser.add_argument('--time-minutes', type=float, default=60, help='Time tolerance in minutes')
+    parser.add_argument('--hawaii', action='store_true', help='Keep only the Hawaii bounding box')
+    parser.add_argument('--start-date', help='First acquisition date to keep (YYYY-MM-DD)')
+    parser.add_argument('--end-date', help='Last acquisition date to keep (YYYY-MM-DD)')
+    args = parser.parse_args()
+
+    files = find_sensor_files(args.root)
+    for product, path in files:
+        print(f"🛰️  {product}: {path}")
+
+    hotspots = detections = 0
+    with open(args.output, 'w', encoding='utf-8') as f:
+        for hotspot in merge_sensor_feeds(args.root, args.distance_km, args.time_minutes,
+                                          bbox=HAWAII_BBOX if args.hawaii else None,
+                                          start_date=args.start_date, end_date=args.end_date, files=files):
+            f.write(json.dumps(hotspot, separators=(',', ':')) + '\n')
+            hotspots += 1
+            detections += hotspot['detections']
+
+    print(f"🔥 {detections} detections merged into {hotspots} hotspots")
+    print(f"💾 Saved to: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
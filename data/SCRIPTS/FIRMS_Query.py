@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+FIRMS Query Index
+Answers "detections in this box, in this time window, at this confidence, from these
+satellites" over loaded FIRMS data without scanning every record: detections are kept
+sorted by acquisition time (binary search on epochs) and bucketed in a coarse
+lat/lon grid whose buckets are themselves time ordered.
+"""
+
+import argparse
+import calendar
+import json
+import math
+import time
+from datetime import datetime
+
+import numpy as np
+
+from FIRMS_Cache import acq_epoch, load_firms
+from FIRMS_Ingest import CONFIDENCE_RANK, HAWAII_BBOX, confidence_class
+
+
+def to_epoch(value, end_of_day=False):
+    """
+    Convert an epoch, datetime or 'YYYY-MM-DD[ HH:MM]' string to integer UTC epoch seconds.
+    A bare date used as an end bound covers the whole day; fractional epochs round inward
+    (up for a start, down for an end) so the int64 epoch column is searched without a cast.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        return math.floor(value) if end_of_day else math.ceil(value)
+    if isinstance(value, datetime):
+        return calendar.timegm(value.utctimetuple())
+    if len(value) == 10:
+        return acq_epoch(value, 0) + (86399 if end_of_day else 0)
+    return calendar.timegm(datetime.strptime(value, '%Y-%m-%d %H:%M').timetuple())
+
+
+class DetectionIndex:
+    """
+    Time-sorted detection columns with a coarse spatial grid.
+
+    The grid is stored as one sorted int64 key per detection, cell * n + time position,
+    so the detections of a cell inside [start, end] are a contiguous key range: a query
+    does two vectorized searchsorted calls over all cells overlapping the box, gathers
+    the ranges and applies the exact box, confidence and satellite tests to those
+    candidates only.
+
+    Attributes:
+    - latitude, longitude, acq_epoch: Columns in acquisition order
+    - confidence_rank: int8 rank (0 low, 1 nominal, 2 high, -1 unknown)
+    - confidence_value: float32 numeric (MODIS percentage) confidence, NaN for classes
+    - satellite: int16 codes into satellites
+    - source_index: Position of each sorted detection in the input data
+    """
+
+    def __init__(self, latitude, longitude, epochs, confidence_rank, satellite_codes, satellites,
+                 cell_deg=0.1, confidence_value=None):
+        """
+        Parameters:
+        - latitude, longitude, epochs: Detection columns (any order)
+        - confidence_rank: Confidence ranks as returned by rank_confidences
+        - satellite_codes, satellites: Integer satellite codes and the names they index
+        - cell_deg: Grid cell size in degrees
+        - confidence_value: Numeric confidences as returned by confidence_values (default: none)
+        """
+        epochs = np.asarray(epochs, dtype=np.int64)
+        order = np.argsort(epochs, kind='stable')
+        self.source_index = order
+        self.acq_epoch = epochs[order]
+        self.latitude = np.asarray(latitude, dtype=np.float32)[order]
+        self.longitude = np.asarray(longitude, dtype=np.float32)[order]
+        self.confidence_rank = np.asarray(confidence_rank, dtype=np.int8)[order]
+        if confidence_value is None:
+            self.confidence_value = np.full(len(order), np.nan, dtype=np.float32)
+        else:
+            self.confidence_value = np.asarray(confidence_value, dtype=np.float32)[order]
+        self.satellite = np.asarray(satellite_codes, dtype=np.int16)[order]
+        self.satellites = list(satellites)
+
+        self.cell_deg = cell_deg
+        self.n_cols = int(np.ceil(360 / cell_deg))
+        n = len(order)
+        self._n = n
+        cells = self._cell_ids(self.latitude, self.longitude)
+        self._keys = np.sort(cells * n + np.arange(n, dtype=np.int64))
+
+    def __len__(self):
+        return self._n
+
+    @classmethod
+    def from_cache(cls, cache, cell_deg=0.1):
+        """Build the index from a FIRMS_Cache.FirmsCache (memory-mapped columns)"""
+        ranks = rank_confidences(cache.categories['confidence'])
+        values = confidence_values(cache.categories['confidence'])
+        return cls(cache['latitude'], cache['longitude'], cache['acq_epoch'],
+                   ranks[cache['confidence']], cache['satellite'], cache.categories['satellite'],
+                   cell_deg=cell_deg, confidence_value=values[cache['confidence']])
+
+    @classmethod
+    def from_records(cls, records, cell_deg=0.1):
+        """Build the index from a list of FIRMS record dictionaries"""
+        satellites = {}
+        ranks = {}
+        codes = np.array([satellites.setdefault(r.get('satellite'), len(satellites)) for r in records],
+                         dtype=np.int16)
+        confidence = np.array([ranks.setdefault(r.get('confidence'), len(ranks)) for r in records],
+                              dtype=np.int16)
+        return cls([float(r['latitude']) for r in records], [float(r['longitude']) for r in records],
+                   [acq_epoch(r['acq_date'], r['acq_time']) for r in records],
+                   rank_confidences(list(ranks))[confidence], codes, list(satellites), cell_deg=cell_deg,
+                   confidence_value=confidence_values(list(ranks))[confidence])
+
+    def _cell_ids(self, latitude, longitude):
+        rows = np.floor((np.asarray(latitude, dtype=np.float64) + 90) / self.cell_deg).astype(np.int64)
+        cols = np.floor((np.asarray(longitude, dtype=np.float64) + 180) / self.cell_deg).astype(np.int64)
+        return rows * self.n_cols + np.clip(cols, 0, self.n_cols - 1)
+
+    def time_range(self, start=None, end=None):
+        """Return the (lo, hi) positions of detections acquired in [start, end]"""
+        start, end = to_epoch(start), to_epoch(end, end_of_day=True)
+        lo = 0 if start is None else int(np.searchsorted(self.acq_epoch, start, side='left'))
+        hi = self._n if end is None else int(np.searchsorted(self.acq_epoch, end, side='right'))
+        return lo, max(lo, hi)
+
+    def _grid_candidates(self, bbox, lo, hi):
+        min_lon, min_lat, max_lon, max_lat = bbox
+        row_lo, row_hi = (int(np.floor((v + 90) / self.cell_deg)) for v in (min_lat, max_lat))
+        col_lo, col_hi = (int(np.floor((v + 180) / self.cell_deg)) for v in (min_lon, max_lon))
+        col_lo, col_hi = max(col_lo, 0), min(col_hi, self.n_cols - 1)
+        n_cells = (row_hi - row_lo + 1) * (col_hi - col_lo + 1)
+        if n_cells <= 0:
+            return np.empty(0, dtype=np.int64)
+        if n_cells > hi - lo:
+            # Box spans more cells than the time window has detections: scanning is cheaper
+            return None
+
+        cells = (np.arange(row_lo, row_hi + 1, dtype=np.int64)[:, None] * self.n_cols
+                 + np.arange(col_lo, col_hi + 1, dtype=np.int64)[None, :]).ravel()
+        starts = np.searchsorted(self._keys, cells * self._n + lo, side='left')
+        stops = np.searchsorted(self._keys, cells * self._n + hi, side='left')
+        lengths = stops - starts
+        total = int(lengths.sum())
+        if total == 0:
+            return np.empty(0, dtype=np.int64)
+        # Concatenate the key ranges without a Python loop
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        keys = self._keys[offsets + np.arange(total)]
+        return np.sort(keys % self._n)
+
+    def query(self, bbox=None, start=None, end=None, min_confidence=None, satellites=None):
+        """
+        Find detections matching every given predicate.
+
+        Parameters:
+        - bbox: (min_lon, min_lat, max_lon, max_lat), inclusive
+        - start, end: Inclusive bounds as epochs, datetimes or date strings
+        - min_confidence: Minimum class ('l', 'n', 'h') or MODIS percentage; as in
+          FIRMS_Ingest.RecordFilter a percentage is compared directly with numeric
+          confidences and by class with VIIRS class letters
+        - satellites: Iterable of satellite names
+
+        Returns:
+        - A slice when only a time window is given, otherwise a time-ordered int64 array,
+          of positions into the index columns (map with source_index for the input order)
+        """
+        lo, hi = self.time_range(start, end)
+        if bbox is None and min_confidence is None and not satellites:
+            return slice(lo, hi)
+
+        positions = self._grid_candidates(bbox, lo, hi) if bbox is not None else None
+        if positions is None:
+            positions = np.arange(lo, hi, dtype=np.int64)
+
+        mask = np.ones(len(positions), dtype=bool)
+        if bbox is not None:
+            min_lon, min_lat, max_lon, max_lat = bbox
+            lat, lon = self.latitude[positions], self.longitude[positions]
+            mask &= (lat >= min_lat) & (lat <= max_lat) & (lon >= min_lon) & (lon <= max_lon)
+        if min_confidence is not None:
+            by_class = self.confidence_rank[positions] >= CONFIDENCE_RANK[confidence_class(min_confidence)]
+            if isinstance(min_confidence, (int, float, np.number)):
+                values = self.confidence_value[positions]
+                numeric = ~np.isnan(values)
+                by_class = np.where(numeric, values >= min_confidence, by_class)
+            mask &= by_class
+        if satellites:
+            codes = [i for i, name in enumerate(self.satellites) if name in set(satellites)]
+            mask &= np.isin(self.satellite[positions], codes)
+        return positions[mask]
+
+    def columns(self, selection):
+        """Return the index columns restricted to a query() result"""
+        return {
+            'latitude': self.latitude[selection],
+            'longitude': self.longitude[selection],
+            'acq_epoch': self.acq_epoch[selection],
+            'confidence_rank': self.confidence_rank[selection],
+            'satellite': np.array(self.satellites + [None], dtype=object)[self.satellite[selection]],
+            'source_index': self.source_index[selection],
+        }
+
+
+def rank_confidences(values):
+    """Map raw confidence values to int8 ranks (CONFIDENCE_RANK, -1 when unknown)"""
+    classes = (confidence_class(value) for value in values)
+    # Extra trailing entry so the -1 'missing' code of categorical columns ranks as unknown
+    return np.array([CONFIDENCE_RANK[c] if c else -1 for c in classes] + [-1], dtype=np.int8)
+
+
+def confidence_values(values):
+    """Map raw confidence values to float32 numbers (NaN for class letters and missing values)"""
+    numbers = []
+    for value in values:
+        try:
+            numbers.append(float(value))
+        except (TypeError, ValueError):
+            numbers.append(np.nan)
+    # Trailing NaN for the -1 'missing' code, as in rank_confidences
+    return np.array(numbers + [np.nan], dtype=np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query FIRMS detections by area, time, confidence and satellite')
+    parser.add_argument('input_file', help='FIRMS JSON file (cached with FIRMS_Cache)')
+    parser.add_argument('-o', '--output', help='Write matching records to this JSON file')
+    parser.add_argument('--hawaii', action='store_true', help='Keep only the Hawaii bounding box')
+    parser.add_argument('--bbox', nargs=4, type=float, metavar=('MIN_LON', 'MIN_LAT', 'MAX_LON', 'MAX_LAT'),
+                        help='Keep only detections inside this bounding box')
+    parser.add_argument('--start', help="Start 'YYYY-MM-DD' or 'YYYY-MM-DD HH:MM' (UTC)")
+    parser.add_argument('--end', help="End 'YYYY-MM-DD' or 'YYYY-MM-DD HH:MM' (UTC)")
+    parser.add_argument('--last-hours', type=float, help='Window ending at the newest detection')
+    parser.add_argument('--min-confidence', help="Minimum confidence: 'l', 'n', 'h' or a MODIS percentage")
+    parser.add_argument('--satellites', nargs='+', help='Satellites to keep (e.g. N20 Terra Aqua)')
+    args = parser.parse_args()
+
+    cache = load_firms(args.input_file)
+    index = DetectionIndex.from_cache(cache)
+    start, end = args.start, args.end
+    if args.last_hours is not None and len(index):
+        end = int(index.acq_epoch[-1])
+        start = end - int(args.last_hours * 3600)
+    min_confidence = args.min_confidence
+    if min_confidence is not None and min_confidence.lower() not in CONFIDENCE_RANK:
+        min_confidence = float(min_confidence)
+
+    began = time.perf_counter()
+    selection = index.query(bbox=HAWAII_BBOX if args.hawaii else args.bbox, start=start, end=end,
+                            min_confidence=min_confidence, satellites=args.satellites)
+    elapsed = time.perf_counter() - began
+    matches = index.source_index[selection]
+    print(f"🔎 {len(matches)} of {len(index)} detections matched in {elapsed * 1000:.3f} ms")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump([cache.record(int(i)) for i in matches], f, indent=2)
+        print(f"💾 Results saved to: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+FIRMS Heatmap Tile Builder
+Precomputes a Web-Mercator tile pyramid of fire radiative power aggregates
+(count, FRP sum/max, latest detection time, optionally on a sub-tile grid) so the
+mission heat map fetches small z/x/y.json tiles instead of every raw detection.
+New batches only rewrite the tiles they touch, and detections already in the pyramid
+(overlapping fire_nrt_* pulls) are skipped.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from FIRMS_Cache import acq_epoch
+from FIRMS_Ingest import detection_key, iter_firms_records
+
+MAX_MERCATOR_LAT = 85.05112878
+
+
+def detection_hash(key):
+    """64-bit signed hash of a FIRMS_Ingest.detection_key string"""
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little', signed=True)
+
+
+def lonlat_to_mercator(latitudes, longitudes):
+    """Return Web-Mercator (x, y) fractions in [0, 1) for arrays of WGS84 degrees"""
+    lat = np.radians(np.clip(np.asarray(latitudes, dtype=np.float64), -MAX_MERCATOR_LAT, MAX_MERCATOR_LAT))
+    x = (np.asarray(longitudes, dtype=np.float64) + 180.0) / 360.0
+    y = (1.0 - np.log(np.tan(lat) + 1.0 / np.cos(lat)) / np.pi) / 2.0
+    return np.clip(x, 0.0, np.nextafter(1.0, 0)), np.clip(y, 0.0, np.nextafter(1.0, 0))
+
+
+class TilePyramid:
+    """
+    Directory of z/x/y.json aggregate tiles.
+
+    Each tile stores totals plus a sparse list of [bin, count, frp_sum, frp_max, latest]
+    entries for a bins x bins grid inside the tile (bin = row * bins + column, rows from
+    the top). Aggregation is vectorized per zoom: every detection gets one integer key
+    (tile and bin), the keys are sorted once and reduced with reduceat. The sorted
+    hashes of every ingested detection key are kept in ingested_keys.npy, so a
+    detection seen before is never counted twice.
+    """
+
+    def __init__(self, out_dir, min_zoom=0, max_zoom=12, bins=16):
+        """
+        Parameters:
+        - out_dir: Tile directory
+        - min_zoom, max_zoom: Zoom levels to build (inclusive)
+        - bins: Sub-tile grid size per axis (1 stores tile totals only)
+        """
+        self.out_dir = out_dir
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        self.bins = bins
+        self.metadata_path = os.path.join(out_dir, 'metadata.json')
+        self.keys_path = os.path.join(out_dir, 'ingested_keys.npy')
+        self.ingested = np.load(self.keys_path) if os.path.exists(self.keys_path) else np.empty(0, dtype=np.int64)
+        if os.path.exists(self.metadata_path):
+            with open(self.metadata_path, 'r', encoding='utf-8') as f:
+                existing = json.load(f)
+            if (existing['min_zoom'], existing['max_zoom'], existing['bins']) != (min_zoom, max_zoom, bins):
+                raise ValueError(f"{out_dir} was built with zooms {existing['min_zoom']}-{existing['max_zoom']} "
+                                 f"and {existing['bins']} bins; rebuild it or match those settings")
+            self.metadata = existing
+        else:
+            self.metadata = {'min_zoom': min_zoom, 'max_zoom': max_zoom, 'bins': bins,
+                             'count': 0, 'latest': None}
+        self.metadata.setdefault('skipped', 0)
+
+    def _accept(self, hashes):
+        """
+        Return a mask of the detections not ingested before (first occurrence within the
+        batch) and add their hashes to the ingested set.
+        """
+        hashes = np.asarray(hashes, dtype=np.int64)
+        mask = np.zeros(len(hashes), dtype=bool)
+        _, first = np.unique(hashes, return_index=True)
+        mask[first] = True
+        if len(self.ingested):
+            slot = np.minimum(np.searchsorted(self.ingested, hashes), len(self.ingested) - 1)
+            mask &= self.ingested[slot] != hashes
+        self.ingested = np.union1d(self.ingested, hashes[mask])
+        self.metadata['skipped'] += int(len(hashes) - mask.sum())
+        return mask
+
+    def aggregate(self, latitudes, longitudes, frp, epochs):
+        """
+        Aggregate one batch of detections for every zoom level.
+
+        Returns:
+        - Dictionary mapping (z, x, y) to an (m, 5) float64 array of bin rows
+        """
+        x, y = lonlat_to_mercator(latitudes, longitudes)
+        frp = np.nan_to_num(np.asarray(frp, dtype=np.float64))
+        epochs = np.asarray(epochs, dtype=np.int64)
+        bins = self.bins
+        tiles = {}
+        for z in range(self.min_zoom, self.max_zoom + 1):
+            side = (1 << z) * bins
+            px = (x * side).astype(np.int64)
+            py = (y * side).astype(np.int64)
+            keys = ((py // bins) * (1 << z) + px // bins) * bins * bins + (py % bins) * bins + px % bins
+            order = np.argsort(keys, kind='stable')
+            keys = keys[order]
+            starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) else np.empty(0, np.int64)
+            if not len(starts):
+                continue
+            unique = keys[starts]
+            counts = np.diff(np.r_[starts, len(keys)])
+            frp_sorted = frp[order]
+            rows = np.column_stack([
+                unique % (bins * bins),
+                counts,
+                np.add.reduceat(frp_sorted, starts),
+                np.maximum.reduceat(frp_sorted, starts),
+                np.maximum.reduceat(epochs[order], starts),
+            ]).astype(np.float64)
+            tile_ids = unique // (bins * bins)
+            tile_starts = np.flatnonzero(np.r_[True, tile_ids[1:] != tile_ids[:-1]])
+            for lo, hi in zip(tile_starts, np.r_[tile_starts[1:], len(tile_ids)]):
+                tile_id = int(tile_ids[lo])
+                tiles[(z, tile_id % (1 << z), tile_id >> z)] = rows[lo:hi]
+        return tiles
+
+    def tile_path(self, z, x, y):
+        return os.path.join(self.out_dir, str(z), str(x), f'{y}.json')
+
+    def _merge_tile(self, key, rows):
+        z, x, y = key
+        path = self.tile_path(z, x, y)
+        cells = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for b, count, frp_sum, frp_max, latest in json.load(f)['cells']:
+                    cells[b] = [count, frp_sum, frp_max, latest]
+        for b, count, frp_sum, frp_max, latest in rows.tolist():
+            b = int(b)
+            current = cells.get(b)
+            if current is None:
+                cells[b] = [int(count), frp_sum, frp_max, int(latest)]
+            else:
+                current[0] += int(count)
+                current[1] += frp_sum
+                current[2] = max(current[2], frp_max)
+                current[3] = max(current[3], int(latest))
+
+        ordered = sorted(cells.items())
+        tile = {
+            'z': z, 'x': x, 'y': y, 'bins': self.bins,
+            'count': sum(c[0] for _, c in ordered),
+            'frp_sum': round(sum(c[1] for _, c in ordered), 2),
+            'frp_max': max(c[2] for _, c in ordered),
+            'latest': max(c[3] for _, c in ordered),
+            'cells': [[b, c[0], round(c[1], 2), c[2], c[3]] for b, c in ordered],
+        }
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(tile, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    def _commit(self, pending, total, latest):
+        for key, parts in pending.items():
+            self._merge_tile(key, np.concatenate(parts))
+        if total:
+            self.metadata['count'] += total
+            self.metadata['latest'] = max(self.metadata['latest'] or latest, latest)
+        os.makedirs(self.out_dir, exist_ok=True)
+        # Keys before metadata: a crash in between leaves keys for tiles that were written
+        tmp_path = self.keys_path + '.tmp.npy'
+        np.save(tmp_path, self.ingested)
+        os.replace(tmp_path, self.keys_path)
+        with open(self.metadata_path, 'w', encoding='utf-8') as f:
+            json.dump(self.metadata, f, indent=2)
+        return sorted(pending)
+
+    def update_columns(self, latitudes, longitudes, frp, epochs, satellites=None):
+        """
+        Add a batch of detection columns and rewrite only the tiles it touches.
+        Detections already in the pyramid are skipped.
+
+        Returns:
+        - Sorted list of touched (z, x, y) tiles
+        """
+        latitudes, longitudes = np.asarray(latitudes), np.asarray(longitudes)
+        frp, epochs = np.asarray(frp), np.asarray(epochs, dtype=np.int64)
+        if satellites is None:
+            satellites = [None] * len(epochs)
+        mask = self._accept([detection_hash(detection_key(*d))
+                             for d in zip(epochs.tolist(), latitudes.tolist(), longitudes.tolist(), satellites)])
+        latitudes, longitudes, frp, epochs = latitudes[mask], longitudes[mask], frp[mask], epochs[mask]
+        pending = {key: [rows] for key, rows in self.aggregate(latitudes, longitudes, frp, epochs).items()}
+        return self._commit(pending, len(epochs), int(epochs.max()) if len(epochs) else None)
+
+    def update(self, records, chunk_size=200_000):
+        """
+        Add FIRMS record dictionaries (generator output or fire_nrt_* records).
+        Records are aggregated chunk_size at a time; each touched tile is rewritten once.
+        Detections already in the pyramid are skipped.
+
+        Returns:
+        - Sorted list of touched (z, x, y) tiles
+        """
+        pending = {}
+        batch = []
+        total = 0
+        latest = None
+
+        def flush():
+            nonlocal total, latest
+            if not batch:
+                return
+            lat, lon, frp, epochs, hashes = (np.array(column) for column in zip(*batch))
+            batch.clear()
+            mask = self._accept(hashes)
+            if not mask.any():
+                return
+            lat, lon, frp, epochs = lat[mask], lon[mask], frp[mask], epochs[mask]
+            for key, rows in self.aggregate(lat, lon, frp, epochs).items():
+                pending.setdefault(key, []).append(rows)
+            total += len(epochs)
+            latest = max(latest or 0, int(epochs.max()))
+
+        for r in records:
+            lat, lon = float(r['latitude']), float(r['longitude'])
+            epoch = acq_epoch(r['acq_date'], r['acq_time'])
+            batch.append((lat, lon, float(r.get('frp') or 0.0), epoch,
+                          detection_hash(detection_key(epoch, lat, lon, r.get('satellite')))))
+            if len(batch) >= chunk_size:
+                flush()
+        flush()
+
+        return self._commit(pending, total, latest)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build or update FRP heatmap tiles from FIRMS detections')
+    parser.add_argument('input_files', nargs='+', help='FIRMS JSON files (generator output or fire_nrt_*)')
+    parser.add_argument('-o', '--output-dir', default='tiles', help='Tile directory')
+    parser.add_argument('--min-zoom', type=int, default=0, help='Lowest zoom level')
+    parser.add_argument('--max-zoom', type=int, default=12, help='Highest zoom level')
+    parser.add_argument('--bins', type=int, default=16, help='Sub-tile bins per axis (1 for totals only)')
+    args = parser.parse_args()
+
+    pyramid = TilePyramid(args.output_dir, args.min_zoom, args.max_zoom, args.bins)
+    for path in args.input_files:
+        skipped = pyramid.metadata['skipped']
+        touched = pyramid.update(iter_firms_records(path))
+        print(f"🗺️  {path}: {len(touched)} tiles updated, "
+              f"{pyramid.metadata['skipped'] - skipped} detections already ingested")
+    print(f"💾 Tiles saved to: {args.output_dir} ({pyramid.metadata['count']} detections)")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
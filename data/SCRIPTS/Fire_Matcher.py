@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Fire Text Matcher
+Single-pass matching engine shared by the WildfireFilter classes. Every keyword,
+descriptor, context word and regex anchor literal is found in one scan of the
+lowercased text with a trie-shaped regex; exclusion and incident regexes then only
+run when their required literals occur, starting at the first possible match
+position. Decisions are identical to the original rule-by-rule checks.
+"""
+
+import re
+
+try:
+    from re import _parser as sre_parse
+    from re._constants import AT, BRANCH, LITERAL, MAX_REPEAT, MIN_REPEAT, SUBPATTERN
+except ImportError:  # Python < 3.11
+    import sre_parse
+    from sre_constants import AT, BRANCH, LITERAL, MAX_REPEAT, MIN_REPEAT, SUBPATTERN
+
+KEYWORD, DESCRIPTOR, CONTEXT = 1, 2, 4
+
+# Anchor literals shorter than this occur almost everywhere and would only slow the scan
+MIN_ANCHOR_LENGTH = 3
+
+
+def _special_case_chars():
+    # Non-ASCII characters that IGNORECASE matches against ASCII letters (e.g. the Kelvin
+    # sign or long s) or whose lowercase changes the text length (e.g. dotted I). Anchors
+    # are searched in text.lower(), which only mirrors the regex engine without them.
+    special = []
+    for code in range(128, 0x10000):
+        ch = chr(code)
+        lower, upper = ch.lower(), ch.upper()
+        if len(lower) != 1 or (lower.isascii() and lower.isalpha()) or (upper.isascii() and upper.isalpha()):
+            special.append(ch)
+    return re.compile('[' + ''.join(re.escape(ch) for ch in special) + ']')
+
+
+_SPECIAL_CASE = _special_case_chars()
+
+
+def _trie_pattern(words):
+    """Build a regex alternation shaped like a trie that prefers the longest word"""
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def emit(node):
+        alternatives = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not alternatives:
+            return ''
+        body = alternatives[0] if len(alternatives) == 1 else '(?:' + '|'.join(alternatives) + ')'
+        if '' in node:
+            return '(?:' + body + ')?'
+        return body
+
+    return emit(trie)
+
+
+def _literal_runs(items):
+    """Split a parsed sequence into runs of consecutive literals (lowercased)"""
+    runs, run = [], ''
+    for op, av in items:
+        if op is LITERAL:
+            run += chr(av).lower()
+            continue
+        if run:
+            runs.append(run)
+        run = ''
+    if run:
+        runs.append(run)
+    return runs
+
+
+def _required_groups(items):
+    """
+    Return a list of literal sets for a parsed sequence: every match contains at least
+    one literal of each set.
+    """
+    groups = [{run} for run in _literal_runs(items)]
+    for op, av in items:
+        if op is SUBPATTERN:
+            groups += _required_groups(av[-1])
+        elif op is BRANCH:
+            choices = set()
+            for alternative in av[1]:
+                options = _required_groups(alternative)
+                if not options:
+                    choices = None
+                    break
+                choices |= max(options, key=lambda g: min(len(w) for w in g))
+            if choices:
+                groups.append(choices)
+        elif op in (MAX_REPEAT, MIN_REPEAT) and av[0] >= 1:
+            groups += _required_groups(av[2])
+    return groups
+
+
+def _leading_literals(items):
+    """Return the set of literals every match starts with (after zero-width \\b), or None"""
+    for position, (op, av) in enumerate(items):
+        if op is AT:
+            continue
+        if op is LITERAL:
+            return {_literal_runs(items[position:])[0]}
+        if op is SUBPATTERN:
+            return _leading_literals(av[-1])
+        if op is BRANCH:
+            leading = set()
+            for alternative in av[1]:
+                found = _leading_literals(alternative)
+                if not found:
+                    return None
+                leading |= found
+            return leading
+        return None
+    return None
+
+
+class _Rule:
+    def __init__(self, pattern):
+        self.pattern = pattern
+        self.groups = []
+        self.leading = None
+        if pattern.flags & re.IGNORECASE:
+            try:
+                items = list(sre_parse.parse(pattern.pattern, pattern.flags))
+            except Exception:
+                items = None
+            if items is not None:
+                self.groups = [frozenset(g) for g in _required_groups(items)
+                               if min(map(len, g)) >= MIN_ANCHOR_LENGTH]
+                leading = _leading_literals(items)
+                if leading and min(map(len, leading)) >= MIN_ANCHOR_LENGTH:
+                    self.leading = leading
+
+    def literals(self):
+        words = set(self.leading or ())
+        for group in self.groups:
+            words |= group
+        return words
+
+    def search(self, text, text_lower, present):
+        for group in self.groups:
+            if group.isdisjoint(present):
+                return False
+        start = 0
+        if self.leading:
+            # A match starts at an occurrence of a leading literal (positions in text and
+            # text_lower agree because texts with length-changing lowercase fall back)
+            starts = [text_lower.find(word) for word in self.leading if word in present]
+            if not starts:
+                return False
+            start = min(starts)
+        return self.pattern.search(text, start) is not None
+
+
+class FireMatcher:
+    """
+    Compiled form of a WildfireFilter rule set.
+
+    Parameters:
+    - exclusion_patterns: Compiled regexes that veto a text
+    - keywords: Substrings that accept a text
+    - incident_patterns: Compiled regexes that accept a text
+    - descriptors, context_indicators: A text is accepted when it holds one of each
+    - regex_on_lower: Run the regexes on the lowercased text instead of the original
+    """
+
+    def __init__(self, exclusion_patterns, keywords, incident_patterns, descriptors, context_indicators,
+                 regex_on_lower=False):
+        self.exclusions = [_Rule(p) for p in exclusion_patterns]
+        self.incidents = [_Rule(p) for p in incident_patterns]
+        self.keywords = list(keywords)
+        self.descriptors = list(descriptors)
+        self.context_indicators = list(context_indicators)
+        self.regex_on_lower = regex_on_lower
+
+        categories = {}
+        for words, category in ((self.keywords, KEYWORD), (self.descriptors, DESCRIPTOR),
+                                (self.context_indicators, CONTEXT)):
+            for word in words:
+                categories[word] = categories.get(word, 0) | category
+        for rule in self.exclusions + self.incidents:
+            for word in rule.literals():
+                categories.setdefault(word, 0)
+        words = [w for w in categories if w]
+
+        # The scanner reports the longest word starting at each position; every shorter
+        # word starting there is a prefix of it, so each word expands to its prefixes
+        self._closure = {w: [p for p in words if w.startswith(p)] for w in words}
+        self._categories = categories
+        self._scanner = re.compile('(?=(' + _trie_pattern(words) + '))') if words else None
+
+    def _scan(self, text_lower):
+        """Return the set of all rule words that occur in text_lower"""
+        present = set()
+        if self._scanner is not None:
+            for word in set(self._scanner.findall(text_lower)):
+                present.update(self._closure[word])
+        return present
+
+    def _legacy(self, text, text_lower):
+        subject = text_lower if self.regex_on_lower else text
+        for rule in self.exclusions:
+            if rule.pattern.search(subject):
+                return False
+        for keyword in self.keywords:
+            if keyword in text_lower:
+                return True
+        for rule in self.incidents:
+            if rule.pattern.search(subject):
+                return True
+        if any(d in text_lower for d in self.descriptors):
+            if any(c in text_lower for c in self.context_indicators):
+                return True
+        return False
+
+    def is_fire_related(self, text):
+        if not isinstance(text, str):
+            return False
+        text_lower = text.lower()
+        if not text.isascii() and _SPECIAL_CASE.search(text):
+            return self._legacy(text, text_lower)
+
+        subject = text_lower if self.regex_on_lower else text
+        present = self._scan(text_lower)
+        for rule in self.exclusions:
+            if rule.search(subject, text_lower, present):
+                return False
+
+        found = 0
+        for word in present:
+            found |= self._categories[word]
+        if found & KEYWORD:
+            return True
+        for rule in self.incidents:
+            if rule.search(subject, text_lower, present):
+                return True
+        return found & (DESCRIPTOR | CONTEXT) == DESCRIPTOR | CONTEXT
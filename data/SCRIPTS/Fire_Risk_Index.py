@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Fire Risk Area Index
+Tags FIRMS detections with the Fire_Risk_Areas community polygon they fall in
+(commu_name, risk_rating, zone) using a grid spatial index and vectorized
+point-in-polygon tests.
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+
+DEFAULT_RISK_AREAS = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                  '..', 'HI-GIS', 'fire_risk_areas', 'Fire_Risk_Areas.geojson')
+
+RISK_FIELDS = ('commu_name', 'risk_rating', 'zone')
+
+
+def _polygon_rings(geometry):
+    """Return every ring of a Polygon/MultiPolygon geometry as (N, 2) lon/lat arrays"""
+    if geometry is None:
+        return []
+    if geometry['type'] == 'Polygon':
+        polygons = [geometry['coordinates']]
+    elif geometry['type'] == 'MultiPolygon':
+        polygons = geometry['coordinates']
+    else:
+        return []
+    return [np.asarray(ring, dtype=np.float64)[:, :2] for polygon in polygons for ring in polygon]
+
+
+class _EdgeBands:
+    """
+    Polygon edges bucketed into horizontal latitude bands.
+
+    A horizontal ray from a point can only cross edges whose latitude span covers the
+    point, i.e. edges registered in the point's band, so each point is tested against
+    a few edges instead of the whole ring.
+    """
+
+    def __init__(self, edges, band_edges=8):
+        self.edges = edges
+        y_lo = np.minimum(edges[:, 1], edges[:, 3])
+        y_hi = np.maximum(edges[:, 1], edges[:, 3])
+        self.y_min = y_lo.min()
+        span = max(y_hi.max() - self.y_min, 1e-12)
+        self.num_bands = max(1, len(edges) // band_edges)
+        self.band_height = span / self.num_bands
+
+        first = self._band(y_lo)
+        last = self._band(y_hi)
+        counts = last - first + 1
+        edge_ids = np.repeat(np.arange(len(edges)), counts)
+        bands = np.repeat(first, counts) + (np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts))
+        order = np.argsort(bands, kind='stable')
+        self.band_edge_ids = edge_ids[order]
+        self.band_offsets = np.searchsorted(bands[order], np.arange(self.num_bands + 1))
+
+    def _band(self, y):
+        return np.clip(((y - self.y_min) / self.band_height).astype(np.int64), 0, self.num_bands - 1)
+
+    def contains(self, px, py):
+        """Even-odd point-in-polygon test for arrays of points"""
+        band = self._band(py)
+        starts = self.band_offsets[band]
+        counts = self.band_offsets[band + 1] - starts
+        pair_points = np.repeat(np.arange(len(px)), counts)
+        within = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        x0, y0, x1, y1 = self.edges[self.band_edge_ids[np.repeat(starts, counts) + within]].T
+
+        x = px[pair_points]
+        y = py[pair_points]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            crossing = ((y0 > y) != (y1 > y)) & (x < (x1 - x0) * (y - y0) / (y1 - y0) + x0)
+        return np.bincount(pair_points[crossing], minlength=len(px)) % 2 == 1
+
+
+class FireRiskIndex:
+    """
+    Grid index over the Fire_Risk_Areas polygons.
+
+    Every polygon is registered in the grid cells its bounding box overlaps. A batch
+    lookup hashes points to cells, expands the (point, candidate polygon) pairs and drops
+    pairs outside the polygon bounding box. The remaining points run an even-odd ray
+    casting test against only the polygon edges in their latitude band (_EdgeBands), so
+    large coastline polygons cost a handful of edge tests per point. Holes and
+    MultiPolygon parts are handled by the even-odd rule over all rings.
+    """
+
+    def __init__(self, path=DEFAULT_RISK_AREAS, cell_size=0.02, band_edges=8):
+        """
+        Parameters:
+        - path: Fire_Risk_Areas GeoJSON file
+        - cell_size: Grid cell size in degrees
+        - band_edges: Target number of polygon edges per latitude band
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            features = json.load(f)['features']
+
+        self.cell_size = cell_size
+        self.properties = []
+        self._edges = []
+        bboxes = []
+        for feature in features:
+            rings = _polygon_rings(feature.get('geometry'))
+            if not rings:
+                continue
+            # Edge arrays (x0, y0, x1, y1) of all rings; rings are closed in GeoJSON
+            edges = np.concatenate([np.hstack([ring[:-1], ring[1:]]) for ring in rings])
+            points = np.concatenate(rings)
+            bboxes.append([points[:, 0].min(), points[:, 1].min(), points[:, 0].max(), points[:, 1].max()])
+            self._edges.append(_EdgeBands(edges, band_edges))
+            props = feature.get('properties') or {}
+            self.properties.append({key: props.get(key) for key in RISK_FIELDS + ('island',)})
+
+        self.bboxes = np.array(bboxes, dtype=np.float64).reshape(-1, 4)
+        self._build_grid()
+
+    def __len__(self):
+        return len(self.properties)
+
+    def _cell_keys(self, ix, iy):
+        # Pack both cell indexes into one int64 (longitudes are shifted to stay positive)
+        return (ix.astype(np.int64) + (1 << 20)) * (1 << 21) + (iy.astype(np.int64) + (1 << 20))
+
+    def _build_grid(self):
+        keys = []
+        owners = []
+        for poly_id, (min_x, min_y, max_x, max_y) in enumerate(self.bboxes):
+            xs = np.arange(np.floor(min_x / self.cell_size), np.floor(max_x / self.cell_size) + 1)
+            ys = np.arange(np.floor(min_y / self.cell_size), np.floor(max_y / self.cell_size) + 1)
+            gx, gy = np.meshgrid(xs, ys)
+            cell_keys = self._cell_keys(gx.ravel(), gy.ravel())
+            keys.append(cell_keys)
+            owners.append(np.full(len(cell_keys), poly_id, dtype=np.int32))
+
+        keys = np.concatenate(keys) if keys else np.empty(0, dtype=np.int64)
+        owners = np.concatenate(owners) if owners else np.empty(0, dtype=np.int32)
+        # CSR layout: sorted unique cell keys, offsets into the polygon id array
+        order = np.lexsort((owners, keys))
+        keys, owners = keys[order], owners[order]
+        self._cell_ids, starts = np.unique(keys, return_index=True)
+        self._cell_offsets = np.append(starts, len(keys))
+        self._cell_polygons = owners
+
+    def _candidate_pairs(self, lat, lon):
+        """Return (point index, polygon id) pairs whose grid cell and bounding box match"""
+        keys = self._cell_keys(np.floor(lon / self.cell_size), np.floor(lat / self.cell_size))
+        slot = np.searchsorted(self._cell_ids, keys)
+        slot = np.minimum(slot, len(self._cell_ids) - 1)
+        hit = self._cell_ids[slot] == keys
+        points = np.nonzero(hit)[0]
+        slot = slot[hit]
+
+        starts = self._cell_offsets[slot]
+        counts = self._cell_offsets[slot + 1] - starts
+        pair_points = np.repeat(points, counts)
+        # Position of each pair inside its cell's polygon list
+        within = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        pair_polys = self._cell_polygons[np.repeat(starts, counts) + within]
+
+        box = self.bboxes[pair_polys]
+        px, py = lon[pair_points], lat[pair_points]
+        keep = (px >= box[:, 0]) & (py >= box[:, 1]) & (px <= box[:, 2]) & (py <= box[:, 3])
+        return pair_points[keep], pair_polys[keep]
+
+    def locate(self, latitudes, longitudes):
+        """
+        Find the risk area polygon containing each point.
+
+        Parameters:
+        - latitudes, longitudes: Array-likes of coordinates (WGS84 degrees)
+
+        Returns:
+        - Integer array of polygon indexes into self.properties (-1 when outside every
+          area; the lowest index wins where areas overlap)
+        """
+        lat = np.asarray(latitudes, dtype=np.float64)
+        lon = np.asarray(longitudes, dtype=np.float64)
+        result = np.full(len(lat), -1, dtype=np.int32)
+        if len(lat) == 0 or len(self._cell_ids) == 0:
+            return result
+
+        pair_points, pair_polys = self._candidate_pairs(lat, lon)
+        order = np.argsort(pair_polys, kind='stable')
+        pair_points, pair_polys = pair_points[order], pair_polys[order]
+        poly_ids, starts = np.unique(pair_polys, return_index=True)
+        bounds = np.append(starts, len(pair_polys))
+
+        for poly_id, lo, hi in zip(poly_ids, bounds[:-1], bounds[1:]):
+            points = pair_points[lo:hi]
+            points = points[result[points] < 0]
+            if len(points) == 0:
+                continue
+            inside = self._edges[poly_id].contains(lon[points], lat[points])
+            result[points[inside]] = poly_id
+        return result
+
+    def lookup(self, latitudes, longitudes):
+        """
+        Tag points with their risk area attributes.
+
+        Returns:
+        - Dictionary of object arrays keyed by 'commu_name', 'risk_rating' and 'zone'
+          (None for points outside every area)
+        """
+        poly = self.locate(latitudes, longitudes)
+        columns = {}
+        for field in RISK_FIELDS:
+            # Last slot holds None for points outside every polygon
+            values = np.array([props[field] for props in self.properties] + [None], dtype=object)
+            columns[field] = values[poly]
+        return columns
+
+    def tag_records(self, records):
+        """
+        Return copies of FIRMS record dictionaries with commu_name, risk_rating and zone added.
+        """
+        lat = np.fromiter((record['latitude'] for record in records), dtype=np.float64, count=len(records))
+        lon = np.fromiter((record['longitude'] for record in records), dtype=np.float64, count=len(records))
+        columns = self.lookup(lat, lon)
+        tagged = []
+        for i, record in enumerate(records):
+            item = dict(record)
+            for field in RISK_FIELDS:
+                item[field] = columns[field][i]
+            tagged.append(item)
+        return tagged
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tag FIRMS detections with Fire_Risk_Areas attributes')
+    parser.add_argument('input_file', help='FIRMS JSON file (list of detection records)')
+    parser.add_argument('-o', '--output', help='Output JSON file path')
+    parser.add_argument('--risk-areas', default=DEFAULT_RISK_AREAS, help='Fire_Risk_Areas GeoJSON path')
+    args = parser.parse_args()
+
+    index = FireRiskIndex(args.risk_areas)
+    with open(args.input_file, 'r', encoding='utf-8') as f:
+        records = json.load(f)
+    tagged = index.tag_records(records)
+
+    in_area = sum(1 for record in tagged if record['commu_name'] is not None)
+    print(f"🔥 {in_area} of {len(tagged)} detections fall inside a fire risk area")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(tagged, f, indent=2, ensure_ascii=False)
+        print(f"💾 Tagged detections saved to: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+HI-GIS Layer Preprocessor
+Builds compact, zoom-specific versions of the HI-GIS layers for the map: polygon
+boundaries are split into shared arcs (TopoJSON-style) and each arc is simplified
+once per zoom level, so neighbouring risk areas stay gap-free; coordinates are
+quantized and delta-encoded, every feature gets a precomputed bounding box, and
+all artifacts are written under a content-derived version directory with a manifest.
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+
+import numpy as np
+
+HI_GIS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'HI-GIS')
+DEFAULT_OUTPUT_DIR = os.path.join(HI_GIS_DIR, 'processed')
+
+DEFAULT_LAYERS = {
+    'fire_risk_areas': os.path.join(HI_GIS_DIR, 'fire_risk_areas', 'Fire_Risk_Areas.geojson'),
+    'fire_stations': os.path.join(HI_GIS_DIR, 'fire_stations', 'Fire_Stations_(Statewide).geojson'),
+    'hospitals': os.path.join(HI_GIS_DIR, 'hospitals', 'Hospitals.geojson'),
+    'police_stations': os.path.join(HI_GIS_DIR, 'police_stations', 'Police_Stations_(Statewide).geojson'),
+}
+
+DEFAULT_ZOOMS = (6, 8, 10, 12)
+BASE_QUANTIZATION = 1_000_000
+
+
+def zoom_tolerance(zoom, tolerance_px=1.0):
+    """Return the simplification tolerance in degrees for one map zoom level (256 px tiles)"""
+    return tolerance_px * 360.0 / (256 * (1 << zoom))
+
+
+def douglas_peucker(points, tolerance):
+    """
+    Simplify an open polyline, always keeping both endpoints.
+
+    Parameters:
+    - points: (n, 2) array of coordinates
+    - tolerance: Maximum perpendicular distance of a removed point
+
+    Returns:
+    - Boolean mask of the points to keep
+    """
+    n = len(points)
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        start, end = points[first], points[last]
+        segment = end - start
+        inner = points[first + 1:last] - start
+        length = math.hypot(segment[0], segment[1])
+        if length == 0:
+            distances = np.hypot(inner[:, 0], inner[:, 1])
+        else:
+            distances = np.abs(inner[:, 0] * segment[1] - inner[:, 1] * segment[0]) / length
+        i = int(np.argmax(distances))
+        if distances[i] > tolerance:
+            split = first + 1 + i
+            keep[split] = True
+            stack.append((first, split))
+            stack.append((split, last))
+    return keep
+
+
+def simplify_arc(points, tolerance):
+    """Douglas-Peucker an arc; closed arcs are split at their farthest vertex first"""
+    points = np.asarray(points, dtype=np.float64)
+    if len(points) < 3 or tolerance <= 0:
+        return points
+    if np.array_equal(points[0], points[-1]):
+        far = int(np.argmax(np.hypot(*(points - points[0]).T)))
+        if far == 0:
+            return points[[0, -1]]
+        keep = np.concatenate([douglas_peucker(points[:far + 1], tolerance)[:-1],
+                               douglas_peucker(points[far:], tolerance)])
+        return points[keep]
+    return points[douglas_peucker(points, tolerance)]
+
+
+def _polygons(geometry):
+    if geometry is None:
+        return []
+    if geometry['type'] == 'Polygon':
+        return [geometry['coordinates']]
+    if geometry['type'] == 'MultiPolygon':
+        return geometry['coordinates']
+    return []
+
+
+class Topology:
+    """
+    Shared-arc representation of a polygon layer on an integer coordinate grid.
+
+    Coordinates are quantized to BASE_QUANTIZATION steps across the layer extent. A
+    vertex is a junction when it is shared by several rings whose neighbours differ
+    there; rings are cut at junctions and every arc is stored once (a ring that runs
+    along an arc backwards references it as ~index, as in TopoJSON).
+    """
+
+    def __init__(self, features):
+        self.features = features
+        coords = np.array([pt[:2] for f in features for polygon in _polygons(f.get('geometry'))
+                           for ring in polygon for pt in ring], dtype=np.float64).reshape(-1, 2)
+        self.translate = coords.min(axis=0) if len(coords) else np.zeros(2)
+        extent = float((coords.max(axis=0) - self.translate).max()) if len(coords) else 1.0
+        self.scale = (extent or 1.0) / (BASE_QUANTIZATION - 1)
+
+        # Quantized rings without the closing vertex or repeated vertices
+        self.rings = []
+        self.shapes = []  # per feature: list of polygons, each a list of ring ids
+        for feature in features:
+            shape = []
+            for polygon in _polygons(feature.get('geometry')):
+                ring_ids = []
+                for ring in polygon:
+                    q = np.round((np.asarray(ring, dtype=np.float64)[:, :2] - self.translate) / self.scale)
+                    points = [tuple(p) for p in q.astype(np.int64).tolist()]
+                    cleaned = [p for i, p in enumerate(points) if i == 0 or p != points[i - 1]]
+                    while len(cleaned) > 1 and cleaned[-1] == cleaned[0]:
+                        cleaned.pop()
+                    if len(cleaned) >= 3:
+                        ring_ids.append(len(self.rings))
+                        self.rings.append(cleaned)
+                if ring_ids:
+                    shape.append(ring_ids)
+            self.shapes.append(shape)
+
+        self.arcs = []
+        self._arc_index = {}
+        junctions = self._junctions()
+        self.ring_arcs = [self._cut(ring, junctions) for ring in self.rings]
+
+    def _junctions(self):
+        neighbours = {}
+        for ring in self.rings:
+            n = len(ring)
+            for i, point in enumerate(ring):
+                pair = frozenset((ring[i - 1], ring[(i + 1) % n]))
+                neighbours.setdefault(point, set()).add(pair)
+        return {point for point, pairs in neighbours.items() if len(pairs) > 1}
+
+    def _arc_id(self, points):
+        key = tuple(points)
+        found = self._arc_index.get(key)
+        if found is not None:
+            return found
+        found = self._arc_index.get(key[::-1])
+        if found is not None:
+            return ~found
+        self._arc_index[key] = len(self.arcs)
+        self.arcs.append(np.array(points, dtype=np.int64))
+        return len(self.arcs) - 1
+
+    def _cut(self, ring, junctions):
+        cuts = [i for i, point in enumerate(ring) if point in junctions]
+        if not cuts:
+            # Closed arc: start at the smallest vertex so identical rings share it
+            start = ring.index(min(ring))
+            rotated = ring[start:] + ring[:start]
+            return [self._arc_id(rotated + [rotated[0]])]
+        rotated = ring[cuts[0]:] + ring[:cuts[0]]
+        offsets = [i - cuts[0] for i in cuts] + [len(ring)]
+        rotated.append(rotated[0])
+        return [self._arc_id(rotated[a:b + 1]) for a, b in zip(offsets[:-1], offsets[1:])]
+
+    def encode(self, tolerance_deg, layer_name, properties=None):
+        """
+        Simplify every arc once and return a TopoJSON topology dictionary.
+
+        Parameters:
+        - tolerance_deg: Douglas-Peucker tolerance in degrees (0 keeps every vertex)
+        - layer_name: Name of the topology object
+        - properties: Property names to keep (None keeps all)
+
+        Returns:
+        - (topology, collapsed) where collapsed counts features whose exterior ring
+          simplified away; those are kept as their bounding box so small risk areas
+          still show up (collapsed holes are dropped)
+        """
+        tolerance = tolerance_deg / self.scale
+        # Coarser output grid: a quarter of the tolerance is still invisible on screen
+        factor = max(1, int(tolerance // 4))
+        simplified = []
+        for arc in self.arcs:
+            points = np.round(simplify_arc(arc, tolerance) / factor).astype(np.int64)
+            same = np.r_[False, np.all(points[1:] == points[:-1], axis=1)]
+            points = points[~same]
+            if len(points) == 1:
+                points = np.vstack([points, points])
+            simplified.append(points)
+
+        def ring_points(arc_ids):
+            parts = [simplified[a] if a >= 0 else simplified[~a][::-1] for a in arc_ids]
+            return np.concatenate([parts[0]] + [p[1:] for p in parts[1:]])
+
+        def box_ring(ring_id):
+            # Own arc covering the original ring's bounding box, at least one grid step wide
+            ring = np.array(self.rings[ring_id], dtype=np.int64)
+            low = ring.min(axis=0) // factor
+            high = np.maximum(-(-ring.max(axis=0) // factor), low + 1)
+            simplified.append(np.array([low, [high[0], low[1]], high, [low[0], high[1]], low]))
+            return [len(simplified) - 1]
+
+        geometries = []
+        collapsed = 0
+        for feature, shape in zip(self.features, self.shapes):
+            polygons = []
+            bounds = []
+            shrunk = False
+            for ring_ids in shape:
+                rings = []
+                for position, ring_id in enumerate(ring_ids):
+                    arc_ids = self.ring_arcs[ring_id]
+                    points = ring_points(arc_ids)
+                    if len(np.unique(points, axis=0)) < 3:
+                        if position > 0:
+                            continue  # Collapsed hole: nothing visible to cut out
+                        arc_ids = box_ring(ring_id)
+                        points = simplified[arc_ids[0]]
+                        shrunk = True
+                    rings.append(arc_ids)
+                    if position == 0:
+                        bounds.append(points)
+                if rings:
+                    polygons.append(rings)
+
+            props = feature.get('properties') or {}
+            if properties is not None:
+                props = {key: props.get(key) for key in properties}
+            if not polygons:
+                continue
+            collapsed += shrunk
+            corners = np.concatenate(bounds)
+            low = corners.min(axis=0) * factor * self.scale + self.translate
+            high = corners.max(axis=0) * factor * self.scale + self.translate
+            geometry = {'type': 'Polygon', 'arcs': polygons[0]} if len(polygons) == 1 else \
+                {'type': 'MultiPolygon', 'arcs': polygons}
+            geometry['properties'] = props
+            geometry['bbox'] = [round(float(v), 6) for v in (low[0], low[1], high[0], high[1])]
+            geometries.append(geometry)
+
+        # Only keep arcs still referenced, renumbered in order of first use
+        used = {}
+        for geometry in geometries:
+            nested = geometry['arcs'] if geometry['type'] == 'MultiPolygon' else [geometry['arcs']]
+            for polygon in nested:
+                for i, ring in enumerate(polygon):
+                    renumbered = []
+                    for a in ring:
+                        base = a if a >= 0 else ~a
+                        new = used.setdefault(base, len(used))
+                        renumbered.append(new if a >= 0 else ~new)
+                    polygon[i] = renumbered
+        arcs = [None] * len(used)
+        for base, new in used.items():
+            points = simplified[base]
+            arcs[new] = np.vstack([points[:1], np.diff(points, axis=0)]).tolist()
+
+        step = self.scale * factor
+        return {
+            'type': 'Topology',
+            'transform': {'scale': [step, step], 'translate': self.translate.tolist()},
+            'objects': {layer_name: {'type': 'GeometryCollection', 'geometries': geometries}},
+            'arcs': arcs,
+        }, collapsed
+
+
+def encode_points(features, layer_name, properties=None):
+    """Return a quantized TopoJSON topology for a point layer"""
+    points = [f for f in features if f.get('geometry') and f['geometry']['type'] == 'Point']
+    coords = np.array([f['geometry']['coordinates'][:2] for f in points], dtype=np.float64).reshape(-1, 2)
+    translate = coords.min(axis=0) if len(coords) else np.zeros(2)
+    extent = float((coords.max(axis=0) - translate).max()) if len(coords) else 1.0
+    scale = (extent or 1.0) / (BASE_QUANTIZATION - 1)
+    quantized = np.round((coords - translate) / scale).astype(np.int64).tolist()
+
+    geometries = []
+    for feature, xy, lonlat in zip(points, quantized, coords.tolist()):
+        props = feature.get('properties') or {}
+        if properties is not None:
+            props = {key: props.get(key) for key in properties}
+        geometries.append({'type': 'Point', 'coordinates': xy, 'properties': props,
+                           'bbox': [round(v, 6) for v in lonlat + lonlat]})
+    return {
+        'type': 'Topology',
+        'transform': {'scale': [scale, scale], 'translate': translate.tolist()},
+        'objects': {layer_name: {'type': 'GeometryCollection', 'geometries': geometries}},
+        'arcs': [],
+    }
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def preprocess_layers(layers=None, out_root=DEFAULT_OUTPUT_DIR, zooms=DEFAULT_ZOOMS, tolerance_px=1.0,
+                      properties=None):
+    """
+    Write simplified, quantized TopoJSON artifacts for each layer and zoom level.
+
+    Artifacts go to <out_root>/<version>/<layer>/z<zoom>.topojson (plus full.topojson
+    without simplification); the version is derived from the source hashes and
+    settings, so unchanged inputs reproduce the same directory. <out_root>/latest.json
+    points at the newest version.
+
+    Parameters:
+    - layers: Mapping of layer name to GeoJSON path (DEFAULT_LAYERS when None)
+    - out_root: Output root directory
+    - zooms: Zoom levels to simplify for
+    - tolerance_px: Simplification tolerance in screen pixels
+    - properties: Optional mapping of layer name to the property names to keep
+
+    Returns:
+    - The manifest dictionary
+    """
+    layers = layers or DEFAULT_LAYERS
+    properties = properties or {}
+    sources = {name: _sha256(path) for name, path in layers.items()}
+    settings = {'zooms': list(zooms), 'tolerance_px': tolerance_px, 'quantization': BASE_QUANTIZATION,
+                'properties': properties}
+    version = hashlib.sha256(json.dumps([sources, settings], sort_keys=True).encode('utf-8')).hexdigest()[:12]
+    version_dir = os.path.join(out_root, version)
+
+    manifest = {'version': version, 'settings': settings, 'layers': {}}
+    for name, path in layers.items():
+        with open(path, 'r', encoding='utf-8') as f:
+            features = json.load(f)['features']
+        layer_dir = os.path.join(version_dir, name)
+        os.makedirs(layer_dir, exist_ok=True)
+        entry = {'source': os.path.relpath(path, out_root), 'source_sha256': sources[name],
+                 'source_bytes': os.path.getsize(path), 'features': len(features), 'files': {}}
+
+        keep = properties.get(name)
+        if any(_polygons(f.get('geometry')) for f in features):
+            topology = Topology(features)
+            levels = [(f'z{z}', zoom_tolerance(z, tolerance_px)) for z in zooms] + [('full', 0.0)]
+            entry['arcs'] = len(topology.arcs)
+            for level, tolerance in levels:
+                encoded, collapsed = topology.encode(tolerance, name, keep)
+                entry['files'][level] = _write_artifact(encoded, os.path.join(layer_dir, f'{level}.topojson'),
+                                                        out_root, collapsed=collapsed)
+        else:
+            entry['files']['full'] = _write_artifact(encode_points(features, name, keep),
+                                                     os.path.join(layer_dir, 'full.topojson'), out_root)
+        manifest['layers'][name] = entry
+
+    with open(os.path.join(version_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    with open(os.path.join(out_root, 'latest.json'), 'w', encoding='utf-8') as f:
+        json.dump({'version': version, 'manifest': os.path.join(version, 'manifest.json')}, f, indent=2)
+    return manifest
+
+
+def _write_artifact(topology, path, out_root, collapsed=0):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(topology, f, separators=(',', ':'), ensure_ascii=False)
+    os.replace(tmp_path, path)
+    geometries = next(iter(topology['objects'].values()))['geometries']
+    return {'path': os.path.relpath(path, out_root), 'bytes': os.path.getsize(path),
+            'features': len(geometries), 'collapsed': collapsed,
+            'vertices': sum(len(arc) for arc in topology['arcs'])}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simplify and encode the HI-GIS layers for the map')
+    parser.add_argument('-o', '--output-dir', default=DEFAULT_OUTPUT_DIR, help='Output root directory')
+    parser.add_argument('--zooms', nargs='+', type=int, default=list(DEFAULT_ZOOMS), help='Zoom levels')
+    parser.add_argument('--tolerance-px', type=float, default=1.0, help='Simplification tolerance in pixels')
+    parser.add_argument('--layers', nargs='+', choices=sorted(DEFAULT_LAYERS), help='Layers to process')
+    args = parser.parse_args()
+
+    layers = {name: DEFAULT_LAYERS[name] for name in args.layers} if args.layers else DEFAULT_LAYERS
+    manifest = preprocess_layers(layers, args.output_dir, args.zooms, args.tolerance_px)
+
+    print(f"🗺️  HI-GIS artifacts version {manifest['version']}")
+    for name, entry in manifest['layers'].items():
+        for level, info in entry['files'].items():
+            ratio = entry['source_bytes'] / info['bytes']
+            print(f"   {name} {level}: {info['bytes'] / 1024:.1f} KiB ({ratio:.1f}x smaller), "
+                  f"{info['features']} features ({info['collapsed']} kept as bounding boxes)")
+    print(f"💾 Saved to: {os.path.join(args.output_dir, manifest['version'])}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
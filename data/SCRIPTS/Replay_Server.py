@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Scraper Replay Server
+Serves responses archived by `Web_Scraper.py --record DIR` from a local HTTP server so
+the scraper can be load tested and profiled without touching agency sites. Requests
+take the form /<host>/<path>?<query>; hosts may carry an s<N>. alias prefix
+(s17.www.kauai.gov) so a few recorded sites amplify to hundreds of synthetic sources.
+Latency, jitter and 403/500/timeout errors can be injected at configurable rates.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+ALIAS_PREFIX = re.compile(r'^s\d+\.')
+
+# Not replayed: the body is stored decoded and re-sent with its own length
+SKIPPED_HEADERS = {'content-length', 'content-encoding', 'transfer-encoding', 'connection', 'keep-alive'}
+
+
+def archive_key(url):
+    """Archive key of a URL: host, path and query (scheme and fragment dropped, alias stripped)"""
+    parts = urlsplit(url)
+    host = ALIAS_PREFIX.sub('', parts.netloc.lower())
+    return host + (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+
+
+class ResponseArchive:
+    """
+    Directory of recorded responses: <dir>/<host>/<sha1 of key>.json holds the URL,
+    status and headers, and the raw body sits next to it as .body.
+    """
+
+    def __init__(self, archive_dir):
+        self.archive_dir = archive_dir
+        self.lock = threading.Lock()
+
+    def _paths(self, key):
+        host = key.split('/', 1)[0]
+        stem = os.path.join(self.archive_dir, host, hashlib.sha1(key.encode('utf-8')).hexdigest()[:20])
+        return stem + '.json', stem + '.body'
+
+    def save(self, url, status, headers, body):
+        """Archive one response (body as raw bytes)"""
+        key = archive_key(url)
+        meta_path, body_path = self._paths(key)
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+        with self.lock:
+            with open(body_path, 'wb') as f:
+                f.write(body)
+            with open(meta_path, 'w', encoding='utf-8') as f:
+                json.dump({'key': key, 'url': url, 'status': status, 'headers': dict(headers),
+                           'recorded_at': datetime.now().isoformat()}, f, indent=2)
+
+    def load(self):
+        """Return {key: (status, headers, body)} for every archived response"""
+        entries = {}
+        if not os.path.isdir(self.archive_dir):
+            return entries
+        for host in sorted(os.listdir(self.archive_dir)):
+            host_dir = os.path.join(self.archive_dir, host)
+            if not os.path.isdir(host_dir):
+                continue
+            for name in sorted(os.listdir(host_dir)):
+                if not name.endswith('.json'):
+                    continue
+                with open(os.path.join(host_dir, name), 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+                with open(os.path.join(host_dir, name[:-5] + '.body'), 'rb') as f:
+                    body = f.read()
+                entries[meta['key']] = (meta['status'], meta['headers'], body)
+        return entries
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server replaying a ResponseArchive.
+
+    Parameters:
+    - address: (host, port) to bind
+    - entries: Output of ResponseArchive.load()
+    - latency: Added delay per response in seconds, plus up to jitter seconds at random
+    - error_rate: Fraction of requests answered with an injected error
+    - errors: Error kinds to draw from: 403, 500 and 'timeout' (no reply for timeout seconds)
+    - seed: Random seed for jitter and error injection
+    """
+    daemon_threads = True
+
+    def __init__(self, address, entries, latency=0.0, jitter=0.0, error_rate=0.0,
+                 errors=('403', '500', 'timeout'), timeout=20.0, seed=None):
+        super().__init__(address, ReplayHandler)
+        self.entries = entries
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.errors = list(errors)
+        self.timeout_seconds = timeout
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.stats_lock = threading.Lock()
+        self.stats = {'requests': 0, 'served': 0, 'not_modified': 0, 'not_found': 0, 'injected': {}}
+
+    def draw(self):
+        """Return (delay seconds, injected error or None) for one request"""
+        with self.random_lock:
+            delay = self.latency + self.random.uniform(0, self.jitter) if self.jitter else self.latency
+            error = None
+            if self.errors and self.random.random() < self.error_rate:
+                error = self.random.choice(self.errors)
+        return delay, error
+
+    def count(self, outcome, error=None):
+        with self.stats_lock:
+            self.stats['requests'] += 1
+            if error is not None:
+                self.stats['injected'][error] = self.stats['injected'].get(error, 0) + 1
+            else:
+                self.stats[outcome] += 1
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        if self.path == '/_stats':
+            with server.stats_lock:
+                body = json.dumps(server.stats, indent=2).encode('utf-8')
+            self._send(200, {'Content-Type': 'application/json'}, body)
+            return
+
+        delay, error = server.draw()
+        if delay:
+            time.sleep(delay)
+        if error == 'timeout':
+            server.count('injected', error)
+            # Hold the connection without answering, then drop it
+            time.sleep(server.timeout_seconds)
+            self.close_connection = True
+            return
+        if error is not None:
+            server.count('injected', error)
+            self._send(int(error), {'Content-Type': 'text/plain'}, f'Injected HTTP {error}\n'.encode('utf-8'))
+            return
+
+        entry = server.entries.get(archive_key('//' + self.path.lstrip('/')))
+        if entry is None:
+            server.count('not_found')
+            self._send(404, {'Content-Type': 'text/plain'}, b'Not recorded\n')
+            return
+        status, headers, body = entry
+        etag = next((v for k, v in headers.items() if k.lower() == 'etag'), None)
+        if etag and self.headers.get('If-None-Match') == etag:
+            server.count('not_modified')
+            self._send(304, {'ETag': etag}, b'')
+            return
+        server.count('served')
+        self._send(status, {k: v for k, v in headers.items() if k.lower() not in SKIPPED_HEADERS}, body)
+
+    def _send(self, status, headers, body):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay responses recorded with Web_Scraper.py --record')
+    parser.add_argument('archive_dir', help='Directory written by Web_Scraper.py --record')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to bind')
+    parser.add_argument('--port', type=int, default=8800, help='Port to listen on')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Delay added to every response')
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='Extra random delay up to this many ms')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests given an injected error')
+    parser.add_argument('--errors', nargs='+', default=['403', '500', 'timeout'], choices=['403', '500', 'timeout'],
+                        help='Injected error kinds')
+    parser.add_argument('--timeout-seconds', type=float, default=20.0,
+                        help="How long a 'timeout' error holds the connection before dropping it")
+    parser.add_argument('--seed', type=int, help='Random seed for jitter and error injection')
+    args = parser.parse_args()
+
+    entries = ResponseArchive(args.archive_dir).load()
+    if not entries:
+        print(f"❌ Error: No recorded responses in {args.archive_dir}")
+        return 1
+    hosts = sorted({key.split('/', 1)[0] for key in entries})
+    server = ReplayServer((args.host, args.port), entries, latency=args.latency_ms / 1000,
+                          jitter=args.jitter_ms / 1000, error_rate=args.error_rate, errors=args.errors,
+                          timeout=args.timeout_seconds, seed=args.seed)
+    base = f"http://{args.host}:{server.server_address[1]}"
+    print(f"📼 Replaying {len(entries)} responses from {len(hosts)} hosts at {base}")
+    for host in hosts:
+        print(f"   {host}")
+    print(f"🚀 Scrape with: python Web_Scraper.py --replay {base} [--amplify N]")
+    print(f"📊 Stats at {base}/_stats")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Nearest Responder Index
+Answers "k nearest fire stations / hospitals / police stations, with distances"
+for whole batches of FIRMS detections or scraped incidents, using the HI-GIS
+point layers and an exact k-NN search on 3D Earth coordinates (brute force for
+small layers, grid-bucketed for large ones).
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+
+HI_GIS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'HI-GIS')
+
+DEFAULT_LAYERS = {
+    'fire_stations': os.path.join(HI_GIS_DIR, 'fire_stations', 'Fire_Stations_(Statewide).geojson'),
+    'hospitals': os.path.join(HI_GIS_DIR, 'hospitals', 'Hospitals.geojson'),
+    'police_stations': os.path.join(HI_GIS_DIR, 'police_stations', 'Police_Stations_(Statewide).geojson'),
+}
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def to_earth_xyz(latitudes, longitudes):
+    """Project WGS84 degrees to 3D Earth-centered coordinates in km (spherical Earth)"""
+    lat = np.radians(np.asarray(latitudes, dtype=np.float64))
+    lon = np.radians(np.asarray(longitudes, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return EARTH_RADIUS_KM * np.column_stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)])
+
+
+def chord_to_km(chord):
+    """Convert straight-line (chord) distance to great-circle distance in km"""
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / (2 * EARTH_RADIUS_KM), 0.0, 1.0))
+
+
+# Point sets up to this size are searched by brute force: one matrix product per query
+# chunk beats the per-cell Python loop of the grid for the statewide responder layers
+BRUTE_FORCE_MAX_POINTS = 4096
+# Query rows per brute-force chunk are capped so the similarity matrix stays cache sized
+BRUTE_FORCE_CHUNK_ELEMENTS = 1 << 16
+
+
+class _GridKNN:
+    """
+    Exact k-nearest-neighbour search over a fixed point set bucketed in a 3D grid.
+
+    Small point sets are searched by brute force. Otherwise queries are grouped by grid
+    cell and, for each occupied query cell, only the points of occupied cells within a
+    Chebyshev cell radius are measured (cells are stored CSR-style: sorted cell keys
+    with offsets into the point order). The radius starts where the nearest occupied
+    cells hold k points and is widened until no point outside it can beat the k-th
+    distance found for any query in the cell. Chord distance is monotonic in
+    great-circle distance, so the ranking is exact.
+    """
+
+    def __init__(self, xyz, cell_km):
+        self.xyz = xyz
+        self.cell_km = cell_km
+        cells = np.floor(xyz / cell_km).astype(np.int64)
+        keys = self._keys(cells)
+        self.point_order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[self.point_order]
+        starts = np.flatnonzero(np.diff(sorted_keys, prepend=sorted_keys[:1] - 1))
+        self.cell_offsets = np.append(starts, len(keys))
+        self.cell_counts = np.diff(self.cell_offsets)
+        self.occupied_cells = cells[self.point_order[starts]]
+
+    @staticmethod
+    def _keys(cells):
+        # Pack the three cell indexes into one int64 key (21 bits each)
+        shifted = cells + (1 << 20)
+        return (shifted[:, 0] << 42) | (shifted[:, 1] << 21) | shifted[:, 2]
+
+    def _rank(self, queries, candidates, k):
+        # Both ends lie on the sphere, so the largest dot product is the closest point
+        similarity = queries @ self.xyz[candidates].T
+        nearest = candidates[np.argpartition(-similarity, k - 1, axis=1)[:, :k]]
+        diff = queries[:, None, :] - self.xyz[nearest]
+        best = np.sqrt(np.einsum('ijk,ijk->ij', diff, diff))
+        ranked = np.argsort(best, axis=1, kind='stable')
+        return np.take_along_axis(nearest, ranked, axis=1), np.take_along_axis(best, ranked, axis=1)
+
+    def _cell_points(self, selected):
+        # Point indexes of the selected occupied cells, concatenated without a Python loop
+        starts = self.cell_offsets[selected]
+        lengths = self.cell_counts[selected]
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        return self.point_order[offsets + np.arange(int(lengths.sum()))]
+
+    def query(self, q_xyz, k):
+        n = len(q_xyz)
+        k = min(k, len(self.xyz))
+        indexes = np.empty((n, k), dtype=np.int64)
+        chords = np.empty((n, k), dtype=np.float64)
+        if n == 0 or k == 0:
+            return indexes, chords
+
+        everything = np.arange(len(self.xyz))
+        if len(self.xyz) <= BRUTE_FORCE_MAX_POINTS:
+            step = max(1, BRUTE_FORCE_CHUNK_ELEMENTS // len(self.xyz))
+            for lo in range(0, n, step):
+                indexes[lo:lo + step], chords[lo:lo + step] = self._rank(q_xyz[lo:lo + step], everything, k)
+            return indexes, chords
+
+        q_cells = np.floor(q_xyz / self.cell_km).astype(np.int64)
+        keys = self._keys(q_cells)
+        order = np.argsort(keys)
+        sorted_keys = keys[order]
+        bounds = np.append(np.flatnonzero(np.diff(sorted_keys)) + 1, n)
+        bounds = np.insert(bounds, 0, 0)
+
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            members = order[lo:hi]
+            queries = q_xyz[members]
+            ring = np.abs(self.occupied_cells - q_cells[members[0]]).max(axis=1)
+            by_ring = np.argsort(ring, kind='stable')
+            reached = np.searchsorted(np.cumsum(self.cell_counts[by_ring]), k)
+            radius = ring[by_ring[reached]]
+            while True:
+                candidates = self._cell_points(np.nonzero(ring <= radius)[0])
+                found, best = self._rank(queries, candidates, k)
+                # Anything outside the searched block is at least radius cells away
+                needed = int(np.floor(best[:, -1].max() / self.cell_km)) + 1
+                if needed <= radius or len(candidates) == len(self.xyz):
+                    break
+                radius = needed
+            indexes[members] = found
+            chords[members] = best
+        return indexes, chords
+
+
+class ResponderIndex:
+    """
+    k-NN index over the HI-GIS responder point layers.
+
+    Each layer gets its own grid over 3D Earth coordinates; a batch query measures each
+    detection against the stations in nearby cells only and reports great-circle
+    distances in km.
+    """
+
+    def __init__(self, layers=None, cell_km=10.0):
+        """
+        Parameters:
+        - layers: Mapping of layer name to point GeoJSON path (DEFAULT_LAYERS when None)
+        - cell_km: Grid cell size in km
+        """
+        self.layers = {}
+        for name, path in (layers or DEFAULT_LAYERS).items():
+            with open(path, 'r', encoding='utf-8') as f:
+                features = json.load(f)['features']
+            points = [f for f in features if f.get('geometry') and f['geometry']['type'] == 'Point']
+            coords = np.array([f['geometry']['coordinates'][:2] for f in points], dtype=np.float64).reshape(-1, 2)
+            self.layers[name] = {
+                'properties': [f.get('properties') or {} for f in points],
+                'names': np.array([(f.get('properties') or {}).get('name') for f in points], dtype=object),
+                'latitude': coords[:, 1],
+                'longitude': coords[:, 0],
+                'grid': _GridKNN(to_earth_xyz(coords[:, 1], coords[:, 0]), cell_km),
+            }
+
+    def nearest(self, latitudes, longitudes, k=3, layers=('fire_stations', 'hospitals')):
+        """
+        Find the k nearest features of each layer for a batch of points.
+
+        Parameters:
+        - latitudes, longitudes: Array-likes of query coordinates
+        - k: Number of neighbours per layer (capped at the layer size)
+        - layers: Layer names to search
+
+        Returns:
+        - Dictionary keyed by layer name with (n, k) arrays 'index' (into the layer's
+          features), 'distance_km' and 'name', nearest first
+        """
+        q_xyz = to_earth_xyz(latitudes, longitudes)
+        results = {}
+        for name in layers:
+            layer = self.layers[name]
+            indexes, chords = layer['grid'].query(q_xyz, k)
+            results[name] = {
+                'index': indexes,
+                'distance_km': chord_to_km(chords),
+                'name': layer['names'][indexes],
+            }
+        return results
+
+    def nearest_records(self, records, k=3, layers=('fire_stations', 'hospitals')):
+        """
+        Return copies of detection/incident dictionaries with a 'nearest_<layer>' list of
+        {'name', 'latitude', 'longitude', 'distance_km'} entries added for each layer.
+        Records without coordinates are returned unchanged.
+        """
+        located = [i for i, r in enumerate(records)
+                   if r.get('latitude') is not None and r.get('longitude') is not None]
+        lat = np.array([records[i]['latitude'] for i in located], dtype=np.float64)
+        lon = np.array([records[i]['longitude'] for i in located], dtype=np.float64)
+        found = self.nearest(lat, lon, k=k, layers=layers)
+
+        output = [dict(record) for record in records]
+        for row, i in enumerate(located):
+            for name in layers:
+                layer = self.layers[name]
+                output[i][f'nearest_{name}'] = [
+                    {
+                        'name': layer['names'][j],
+                        'latitude': float(layer['latitude'][j]),
+                        'longitude': float(layer['longitude'][j]),
+                        'distance_km': round(float(d), 3),
+                    }
+                    for j, d in zip(found[name]['index'][row], found[name]['distance_km'][row])
+                ]
+        return output
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Find the nearest responders for FIRMS detections')
+    parser.add_argument('input_file', help='JSON file with a list of records carrying latitude/longitude')
+    parser.add_argument('-o', '--output', help='Output JSON file path')
+    parser.add_argument('-k', type=int, default=3, help='Neighbours per layer')
+    parser.add_argument('--layers', nargs='+', default=['fire_stations', 'hospitals'],
+                        choices=sorted(DEFAULT_LAYERS), help='Layers to search')
+    args = parser.parse_args()
+
+    with open(args.input_file, 'r', encoding='utf-8') as f:
+        records = json.load(f)
+    enriched = ResponderIndex().nearest_records(records, k=args.k, layers=args.layers)
+
+    print(f"🚒 Nearest responders found for {len(enriched)} records")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(enriched, f, indent=2, ensure_ascii=False)
+        print(f"💾 Results saved to: {args.output}")
+    elif enriched:
+        print(json.dumps(enriched[0], indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
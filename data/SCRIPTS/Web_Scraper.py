@@ -7,11 +7,27 @@ and runs in 10-minute intervals with a boot message.
 """
 
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+import soupsieve
 import re
+import os
 import json
+import random
 import time
+import argparse
+import hashlib
+import heapq
+import socket
+import sqlite3
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+
+from Fire_Matcher import FireMatcher
+from Replay_Server import ResponseArchive
+from Scraper_Metrics import JsonLogger, MetricsRegistry
 
 # ================================
 # 🚀 Boot Banner
@@ -67,26 +83,16 @@ class WildfireFilter:
             r'\b(flames?|smoke)\s*(visible|seen|spotted)\b',
             r'\b(burning|fire)\s*(building|home|house|structure)\b'
         ]
+        self.context_indicators = ['emergency', 'incident', 'evacuat', 'danger']
         self.compiled_incident_patterns = [re.compile(p, re.IGNORECASE) for p in self.fire_incident_patterns]
         self.compiled_exclusion_patterns = [re.compile(p, re.IGNORECASE) for p in self.exclusion_patterns]
+        # Single-pass engine; regexes run on the lowercased text as before
+        self.matcher = FireMatcher(self.compiled_exclusion_patterns, self.fire_incident_keywords,
+                                   self.compiled_incident_patterns, self.fire_descriptors,
+                                   self.context_indicators, regex_on_lower=True)
 
     def is_fire_related(self, text):
-        if not isinstance(text, str):
-            return False
-        text_lower = text.lower()
-        for pattern in self.compiled_exclusion_patterns:
-            if pattern.search(text_lower):
-                return False
-        for keyword in self.fire_incident_keywords:
-            if keyword in text_lower:
-                return True
-        for pattern in self.compiled_incident_patterns:
-            if pattern.search(text_lower):
-                return True
-        if any(d in text_lower for d in self.fire_descriptors):
-            if any(c in text_lower for c in ['emergency', 'incident', 'evacuat', 'danger']):
-                return True
-        return False
+        return self.matcher.is_fire_related(text)
 
     def analyze(self, item):
         if isinstance(item, dict):
@@ -95,33 +101,345 @@ class WildfireFilter:
             combined = str(item)
         return self.is_fire_related(combined)
 
-def fetch_soup(url):
-    headers = [
-        { 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)' },
-        { 'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)' },
-        { 'User-Agent': 'Mozilla/5.0 (iPhone; CPU iPhone OS 14_0)' }
-    ]
-    for h in headers:
+# ================================
+# 📈 Metrics
+# ================================
+metrics = MetricsRegistry()
+STAGE_SECONDS = metrics.histogram('scraper_stage_seconds', 'Time spent per scan stage and source',
+                                  ('stage', 'source'))
+FETCH_SECONDS = metrics.histogram('scraper_fetch_seconds', 'HTTP round-trip time per request (excludes rate limiting)',
+                                  ('host',))
+DNS_PROBE_SECONDS = metrics.histogram('scraper_dns_probe_seconds',
+                                      "Separate getaddrinfo probe per host, not the request's own lookup (sampled)",
+                                      ('host',))
+HTTP_RESPONSES = metrics.counter('scraper_http_responses_total', 'HTTP responses by status code', ('host', 'status'))
+REQUEST_ERRORS = metrics.counter('scraper_request_errors_total', 'Requests that got no response', ('host', 'error'))
+BYTES_FETCHED = metrics.counter('scraper_bytes_fetched_total', 'Response body bytes downloaded', ('host',))
+PAGES = metrics.counter('scraper_pages_total', 'Pages by outcome (parsed, not_modified, failed)', ('host', 'outcome'))
+ENTRIES = metrics.counter('scraper_entries_total', 'Scraped entries by outcome (kept, dropped, duplicate)',
+                          ('source', 'outcome'))
+SCAN_SECONDS = metrics.histogram('scraper_scan_seconds', 'Duration of a full scan',
+                                 buckets=(1, 2.5, 5, 10, 20, 30, 60, 120, 300, 600))
+LAST_SCAN = metrics.gauge('scraper_last_scan_timestamp_seconds', 'Unix time the last scan finished')
+
+# Structured JSON event log, opened by main_loop(log_json=...)
+event_log = JsonLogger()
+
+# Seconds between DNS samples of one host, so the extra lookup is not paid on every scrape
+DNS_SAMPLE_INTERVAL = 300
+_dns_sampled = {}
+_dns_sampled_lock = threading.Lock()
+
+def time_dns(url):
+    # A probe of its own, not the request's lookup (urllib3 resolves inside connect and
+    # the resolver may cache): it tracks how resolution of the source host behaves.
+    # Skipped when replaying: every source is served from the replay server's address.
+    if REPLAY_BASE:
+        return None
+    parsed = urlparse(url)
+    host = parsed.netloc
+    now = time.monotonic()
+    with _dns_sampled_lock:
+        if now - _dns_sampled.get(host, -DNS_SAMPLE_INTERVAL) < DNS_SAMPLE_INTERVAL:
+            return None
+        _dns_sampled[host] = now
+    started = time.perf_counter()
+    try:
+        socket.getaddrinfo(parsed.hostname, parsed.port or (443 if parsed.scheme == 'https' else 80),
+                           type=socket.SOCK_STREAM)
+    except OSError as e:
+        REQUEST_ERRORS.inc(host=host, error='dns')
+        event_log.log('dns_error', host=host, error=str(e))
+        return None
+    elapsed = time.perf_counter() - started
+    DNS_PROBE_SECONDS.observe(elapsed, host=host)
+    return elapsed
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` requests per second with bursts up to `capacity`"""
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+class HostRateLimiter:
+    """One TokenBucket per host, so different sites never wait on each other"""
+    def __init__(self, rate=1.0, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, url):
+        host = urlparse(url).netloc
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = self.buckets[host] = TokenBucket(self.rate, self.capacity)
+        bucket.acquire()
+
+# Shared politeness limit: at most one request per second to each host
+host_limiter = HostRateLimiter(rate=1.0, capacity=1)
+
+# Keep-alive connection pool per host, reused across pages and scans
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+def get_session(url):
+    host = urlparse(url).netloc
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _sessions[host] = session
+    return session
+
+class ResponseCache:
+    """
+    Disk cache of validators (ETag / Last-Modified) and the articles extracted from
+    each page, so an unchanged page (HTTP 304) is never downloaded or parsed again.
+    Entries carry the extraction version that produced them; with a different version
+    they count as missing, so changed extraction rules re-download and re-parse.
+    """
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+
+    def _path(self, url):
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.json')
+
+    def get(self, url, version=None):
         try:
-            resp = requests.get(url, headers=h, timeout=15)
-            if resp.status_code == 200:
-                return BeautifulSoup(resp.text, 'html.parser')
-            else:
-                print(f"⚠️  HTTP {resp.status_code} - {url}")
+            with open(self._path(url), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get('extractor') == version else None
+
+    def put(self, url, etag, last_modified, articles, version=None):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(url)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'url': url, 'etag': etag, 'last_modified': last_modified, 'extractor': version,
+                       'saved_at': datetime.now().isoformat(), 'articles': articles}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def conditional_headers(self, url, version=None):
+        entry = self.get(url, version)
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+response_cache = ResponseCache(os.path.join(os.path.dirname(os.path.abspath(__file__)), '.http_cache'))
+
+# Record / replay (see Replay_Server.py), set from the command line
+RECORD_ARCHIVE = None   # ResponseArchive that receives every 200 response
+REPLAY_BASE = None      # e.g. http://127.0.0.1:8800: requests go to REPLAY_BASE/<host><path>?<query>
+
+def route_url(url):
+    if not REPLAY_BASE:
+        return url
+    parts = urlparse(url)
+    return f"{REPLAY_BASE.rstrip('/')}/{parts.netloc}{parts.path or '/'}" + (f"?{parts.query}" if parts.query else '')
+
+def amplify_sources(urls, copies):
+    # s<N>.<host> aliases of every source; the replay server maps them back to <host>
+    return [urlparse(url)._replace(netloc=f"s{i}.{urlparse(url).netloc}").geturl()
+            for i in range(copies) for url in urls]
+
+USER_AGENT_HEADERS = [
+    { 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)' },
+    { 'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)' },
+    { 'User-Agent': 'Mozilla/5.0 (iPhone; CPU iPhone OS 14_0)' }
+]
+
+def fetch_response(url, limiter=None, extra_headers=None):
+    limiter = limiter or host_limiter
+    session = get_session(url)
+    host = urlparse(url).netloc
+    for h in USER_AGENT_HEADERS:
+        limiter.acquire(url)
+        started = time.perf_counter()
+        try:
+            resp = session.get(route_url(url), headers={**h, **(extra_headers or {})}, timeout=15)
         except requests.exceptions.RequestException as e:
+            REQUEST_ERRORS.inc(host=host, error=type(e).__name__)
+            event_log.log('request_error', url=url, error=str(e))
             print(f"❌ Request failed for {url}: {str(e)}")
+            continue
+        elapsed = time.perf_counter() - started
+        FETCH_SECONDS.observe(elapsed, host=host)
+        HTTP_RESPONSES.inc(host=host, status=resp.status_code)
+        BYTES_FETCHED.inc(len(resp.content), host=host)
+        event_log.log('http_response', url=url, status=resp.status_code, bytes=len(resp.content),
+                      seconds=round(elapsed, 4))
+        if resp.status_code == 200 and RECORD_ARCHIVE is not None:
+            RECORD_ARCHIVE.save(url, resp.status_code, resp.headers, resp.content)
+        if resp.status_code in (200, 304):
+            return resp
+        print(f"⚠️  HTTP {resp.status_code} - {url}")
     return None
 
-def extract_articles(soup, base_url):
-    results = []
-
-    # 🌐 Default: search for <article>
-    articles = soup.find_all('article')
-    if articles:
-        for article in articles:
-            title_elem = article.find(['h1','h2','h3','h4'])
-            link_elem = article.find('a', href=True)
-            content = article.get_text(" ", strip=True)
+def fetch_soup(url, limiter=None):
+    resp = fetch_response(url, limiter)
+    return BeautifulSoup(resp.text, HTML_PARSER) if resp is not None else None
+
+def fetch_articles(url, base_url, limiter=None, cache=None):
+    # Returns (articles, soup); soup is None when the cached articles were reused
+    # after a 304, and (None, None) when the page could not be fetched.
+    cache = cache or response_cache
+    host = urlparse(base_url).netloc
+    version = extraction_version(base_url)
+    # Recording needs full responses, so no validators are sent
+    validators = cache.conditional_headers(url, version) if RECORD_ARCHIVE is None else {}
+    resp = fetch_response(url, limiter, validators)
+    if resp is None:
+        PAGES.inc(host=host, outcome='failed')
+        return None, None
+    if resp.status_code == 304:
+        entry = cache.get(url, version)
+        if entry is not None:
+            PAGES.inc(host=host, outcome='not_modified')
+            return entry['articles'], None
+        resp = fetch_response(url, limiter)  # Validators without a cache entry: refetch in full
+        if resp is None or resp.status_code != 200:
+            PAGES.inc(host=host, outcome='failed')
+            return None, None
+    with STAGE_SECONDS.time(stage='parse', source=host):
+        soup = parse_page(resp.text, base_url)
+    with STAGE_SECONDS.time(stage='extract', source=host):
+        articles = extract_articles(soup, base_url)
+    PAGES.inc(host=host, outcome='parsed')
+    etag, last_modified = resp.headers.get('ETag'), resp.headers.get('Last-Modified')
+    if etag or last_modified:
+        cache.put(url, etag, last_modified, articles, version)
+    return articles, soup
+
+# ================================
+# 🧩 Site Extractors
+# ================================
+# lxml builds trees several times faster than html.parser; used when installed
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+BOILERPLATE_TAGS = {'nav', 'header', 'footer', 'aside'}
+BOILERPLATE_ROLES = {'navigation', 'banner', 'contentinfo', 'menu', 'menubar', 'search'}
+BOILERPLATE_CLASSES = {'nav', 'navbar', 'menu', 'breadcrumb', 'breadcrumbs', 'sidebar', 'footer', 'skip-link'}
+
+def _classes(attrs):
+    value = attrs.get('class') or ()
+    return set(value.split()) if isinstance(value, str) else set(value)
+
+def is_boilerplate(name, attrs):
+    # Navigation, banners and footers never hold news items
+    if name in BOILERPLATE_TAGS or attrs.get('role') in BOILERPLATE_ROLES:
+        return True
+    return name in ('div', 'ul', 'ol', 'section') and not BOILERPLATE_CLASSES.isdisjoint(_classes(attrs))
+
+class ContainerStrainer(SoupStrainer):
+    """
+    Restricted parse: only the subtrees of article containers are built, everything
+    else on the page is skipped by the tree builder. With catch_all containers (site
+    containers matching any tag of a kind, like Kauai's <li>), top-level navigation,
+    header and footer blocks are built too so parse_page can drop the catch-all items
+    in them, like menu <li>s, which would otherwise be mistaken for articles.
+    """
+    def __init__(self, containers, catch_all=()):
+        super().__init__()
+        self.containers = containers
+        self.catch_all = set(catch_all)
+        self.keep_boilerplate = bool(self.catch_all)
+
+    def container_matches(self, name, attrs, containers):
+        for tag, cls in containers:
+            if tag == name and (cls is None or cls in _classes(attrs)):
+                return True
+        return False
+
+    def matches(self, name, attrs):
+        attrs = attrs or {}
+        if self.container_matches(name, attrs, self.containers):
+            return True
+        return self.keep_boilerplate and is_boilerplate(name, attrs)
+
+    def drop_boilerplate_items(self, soup):
+        # Only catch-all items of top-level boilerplate blocks go; articles and site
+        # containers nested in those blocks (and their own items) are kept as on every
+        # other host
+        specific = [c for c in self.containers if c not in self.catch_all]
+        for node in soup.find_all(lambda tag: is_boilerplate(tag.name, tag.attrs), recursive=False):
+            items = node.find_all(lambda tag: self.container_matches(tag.name, tag.attrs, self.catch_all))
+            for item in items:
+                if item.decomposed:
+                    continue
+                nested = False
+                for parent in item.parents:
+                    if parent is node:
+                        break
+                    if self.container_matches(parent.name, parent.attrs, specific):
+                        nested = True
+                        break
+                if not nested:
+                    item.decompose()
+
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        return self.matches(name, attrs)
+
+    def allow_string_creation(self, string):
+        return False
+
+    def search_tag(self, markup_name=None, markup_attrs={}):
+        # Parse hook of bs4 < 4.13
+        return self.matches(markup_name, dict(markup_attrs))
+
+class SiteExtractor:
+    """
+    Article extraction rules for one site: the hosts it serves, its container elements
+    as (tag, class) pairs (class None for any), where the title comes from ('heading'
+    or 'link') and the minimum content length kept. The container selector is
+    compiled once.
+    """
+    def __init__(self, hosts, containers, title='link', min_content_length=0):
+        self.hosts = tuple(hosts)
+        self.containers = list(containers)
+        self.title = title
+        self.min_content_length = min_content_length
+        self.selector = soupsieve.compile(', '.join(tag + (f'.{cls}' if cls else '') for tag, cls in self.containers))
+
+    def matches(self, host):
+        return any(host == h or host.endswith('.' + h) for h in self.hosts)
+
+    def extract(self, soup, base_url):
+        results = []
+        for item in self.selector.select(soup):
+            link_elem = item.find('a', href=True)
+            title_elem = item.find(['h1', 'h2', 'h3', 'h4']) if self.title == 'heading' else link_elem
+            content = item.get_text(" ", strip=True)
+            if len(content) < self.min_content_length:
+                continue
             title = title_elem.get_text(strip=True) if title_elem else 'Untitled'
             link = link_elem['href'] if link_elem else None
             if link and link.startswith('/'):
@@ -134,60 +452,64 @@ def extract_articles(soup, base_url):
             })
         return results
 
-    # 🌐 Fallback for Maui County: <div class="CivicAlertsItem"> inside <div id="CivicAlertsList">
-    if "mauicounty.gov" in base_url:
-        for item in soup.select("div.CivicAlertsItem"):
-            title_elem = item.find('a', href=True)
-            title = title_elem.get_text(strip=True) if title_elem else 'Untitled'
-            link = title_elem['href'] if title_elem else None
-            if link and link.startswith('/'):
-                link = base_url.rstrip('/') + link
-            content = item.get_text(" ", strip=True)
-            results.append({
-                'title': title,
-                'link': link,
-                'content': content,
-                'date': extract_date(content)
-            })
-        return results
+# 🌐 Default for every site: <article>
+ARTICLE_EXTRACTOR = SiteExtractor((), [('article', None)], title='heading')
 
-    # 🌐 Fallback for Hawaii County: li.news-item
-    if "hawaiicounty.gov" in base_url:
-        for item in soup.select("li.news-item"):
-            title_elem = item.find('a', href=True)
-            title = title_elem.get_text(strip=True) if title_elem else 'Untitled'
-            link = title_elem['href'] if title_elem else None
-            if link and link.startswith('/'):
-                link = base_url.rstrip('/') + link
-            content = item.get_text(" ", strip=True)
-            results.append({
-                'title': title,
-                'link': link,
-                'content': content,
-                'date': extract_date(content)
-            })
-        return results
+# 🌐 Per-site fallbacks, used when a page has no <article>
+EXTRACTORS = []
 
-    # 🌐 Fallback for Kauai: div.press-item or li
-    if "kauai.gov" in base_url:
-        for item in soup.select("li, div.press-item"):
-            title_elem = item.find('a', href=True)
-            title = title_elem.get_text(strip=True) if title_elem else 'Untitled'
-            link = title_elem['href'] if title_elem else None
-            if link and link.startswith('/'):
-                link = base_url.rstrip('/') + link
-            content = item.get_text(" ", strip=True)
-            if len(content) > 50:
-                results.append({
-                    'title': title,
-                    'link': link,
-                    'content': content,
-                    'date': extract_date(content)
-                })
-        return results
+def register_extractor(extractor):
+    EXTRACTORS.append(extractor)
+    return extractor
+
+def get_extractor(base_url):
+    host = (urlparse(base_url).hostname or '').lower()
+    for extractor in EXTRACTORS:
+        if extractor.matches(host):
+            return extractor
+    return None
+
+# Bump when extraction code changes; rule changes are picked up by extraction_version
+EXTRACTOR_VERSION = 2
+
+def extraction_version(base_url):
+    # Identifies the rules that extract a page, stored with its cached articles
+    rules = [EXTRACTOR_VERSION]
+    for extractor in (ARTICLE_EXTRACTOR, get_extractor(base_url)):
+        if extractor is not None:
+            rules.append((extractor.hosts, extractor.containers, extractor.title, extractor.min_content_length))
+    return hashlib.sha1(repr(rules).encode('utf-8')).hexdigest()[:12]
 
+# Maui County: <div class="CivicAlertsItem"> inside <div id="CivicAlertsList">
+register_extractor(SiteExtractor(['mauicounty.gov'], [('div', 'CivicAlertsItem')]))
+# Hawaii County: li.news-item
+register_extractor(SiteExtractor(['hawaiicounty.gov'], [('li', 'news-item')]))
+# Kauai: div.press-item or any <li> with more than 50 characters of text
+register_extractor(SiteExtractor(['kauai.gov'], [('li', None), ('div', 'press-item')], min_content_length=51))
+
+_strainers = {}
+
+def parse_page(html, base_url, parser=None):
+    extractor = get_extractor(base_url)
+    strainer = _strainers.get(extractor)
+    if strainer is None:
+        site_containers = extractor.containers if extractor else []
+        # Building boilerplate only pays off when a container matches any tag of its kind
+        catch_all = [(tag, cls) for tag, cls in site_containers if cls is None]
+        strainer = _strainers[extractor] = ContainerStrainer(ARTICLE_EXTRACTOR.containers + site_containers,
+                                                             catch_all)
+    soup = BeautifulSoup(html, parser or HTML_PARSER, parse_only=strainer)
+    if strainer.keep_boilerplate:
+        strainer.drop_boilerplate_items(soup)
+    return soup
+
+def extract_articles(soup, base_url):
+    results = ARTICLE_EXTRACTOR.extract(soup, base_url)
+    if results:
+        return results
+    extractor = get_extractor(base_url)
     # 🚫 Nothing matched
-    return results
+    return extractor.extract(soup, base_url) if extractor else []
 
 
 def extract_date(text):
@@ -209,75 +531,488 @@ def detect_type(content):
         return 'commercial'
     return 'unknown'
 
+def entry_key(item):
+    return item.get('link') or item.get('title') + item.get('content', '')
+
 def deduplicate_entries(entries):
     seen = set()
     deduped = []
     for item in entries:
-        key = item.get('link') or item.get('title') + item.get('content', '')
+        key = entry_key(item)
         if key not in seen:
             seen.add(key)
             deduped.append(item)
     return deduped
 
-def scrape_multipage(base_url, max_pages=5):
+class ScrapeState:
+    """
+    Persistent per-source high-water marks for incremental scraping: the newest entry
+    seen (link and date) plus a bounded set of recently seen entry keys.
+    """
+    def __init__(self, path, max_seen=1000):
+        self.path = path
+        self.max_seen = max_seen
+        self.lock = threading.Lock()
+        self.sources = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.sources = json.load(f)
+        self._seen = {url: set(entry.get('seen', [])) for url, entry in self.sources.items()}
+
+    def is_seen(self, source, item):
+        with self.lock:
+            return entry_key(item) in self._seen.get(source, ())
+
+    def high_water(self, source):
+        with self.lock:
+            return (self.sources.get(source) or {}).get('newest_link')
+
+    def mark(self, source, items):
+        # Items are listed newest first, so the first one becomes the new high-water mark
+        with self.lock:
+            entry = self.sources.setdefault(source, {'seen': []})
+            seen = self._seen.setdefault(source, set())
+            new_keys = [entry_key(item) for item in items if entry_key(item) not in seen]
+            if items:
+                entry['newest_link'] = items[0].get('link')
+                entry['newest_date'] = items[0].get('date')
+            entry['seen'] = (new_keys + entry['seen'])[:self.max_seen]
+            self._seen[source] = set(entry['seen'])
+            entry['updated_at'] = datetime.now().isoformat()
+
+    def save(self):
+        with self.lock:
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.sources, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+
+class IncidentStore:
+    """
+    SQLite store of every fire-related entry exported so far. Entries are keyed by a
+    hash of their normalized title and content and by link (both indexed), so cross-run
+    dedup is one index lookup; new incidents are also appended to a daily NDJSON log
+    that downstream jobs can tail instead of rereading full snapshots. The log is
+    written before the rows commit, so it may repeat a line after a crash but never
+    misses one.
+    """
+    def __init__(self, db_path, log_dir):
+        self.log_dir = log_dir
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS incidents (
+                id INTEGER PRIMARY KEY,
+                content_hash TEXT NOT NULL UNIQUE,
+                link TEXT,
+                source TEXT,
+                title TEXT,
+                date TEXT,
+                type_of_fire TEXT,
+                first_seen TEXT NOT NULL,
+                data TEXT NOT NULL
+            )""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS incidents_link ON incidents (link)")
+        self.conn.commit()
+
+    @staticmethod
+    def content_hash(item):
+        # Case, punctuation and whitespace changes do not make a new incident
+        text = f"{item.get('title') or ''} {item.get('content') or ''}".lower()
+        normalized = ' '.join(re.findall(r'[a-z0-9]+', text))
+        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+    def contains(self, item):
+        if item.get('link') and self.conn.execute(
+                "SELECT 1 FROM incidents WHERE link = ? LIMIT 1", (item['link'],)).fetchone():
+            return True
+        return self.conn.execute("SELECT 1 FROM incidents WHERE content_hash = ? LIMIT 1",
+                                 (self.content_hash(item),)).fetchone() is not None
+
+    def add(self, entries, source=None):
+        # Returns the entries that were not stored before, in order
+        added = []
+        now = datetime.now()
+        with self.conn:
+            for item in entries:
+                if self.contains(item):
+                    continue
+                self.conn.execute(
+                    "INSERT INTO incidents (content_hash, link, source, title, date, type_of_fire, first_seen, data)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (self.content_hash(item), item.get('link'), source or item.get('source'), item.get('title'),
+                     item.get('date'), item.get('type_of_fire'), now.isoformat(),
+                     json.dumps(item, ensure_ascii=False)))
+                added.append(item)
+            if added:
+                # Logged and synced before the transaction commits: a crash in between
+                # rolls the rows back and repeats the lines next run instead of losing them
+                os.makedirs(self.log_dir, exist_ok=True)
+                log_path = os.path.join(self.log_dir, f"fire_incidents_{now.strftime('%Y%m%d')}.ndjson")
+                with open(log_path, 'a', encoding='utf-8') as f:
+                    for item in added:
+                        f.write(json.dumps({**item, 'first_seen': now.isoformat()}, ensure_ascii=False) + '\n')
+                    f.flush()
+                    os.fsync(f.fileno())
+        return added
+
+    def close(self):
+        self.conn.close()
+
+DEFAULT_STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fire_incidents.sqlite3')
+DEFAULT_STATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scrape_state.json')
+
+def scrape_multipage(base_url, max_pages=5, limiter=None, cache=None, state=None):
+    # With a ScrapeState only unseen entries are returned, and pagination stops at the
+    # first page holding no new entries or the previous high-water mark.
+    return scrape_source(base_url, max_pages, limiter, cache, state)[0]
+
+def scrape_source(base_url, max_pages=5, limiter=None, cache=None, state=None):
+    # Same as scrape_multipage, returning (entries, ok); ok is False when the first page failed
+    host = urlparse(base_url).netloc
+    started = time.perf_counter()
+    time_dns(base_url)
     all_items = []
+    ok = True
     for page in range(1, max_pages+1):
         url = f"{base_url}?page={page}" if page > 1 else base_url
-        soup = fetch_soup(url)
-        if not soup:
-            print(f"  ❌ Failed to fetch page {page} (no response or HTML error)")
+        articles, soup = fetch_articles(url, base_url, limiter, cache)
+        if articles is None:
+            print(f"  ❌ {host}: Failed to fetch page {page} (no response or HTML error)")
+            ok = page > 1
             break
 
-        articles = extract_articles(soup, base_url)
-
-        if not articles:
+        if soup is None:
+            print(f"  ♻️  {host} page {page}: not modified, {len(articles)} cached entries")
+        elif not articles:
             if not soup.find_all('article'):
-                print(f"  ⚠️ No <article> tags found on page {page} — structure may differ.")
+                print(f"  ⚠️ {host}: No <article> tags found on page {page} — structure may differ.")
             else:
-                print(f"  ⚠️ No valid articles extracted on page {page}.")
+                print(f"  ⚠️ {host}: No valid articles extracted on page {page}.")
         else:
-            print(f"  📄 Page {page}: {len(articles)} entries")
+            print(f"  📄 {host} page {page}: {len(articles)} entries")
 
         if not articles:
             break
 
-        all_items.extend(articles)
-        time.sleep(1)
-    return all_items
-
-def main_loop():
-    urls = [
-        "https://fire.honolulu.gov/news-and-info/news-releases/",
-        "https://www.honolulupd.org/news/",
-        "https://www.mauicounty.gov/CivicAlerts.aspx?CID=6,3,7",
-        "https://www.hawaiicounty.gov/our-county/county-news/-seldept-7#newsdepts_11355_13347_1411",
-        "https://www.hawaiipolice.gov/category/media-releases/",
-        "https://www.kauai.gov/County-Press-Releases"
-    ]
-    wildfire_filter = WildfireFilter()
-    while True:
-        all_filtered = []
-        print(f"🔍 Starting scan @ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        if state is None:
+            all_items.extend(articles)
+            continue
+        high_water = state.high_water(base_url)
+        fresh = []
+        for item in articles:
+            if high_water and item.get('link') == high_water:
+                break
+            if not state.is_seen(base_url, item):
+                fresh.append(item)
+        all_items.extend(fresh)
+        if len(fresh) < len(articles):
+            print(f"  ⏹️  {host}: reached already-seen entries on page {page}, {len(all_items)} new")
+            break
+    STAGE_SECONDS.observe(time.perf_counter() - started, stage='scrape', source=host)
+    return all_items, ok
+
+def scrape_all(urls, max_pages=5, max_workers=6, limiter=None, cache=None, state=None):
+    # Sites are scraped in parallel (pages of one site stay sequential and rate limited
+    # per host), so a scan takes about as long as the slowest site.
+    # Returns a list of (url, entries) in the order of `urls`.
+    limiter = limiter or host_limiter
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(scrape_multipage, url, max_pages, limiter, cache, state) for url in urls]
+        results = []
+        for url, future in zip(urls, futures):
+            try:
+                results.append((url, future.result()))
+            except Exception as e:
+                print(f"❌ Scrape failed for {url}: {str(e)}")
+                results.append((url, []))
+    return results
+
+class PollScheduler:
+    """
+    Adaptive per-source polling on a heap of next-poll times.
+
+    Each source keeps an EWMA of its change rate (a change is a poll that returned
+    entries the previous poll did not) and is polled about twice per expected change,
+    within [min_interval, max_interval]. New fire-related entries make a source poll
+    fire_boost times faster for fire_window seconds. A failed poll backs its host off
+    exponentially from retry_interval, and every interval gets +/- jitter so sources
+    do not poll in lockstep. Unset bounds scale with base_interval (60 s to 6 h at 600 s).
+    """
+    def __init__(self, urls, base_interval=600, min_interval=None, max_interval=None, alpha=0.3,
+                 fire_boost=4, fire_window=None, retry_interval=None, max_backoff=None,
+                 jitter=0.1, seed=None, now=None):
+        self.min_interval = base_interval / 10 if min_interval is None else min_interval
+        self.max_interval = base_interval * 36 if max_interval is None else max_interval
+        self.alpha = alpha
+        self.fire_boost = fire_boost
+        self.fire_window = self.max_interval if fire_window is None else fire_window
+        self.retry_interval = self.min_interval if retry_interval is None else retry_interval
+        self.max_backoff = self.max_interval if max_backoff is None else max_backoff
+        self.jitter = jitter
+        self.random = random.Random(seed)
+        self.heap = []
+        self.sources = {}
+        self.host_failures = {}
+        self.host_retry_at = {}
+        now = time.time() if now is None else now
         for url in urls:
-            print(f"🌐 Scraping: {url}")
-            entries = scrape_multipage(url, max_pages=5)
-            fire_entries = []
-            for item in entries:
-                if wildfire_filter.analyze(item):
-                    item['type_of_fire'] = detect_type(item.get('content', ''))
-                    fire_entries.append(item)
-            print(f"🔥 Fire-related entries found: {len(fire_entries)}")
-            all_filtered.extend(fire_entries)
+            # Start at the fixed interval: half a change expected per base_interval
+            self.sources[url] = {'rate': 1 / (2 * base_interval), 'interval': base_interval,
+                                 'last_poll': None, 'keys': set(), 'fire_until': 0, 'next': None}
+            self._push(url, now)
+
+    def _push(self, url, at):
+        # Superseded heap entries are skipped when popped (their time no longer matches)
+        self.sources[url]['next'] = at
+        heapq.heappush(self.heap, (at, url))
+
+    def _jittered(self, seconds):
+        return seconds * self.random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _discard_stale(self):
+        while self.heap and self.sources[self.heap[0][1]]['next'] != self.heap[0][0]:
+            heapq.heappop(self.heap)
+
+    def pop_due(self, now=None):
+        """Remove and return the sources due at now; they are rescheduled by record()"""
+        now = time.time() if now is None else now
+        due = []
+        self._discard_stale()
+        while self.heap and self.heap[0][0] <= now:
+            _, url = heapq.heappop(self.heap)
+            retry_at = self.host_retry_at.get(urlparse(url).netloc, 0)
+            if retry_at > now:
+                self._push(url, retry_at)
+            else:
+                self.sources[url]['next'] = None
+                due.append(url)
+            self._discard_stale()
+        return due
+
+    def seconds_until_next(self, now=None):
+        """Seconds until the next source is due (0 if overdue), or None when all are polling"""
+        now = time.time() if now is None else now
+        self._discard_stale()
+        return max(0.0, self.heap[0][0] - now) if self.heap else None
+
+    def record(self, url, entries, fire_entries, ok=True, now=None):
+        """Reschedule url after a poll and return the seconds until its next poll"""
+        now = time.time() if now is None else now
+        source = self.sources[url]
+        host = urlparse(url).netloc
+        if not ok:
+            failures = self.host_failures[host] = self.host_failures.get(host, 0) + 1
+            delay = self._jittered(min(self.max_backoff, self.retry_interval * 2 ** (failures - 1)))
+            self.host_retry_at[host] = now + delay
+            self._push(url, now + delay)
+            return delay
+        self.host_failures.pop(host, None)
+        self.host_retry_at.pop(host, None)
+
+        keys = {entry_key(item) for item in entries}
+        new_keys = keys - source['keys']
+        if source['last_poll'] is not None:
+            elapsed = max(now - source['last_poll'], 1.0)
+            source['rate'] = (1 - self.alpha) * source['rate'] + self.alpha * (1.0 if new_keys else 0.0) / elapsed
+            if any(entry_key(item) in new_keys for item in fire_entries):
+                source['fire_until'] = now + self.fire_window
+        source['keys'] = keys
+        source['last_poll'] = now
+
+        interval = 1 / (2 * source['rate']) if source['rate'] > 0 else self.max_interval
+        if now < source['fire_until']:
+            interval /= self.fire_boost
+        interval = self._jittered(min(self.max_interval, max(self.min_interval, interval)))
+        source['interval'] = interval
+        self._push(url, now + interval)
+        return interval
+
+SOURCE_URLS = [
+    "https://fire.honolulu.gov/news-and-info/news-releases/",
+    "https://www.honolulupd.org/news/",
+    "https://www.mauicounty.gov/CivicAlerts.aspx?CID=6,3,7",
+    "https://www.hawaiicounty.gov/our-county/county-news/-seldept-7#newsdepts_11355_13347_1411",
+    "https://www.hawaiipolice.gov/category/media-releases/",
+    "https://www.kauai.gov/County-Press-Releases"
+]
 
-        all_filtered = deduplicate_entries(all_filtered)
+def run_scheduled(scheduler, process, max_pages=5, max_workers=6, limiter=None, cache=None, state=None):
+    # Polls run on the thread pool; the loop only waits until the next source is due or
+    # a poll finishes, and processes every finished poll as one batch timed from its
+    # earliest start. Failed polls only reschedule their source.
+    limiter = limiter or host_limiter
+    in_flight = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while True:
+            for url in scheduler.pop_due():
+                print(f"🌐 Polling: {url}")
+                in_flight[pool.submit(scrape_source, url, max_pages, limiter, cache, state)] = (url, time.monotonic())
+            timeout = scheduler.seconds_until_next()
+            if not in_flight:
+                print(f"😴 Next poll in {timeout:.0f}s")
+                time.sleep(timeout)
+                continue
+            done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                continue
+            results = []
+            started = None
+            for future in done:
+                url, polled = in_flight.pop(future)
+                started = polled if started is None else min(started, polled)
+                try:
+                    entries, ok = future.result()
+                except Exception as e:
+                    print(f"❌ Scrape failed for {url}: {str(e)}")
+                    entries, ok = [], False
+                results.append((url, entries, ok))
+            scraped = [(url, entries) for url, entries, ok in results if ok]
+            fire = process(scraped, started) if scraped else {}
+            for url, entries, ok in results:
+                interval = scheduler.record(url, entries, fire.get(url, []), ok)
+                print(f"🗓️  {urlparse(url).netloc}: next poll in {interval / 60:.1f} min" + ("" if ok else " (backoff)"))
+
+def main_loop(max_workers=6, incremental=False, state_path=DEFAULT_STATE_PATH, store_path=None, log_dir='.',
+              metrics_file=None, metrics_port=None, log_json=None, urls=None, once=False,
+              fixed_interval=False, interval=600):
+    urls = urls or SOURCE_URLS
+    wildfire_filter = WildfireFilter()
+    state = ScrapeState(state_path) if incremental else None
+    store = IncidentStore(store_path, log_dir) if store_path else None
+    if log_json:
+        event_log.open(log_json)
+    if metrics_port:
+        metrics.serve(metrics_port)
+        print(f"📈 Metrics served at http://127.0.0.1:{metrics_port}/metrics")
+    scheduled = not (once or fixed_interval)
+    # Without a store or state, adaptive polling exports a snapshot of every source's
+    # latest fire entries whenever it changes, like one fixed-interval scan
+    snapshot = {} if scheduled and store is None and state is None else None
+    snapshot_keys = None
+
+    def export(entries):
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         output_file = f"filtered_fire_news_{timestamp}.json"
+        n = 1
+        while os.path.exists(output_file):
+            # Scheduled polls can finish within the same second
+            n += 1
+            output_file = f"filtered_fire_news_{timestamp}_{n}.json"
         with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(all_filtered, f, indent=2, ensure_ascii=False)
-        print(f"✅ Exported {len(all_filtered)} deduplicated entries to {output_file}")
-        print("😴 Sleeping for 10 minutes...")
-        time.sleep(600)
+            json.dump(entries, f, indent=2, ensure_ascii=False)
+        print(f"✅ Exported {len(entries)} deduplicated entries to {output_file}")
 
-if __name__ == "__main__":
-    main_loop()
+    def process(scraped, started):
+        nonlocal snapshot_keys
+        # Filter, store/export and mark one batch of (url, entries); returns fire entries per url
+        all_filtered = []
+        fire_by_url = {}
+        for url, entries in scraped:
+            host = urlparse(url).netloc
+            fire_entries = []
+            with STAGE_SECONDS.time(stage='filter', source=host):
+                for item in entries:
+                    if wildfire_filter.analyze(item):
+                        item['type_of_fire'] = detect_type(item.get('content', ''))
+                        fire_entries.append(item)
+            fire_by_url[url] = fire_entries
+            ENTRIES.inc(len(fire_entries), source=host, outcome='kept')
+            ENTRIES.inc(len(entries) - len(fire_entries), source=host, outcome='dropped')
+            event_log.log('source_filtered', source=host, entries=len(entries), kept=len(fire_entries))
+            print(f"🔥 Fire-related entries found ({host}): {len(fire_entries)}")
+            if store is not None:
+                with STAGE_SECONDS.time(stage='store', source=host):
+                    fire_entries = store.add(deduplicate_entries(fire_entries), source=url)
+            all_filtered.extend(fire_entries)
+        print(f"⏱️  Scan finished in {time.monotonic() - started:.1f}s")
+
+        with STAGE_SECONDS.time(stage='dedup', source='all'):
+            deduped = deduplicate_entries(all_filtered)
+        ENTRIES.inc(len(all_filtered) - len(deduped), source='all', outcome='duplicate')
+        all_filtered = deduped
+        export_started = time.perf_counter()
+        if store is not None:
+            print(f"🗃️  {len(all_filtered)} new incidents appended to {log_dir}")
+        elif snapshot is not None:
+            snapshot.update(fire_by_url)
+            all_filtered = deduplicate_entries([item for url in urls for item in snapshot.get(url, [])])
+            keys = {entry_key(item) for item in all_filtered}
+            if keys == snapshot_keys:
+                print("💤 Fire-related entries unchanged")
+            else:
+                export(all_filtered)
+                snapshot_keys = keys
+        elif state is not None and not all_filtered:
+            print("💤 No new fire-related entries")
+        else:
+            export(all_filtered)
+        if state is not None:
+            # Only advance the high-water marks once the scan's entries are exported
+            for url, entries in scraped:
+                state.mark(url, entries)
+            state.save()
+        STAGE_SECONDS.observe(time.perf_counter() - export_started, stage='export', source='all')
+
+        scan_seconds = time.monotonic() - started
+        SCAN_SECONDS.observe(scan_seconds)
+        LAST_SCAN.set(time.time())
+        event_log.log('scan_complete', seconds=round(scan_seconds, 3), exported=len(all_filtered),
+                      scraped=sum(len(entries) for _, entries in scraped))
+        if metrics_file:
+            metrics.write_textfile(metrics_file)
+        return fire_by_url
+
+    if scheduled:
+        print(f"🗓️  Adaptive polling of {len(urls)} sources (base interval {interval}s)")
+        run_scheduled(PollScheduler(urls, base_interval=interval), process, max_workers=max_workers, state=state)
+        return
 
+    while True:
+        started = time.monotonic()
+        print(f"🔍 Starting scan @ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        event_log.log('scan_start', sources=len(urls))
+        for url in urls:
+            print(f"🌐 Scraping: {url}")
+        scraped = scrape_all(urls, max_pages=5, max_workers=max_workers, state=state)
+        process(scraped, started)
+        if once:
+            return
+        print(f"😴 Sleeping for {interval / 60:g} minutes...")
+        time.sleep(interval)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Scrape Hawaii agency news for fire-related entries')
+    parser.add_argument('--workers', type=int, default=6, help='Sites scraped in parallel')
+    parser.add_argument('--incremental', action='store_true', help='Only process entries not seen in earlier scans')
+    parser.add_argument('--state', default=DEFAULT_STATE_PATH, help='High-water mark file for --incremental')
+    parser.add_argument('--store', nargs='?', const=DEFAULT_STORE_PATH,
+                        help='Dedup incidents across runs in this SQLite file and append new ones to NDJSON '
+                             'logs instead of writing full snapshots')
+    parser.add_argument('--log-dir', default='.', help='Directory of the daily fire_incidents_*.ndjson logs')
+    parser.add_argument('--metrics-file', help='Write Prometheus text metrics here after every scan '
+                                               '(e.g. a node_exporter textfile collector .prom file)')
+    parser.add_argument('--metrics-port', type=int, help='Serve Prometheus metrics on 127.0.0.1:PORT/metrics')
+    parser.add_argument('--log-json', help="Append structured JSON event logs to this file ('-' for stdout)")
+    parser.add_argument('--parser', choices=['lxml', 'html.parser'], default=HTML_PARSER,
+                        help=f'HTML parser backend (default: {HTML_PARSER})')
+    parser.add_argument('--record', metavar='DIR', help='Archive every fetched response (for Replay_Server.py)')
+    parser.add_argument('--replay', metavar='URL', help='Fetch through a Replay_Server.py instance at URL')
+    parser.add_argument('--amplify', type=int, help='With --replay, scrape N aliases of every source')
+    parser.add_argument('--rate', type=float, default=1.0, help='Requests per second per host')
+    parser.add_argument('--once', action='store_true', help='Run a single scan and exit')
+    parser.add_argument('--interval', type=float, default=600,
+                        help='Base seconds between polls of a source (adapted per source unless --fixed-interval)')
+    parser.add_argument('--fixed-interval', action='store_true',
+                        help='Rescan every source each --interval seconds instead of adaptive polling')
+    args = parser.parse_args()
+    if args.amplify and not args.replay:
+        parser.error('--amplify requires --replay')
+    HTML_PARSER = args.parser
+    RECORD_ARCHIVE = ResponseArchive(args.record) if args.record else None
+    REPLAY_BASE = args.replay
+    host_limiter.rate = args.rate
+    urls = amplify_sources(SOURCE_URLS, args.amplify) if args.amplify else SOURCE_URLS
+    main_loop(max_workers=args.workers, incremental=args.incremental, state_path=args.state,
+              store_path=args.store, log_dir=args.log_dir, metrics_file=args.metrics_file,
+              metrics_port=args.metrics_port, log_json=args.log_json, urls=urls, once=args.once,
+              fixed_interval=args.fixed_interval, interval=args.interval)
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Benchmark Fixtures
+Offline inputs for run_benchmarks.py: the scraped HFD/HPD snapshots, agency pages
+rebuilt from them in each site's markup (written to fixtures/html/; none of these
+were captured from the live sites, but a real capture can replace one as
+<host>.html), the FIRMS NRT file and seeded scaled-up synthetic versions of all of them.
+"""
+
+import argparse
+import html
+import json
+import os
+import random
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.dirname(BENCH_DIR)
+HTML_DIR = os.path.join(BENCH_DIR, 'fixtures', 'html')
+SCRAPED_DIR = os.path.join(SCRIPTS_DIR, 'Web Scraped EX')
+FIRMS_FILE = os.path.join(os.path.dirname(SCRIPTS_DIR), 'FIRMS', 'VIIRS', 'DL_FIRE_M-C61_628466',
+                          'fire_nrt_M-C61_628466.json')
+
+# Base URL and container markup of every scraped site (see Web_Scraper.main_loop)
+SITES = {
+    'fire.honolulu.gov': ('https://fire.honolulu.gov/news-and-info/news-releases/', 'article'),
+    'www.honolulupd.org': ('https://www.honolulupd.org/news/', 'article'),
+    'www.mauicounty.gov': ('https://www.mauicounty.gov/CivicAlerts.aspx?CID=6,3,7', 'civic_alerts'),
+    'www.hawaiicounty.gov': ('https://www.hawaiicounty.gov/our-county/county-news/', 'news_item'),
+    'www.hawaiipolice.gov': ('https://www.hawaiipolice.gov/category/media-releases/', 'article'),
+    'www.kauai.gov': ('https://www.kauai.gov/County-Press-Releases', 'press_item'),
+}
+
+FILLER_WORDS = ('the county road closed traffic advisory water main public meeting community park '
+                'officers responded suspect arrested residents crews reported area update '
+                'brush fire wildland smoke acres contained evacuation firefighters units engine').split()
+
+
+def load_scraped_entries():
+    """Return the entries of every scraped snapshot in Web Scraped EX (filter outputs excluded)"""
+    entries = []
+    for name in sorted(os.listdir(SCRAPED_DIR)):
+        if name.endswith('.json') and '_fire_filtered' not in name:
+            with open(os.path.join(SCRAPED_DIR, name), 'r', encoding='utf-8') as f:
+                entries.extend(json.load(f))
+    return entries
+
+
+def scale_entries(entries, count, seed=0):
+    """
+    Return count entries cycling through entries, each with a unique link and some
+    seeded filler text so repeated items are not byte-identical.
+    """
+    rng = random.Random(seed)
+    scaled = []
+    for i in range(count):
+        item = dict(entries[i % len(entries)])
+        filler = ' '.join(rng.choice(FILLER_WORDS) for _ in range(rng.randint(10, 60)))
+        item['link'] = f"{item.get('link') or ''}#{i}"
+        item['content'] = f"{item.get('content') or ''} {filler}"
+        scaled.append(item)
+    return scaled
+
+
+def _item_html(layout, item):
+    title = html.escape(item.get('title') or '')
+    link = html.escape(item.get('link') or '#', quote=True)
+    content = html.escape(item.get('content') or '')
+    date = html.escape(item.get('date') or '')
+    if layout == 'article':
+        return (f'<article class="post"><header class="entry-header"><h2 class="entry-title">'
+                f'<a href="{link}">{title}</a></h2></header><div class="entry-summary"><p>{content}</p>'
+                f'<a class="more-link" href="{link}">Read More »</a></div></article>')
+    if layout == 'civic_alerts':
+        return (f'<div class="CivicAlertsItem"><h3><a href="{link}">{title}</a></h3>'
+                f'<div class="date">{date}</div><div class="intro">{content}</div></div>')
+    if layout == 'news_item':
+        return f'<li class="news-item"><a href="{link}">{title}</a><span class="date">{date}</span> {content}</li>'
+    return (f'<div class="press-item"><h3><a href="{link}">{title}</a></h3>'
+            f'<p>{date} {content}</p></div>')
+
+
+def build_page(host, entries, seed=0):
+    """Render entries as a full agency page for host, with navigation, sidebar and footer"""
+    base_url, layout = SITES[host]
+    rng = random.Random(seed)
+    menu = ''.join(f'<li class="menu-item"><a href="/section-{i}">{" ".join(rng.sample(FILLER_WORDS, 3)).title()}</a>'
+                   f'<ul class="sub-menu">'
+                   + ''.join(f'<li><a href="/section-{i}/{j}">{" ".join(rng.sample(FILLER_WORDS, 4))}</a></li>'
+                             for j in range(4))
+                   + '</ul></li>' for i in range(12))
+    items = ''.join(_item_html(layout, item) for item in entries)
+    if layout == 'civic_alerts':
+        items = f'<div id="CivicAlertsList">{items}</div>'
+    elif layout == 'news_item':
+        items = f'<ul class="news-list">{items}</ul>'
+    related = ''.join(f'<li><a href="/related-{i}">{" ".join(rng.sample(FILLER_WORDS, 6))}</a></li>' for i in range(8))
+    return (
+        '<!DOCTYPE html><html lang="en"><head><meta charset="utf-8">'
+        f'<title>News | {host}</title><link rel="stylesheet" href="/style.css">'
+        '<script>window.dataLayer = window.dataLayer || []; function gtag(){dataLayer.push(arguments);}</script>'
+        '</head><body class="news">'
+        f'<header class="site-header"><a class="logo" href="/">{host}</a>'
+        f'<nav class="main-navigation" role="navigation"><ul class="menu">{menu}</ul></nav></header>'
+        '<div class="breadcrumb"><a href="/">Home</a> » <a href="/news">News</a></div>'
+        f'<main id="content"><h1>News Releases</h1>{items}'
+        '<div class="pagination"><a href="?page=2">Next »</a></div></main>'
+        f'<aside class="sidebar"><h3>Related</h3><ul>{related}</ul></aside>'
+        f'<footer class="site-footer"><ul class="menu">{menu}</ul><p>© {host}</p></footer>'
+        '</body></html>'
+    )
+
+
+def recorded_page_path(host):
+    return os.path.join(HTML_DIR, f'{host}.html')
+
+
+def load_recorded_pages():
+    """Return {host: html} for every page stored under fixtures/html/"""
+    pages = {}
+    for host in SITES:
+        path = recorded_page_path(host)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                pages[host] = f.read()
+    return pages
+
+
+def record_pages(overwrite=False):
+    """Write the pages rebuilt from the scraped snapshots to fixtures/html/"""
+    entries = load_scraped_entries()
+    os.makedirs(HTML_DIR, exist_ok=True)
+    written = []
+    for n, host in enumerate(SITES):
+        path = recorded_page_path(host)
+        if os.path.exists(path) and not overwrite:
+            continue
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(build_page(host, entries, seed=n))
+        written.append(path)
+    return written
+
+
+def write_scaled_snapshot(path, count, seed=0):
+    """Write a scraper-style JSON snapshot of count scaled entries (process_file input)"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(scale_entries(load_scraped_entries(), count, seed), f, indent=4, ensure_ascii=False)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write the offline HTML fixtures used by run_benchmarks.py')
+    parser.add_argument('--overwrite', action='store_true', help='Replace pages that are already written')
+    args = parser.parse_args()
+
+    written = record_pages(args.overwrite)
+    for path in written:
+        print(f"💾 {path}")
+    print(f"✅ {len(written)} pages written to {HTML_DIR}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Offline Benchmark Suite
+Times the hot paths of the scraper, JSON filter and FIRMS generator on offline
+fixtures (pages rebuilt from the scraped snapshots plus seeded synthetic data, no
+network), writes the results as JSON and compares them with a stored baseline.
+Each timing is the best of several repeats inside one interpreter, and the reported
+value is the median over --processes separate interpreters; memory is the
+tracemalloc peak. Memory peaks are deterministic and gate the exit code. Timings
+still vary by tens of percent between runs on a shared host, so they only warn
+beyond --timing-tolerance unless --gate-timing is given. Baselines hold one result
+set per mode (full/quick) and timings are only meaningful on the host that recorded
+them, so refresh baseline.json on the deploy machine:
+
+    python fixtures.py                      # write HTML fixtures (once)
+    python run_benchmarks.py --save-baseline
+    python run_benchmarks.py -o results.json  # exit code 1 on regression
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import timeit
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+from fixtures import (FIRMS_FILE, SCRIPTS_DIR, SITES, build_page, load_recorded_pages,
+                      load_scraped_entries, scale_entries, write_scaled_snapshot)
+
+sys.path.insert(0, SCRIPTS_DIR)
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+
+def load_script(module_name, filename):
+    """Import a script whose file name is not a valid module name (registered in sys.modules)"""
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(SCRIPTS_DIR, filename))
+    module = importlib.util.module_from_spec(spec)
+    # Registered before execution so pickling (process pools) can find the module
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_scraper():
+    # Web_Scraper prints its boot banner on import
+    with contextlib.redirect_stdout(io.StringIO()):
+        import Web_Scraper
+    return Web_Scraper
+
+
+def best_time(func, repeat):
+    """
+    Return the fastest per-call time of func in seconds over repeat rounds, and the
+    result of one call. Each round loops func for at least 0.2 s (timeit.autorange)
+    so short calls are not dominated by timer noise.
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number, func()
+
+
+def peak_memory(func):
+    """Return the tracemalloc peak in MiB while running func"""
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / (1 << 20)
+
+
+def metric(value, unit, better, kind='time'):
+    return {'value': round(value, 4), 'unit': unit, 'better': better, 'kind': kind}
+
+
+# --- benchmarks -----------------------------------------------------------
+
+def bench_filter(config):
+    ai_filter = load_script('AI_Filter_JSON', 'AI-Filter_JSON.py')
+    filter_tool = ai_filter.WildfireFilter()
+    items = scale_entries(load_scraped_entries(), config['items'])
+    texts = [f"{item['title']} {item['content']}" for item in items]
+
+    results = {}
+    elapsed, _ = best_time(lambda: [filter_tool.is_fire_related(t) for t in texts], config['repeat'])
+    results['filter.is_fire_related'] = metric(len(texts) / elapsed, 'texts/s', 'higher')
+    elapsed, _ = best_time(lambda: [filter_tool.analyze_item(item) for item in items], config['repeat'])
+    results['filter.analyze_item'] = metric(len(items) / elapsed, 'items/s', 'higher')
+    return results
+
+
+def bench_extract(config):
+    scraper = load_scraper()
+    entries = load_scraped_entries()
+    pages = {f'fixture.{host}': (host, page) for host, page in load_recorded_pages().items()}
+    for n, host in enumerate(SITES):
+        scaled = scale_entries(entries, config['page_items'], seed=n)
+        pages[f'synthetic.{host}'] = (host, build_page(host, scaled, seed=n))
+
+    results = {}
+    for name, (host, page) in sorted(pages.items()):
+        base_url = SITES[host][0]
+        elapsed, articles = best_time(
+            lambda: scraper.extract_articles(scraper.parse_page(page, base_url), base_url), config['repeat'])
+        if not articles:
+            print(f"⚠️  {name}: no articles extracted")
+        results[f'extract_articles.{name}'] = metric(elapsed * 1000, 'ms/page', 'lower')
+    return results
+
+
+def bench_generator(config):
+    generator = load_script('FIRMS_Data_Generator', 'FIRMS Data Generator.py')
+    results = {}
+
+    def sample():
+        np.random.seed(0)
+        random.seed(0)
+        return generator.generate_hawaii_viirs_fire_sample_json(num_fires=config['generator_fires'])
+
+    elapsed, records = best_time(sample, config['repeat'])
+    results['generator.sample_json'] = metric(len(records) / elapsed, 'records/s', 'higher')
+
+    elapsed, columns = best_time(
+        lambda: generator.generate_hawaii_viirs_fire_batch(num_fires=config['batch_fires'], seed=0),
+        config['repeat'])
+    results['generator.batch'] = metric(len(columns['latitude']) / elapsed, 'records/s', 'higher')
+    return results
+
+
+def bench_memory(config):
+    ai_filter = load_script('AI_Filter_JSON', 'AI-Filter_JSON.py')
+    filter_tool = ai_filter.WildfireFilter()
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        snapshot = write_scaled_snapshot(os.path.join(tmp_dir, 'snapshot.json'), config['snapshot_items'])
+        inputs = {'snapshot': snapshot, 'firms_nrt': FIRMS_FILE}
+        for name, path in inputs.items():
+            output = os.path.join(tmp_dir, f'{name}_out.json')
+            results[f'process_file.peak.{name}'] = metric(
+                peak_memory(lambda: filter_tool.process_file(path, output)), 'MiB', 'lower', kind='memory')
+            results[f'process_file_stream.peak.{name}'] = metric(
+                peak_memory(lambda: filter_tool.process_file_stream(path, output)), 'MiB', 'lower', kind='memory')
+    return results
+
+
+BENCHMARKS = {
+    'filter': bench_filter,
+    'extract': bench_extract,
+    'generator': bench_generator,
+    'memory': bench_memory,
+}
+
+CONFIGS = {
+    'full': {'repeat': 5, 'items': 20_000, 'page_items': 200, 'generator_fires': 5_000,
+             'batch_fires': 500_000, 'snapshot_items': 50_000},
+    'quick': {'repeat': 3, 'items': 2_000, 'page_items': 50, 'generator_fires': 500,
+              'batch_fires': 50_000, 'snapshot_items': 5_000},
+}
+
+
+def run_groups(groups, config):
+    benchmarks = {}
+    for group in groups:
+        print(f"⏱️  Running {group} benchmarks...")
+        benchmarks.update(BENCHMARKS[group](config))
+    return benchmarks
+
+
+def run_processes(groups, mode, processes):
+    """
+    Run the groups in separate interpreter processes and return each benchmark's
+    median value, so one unlucky process (cache state, scheduler, turbo) cannot move
+    the result on its own.
+    """
+    runs = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for i in range(processes):
+            print(f"🔁 Process {i + 1}/{processes}")
+            path = os.path.join(tmp_dir, f'run_{i}.json')
+            command = [sys.executable, os.path.abspath(__file__), '--child-output', path, '--only', *groups]
+            if mode == 'quick':
+                command.append('--quick')
+            subprocess.run(command, check=True)
+            with open(path, 'r', encoding='utf-8') as f:
+                runs.append(json.load(f))
+    benchmarks = {}
+    for name, first in runs[0].items():
+        values = [run[name]['value'] for run in runs if name in run]
+        benchmarks[name] = dict(first, value=round(float(np.median(values)), 4))
+    return benchmarks
+
+
+# --- baseline comparison --------------------------------------------------
+
+def compare(results, baseline, tolerance, timing_tolerance, gate_timing=False):
+    """
+    Compare results with a baseline run of the same configuration. Memory benchmarks
+    are held to tolerance; timings to timing_tolerance, and only fail with gate_timing.
+
+    Returns:
+    - List of (name, baseline value, value, relative change) for failing benchmarks
+    """
+    regressions = []
+    for name, current in sorted(results['benchmarks'].items()):
+        previous = baseline['benchmarks'].get(name)
+        if previous is None or not previous['value']:
+            print(f"   {name}: {current['value']} {current['unit']} (new)")
+            continue
+        change = current['value'] / previous['value'] - 1
+        worse = -change if current['better'] == 'higher' else change
+        timing = current.get('kind', 'time') == 'time'
+        failed = worse > (timing_tolerance if timing else tolerance) and (gate_timing or not timing)
+        flag = '❌' if failed else '⚠️ ' if timing and worse > timing_tolerance else '✅'
+        print(f"{flag} {name}: {previous['value']} -> {current['value']} {current['unit']} ({change:+.1%})")
+        if failed:
+            regressions.append((name, previous['value'], current['value'], change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the offline performance benchmarks')
+    parser.add_argument('--quick', action='store_true', help='Smaller inputs and fewer repeats')
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), help='Benchmark groups to run')
+    parser.add_argument('-o', '--output', help='Write results to this JSON file')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline results to compare against')
+    parser.add_argument('--save-baseline', action='store_true', help='Store these results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help='Allowed relative memory growth before failing')
+    parser.add_argument('--timing-tolerance', type=float, default=0.5,
+                        help='Relative slowdown reported as a timing regression')
+    parser.add_argument('--gate-timing', action='store_true',
+                        help='Also fail on timing regressions (only sound on a quiet, dedicated host)')
+    parser.add_argument('--processes', type=int, default=3,
+                        help='Separate interpreter runs; each timing is the median over them')
+    parser.add_argument('--child-output', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    mode = 'quick' if args.quick else 'full'
+    config = CONFIGS[mode]
+    groups = args.only or list(BENCHMARKS)
+    if args.child_output:
+        with open(args.child_output, 'w', encoding='utf-8') as f:
+            json.dump(run_groups(groups, config), f)
+        return 0
+    results = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'mode': mode,
+        'config': config,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'processes': args.processes,
+        'benchmarks': {},
+    }
+    if args.processes > 1:
+        results['benchmarks'] = run_processes(groups, mode, args.processes)
+    else:
+        results['benchmarks'] = run_groups(groups, config)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Results saved to: {args.output}")
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                baseline = json.load(f)
+        baseline[mode] = results
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2)
+        print(f"💾 Baseline ({mode}) saved to: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(json.dumps(results['benchmarks'], indent=2))
+        print(f"⚠️  No baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f).get(mode)
+    if baseline is None:
+        print(json.dumps(results['benchmarks'], indent=2))
+        print(f"⚠️  Baseline has no {mode} results; run with --save-baseline to add them")
+        return 0
+
+    print(f"📊 Compared with baseline from {baseline['generated_at']} "
+          f"(memory tolerance {args.tolerance:.0%}, timing {args.timing_tolerance:.0%}"
+          f"{'' if args.gate_timing else ', warning only'}):")
+    if (baseline['platform'], baseline['python']) != (results['platform'], results['python']):
+        # Timings only compare on the same host; memory peaks are portable
+        print(f"⚠️  Baseline was recorded on {baseline['platform']} / Python {baseline['python']}; "
+              f"refresh it on this host with --save-baseline")
+    regressions = compare(results, baseline, args.tolerance, args.timing_tolerance, args.gate_timing)
+    if regressions:
+        print(f"❌ {len(regressions)} benchmark(s) regressed")
+        return 1
+    print("✅ No regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,28 @@
+from FIRMS_Events import FireEventTracker
+
+RECORDS = [
+    {'latitude': 19.40 + (i % 10) * 0.005, 'longitude': -155.28 + (i // 10) * 0.3, 'frp': 3.0,
+     'acq_date': '2025-06-%02d' % (20 + i // 15), 'acq_time': '%04d' % (1200 + i % 15), 'satellite': 'N20'}
+    for i in range(60)
+]
+
+
+def _summaries(tracker):
+    return [(s['count'], s['first_seen'], s['last_seen'], s['bbox']) for s in tracker.event_summaries()]
+
+
+def test_overlapping_batches_are_not_clustered_twice(tmp_path):
+    reference = FireEventTracker()
+    reference.update(RECORDS)
+
+    state = str(tmp_path / 'events.json')
+    tracker = FireEventTracker()
+    tracker.update(RECORDS[:40])
+    tracker.save(state)
+    tracker = FireEventTracker.load(state)
+    tracker.update(RECORDS[25:])
+    tracker.update(RECORDS)
+
+    assert _summaries(tracker) == _summaries(reference)
+    assert sum(s['count'] for s in tracker.event_summaries()) == len(RECORDS)
+    assert tracker.skipped == 15 + len(RECORDS)
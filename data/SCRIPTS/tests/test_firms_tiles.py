@@ -0,0 +1,53 @@
+import json
+import os
+
+from FIRMS_Tiles import TilePyramid
+
+RECORDS = [
+    {'latitude': 19.41 + i * 0.01, 'longitude': -155.28 - i * 0.01, 'frp': 5.0 + i,
+     'acq_date': '2025-06-2%d' % (i % 3), 'acq_time': '%04d' % (1100 + i), 'satellite': 'N20'}
+    for i in range(50)
+]
+
+
+def _tiles(out_dir):
+    tiles = {}
+    for root, _, files in os.walk(out_dir):
+        for name in files:
+            if name.endswith('.json') and name != 'metadata.json':
+                with open(os.path.join(root, name), encoding='utf-8') as f:
+                    tiles[os.path.relpath(os.path.join(root, name), out_dir)] = json.load(f)
+    return tiles
+
+
+def test_reingesting_same_records_is_a_no_op(tmp_path):
+    out_dir = str(tmp_path / 'tiles')
+    TilePyramid(out_dir, 0, 8).update(RECORDS)
+    first = _tiles(out_dir)
+
+    pyramid = TilePyramid(out_dir, 0, 8)
+    assert pyramid.update(RECORDS) == []
+    assert pyramid.metadata['count'] == len(RECORDS)
+    assert pyramid.metadata['skipped'] == len(RECORDS)
+    assert _tiles(out_dir) == first
+
+
+def test_overlapping_batch_adds_only_new_detections(tmp_path):
+    out_dir = str(tmp_path / 'tiles')
+    pyramid = TilePyramid(out_dir, 0, 8)
+    pyramid.update(RECORDS[:30])
+    pyramid.update(RECORDS[20:] + RECORDS[20:25])
+    assert pyramid.metadata['count'] == len(RECORDS)
+
+    with open(os.path.join(out_dir, '0', '0', '0.json'), encoding='utf-8') as f:
+        tile = json.load(f)
+    assert tile['count'] == len(RECORDS)
+
+
+def test_update_columns_skips_ingested(tmp_path):
+    out_dir = str(tmp_path / 'tiles')
+    pyramid = TilePyramid(out_dir, 0, 4)
+    columns = ([19.5, 19.6], [-155.5, -155.6], [1.0, 2.0], [1750000000, 1750000600])
+    pyramid.update_columns(*columns)
+    assert pyramid.update_columns(*columns) == []
+    assert TilePyramid(out_dir, 0, 4).metadata['count'] == 2